@@ -0,0 +1,80 @@
+# benchmark.py
+"""
+Offline scraper benchmark
+Records the configured websites into a cassette once, then replays it to time
+the scrapers without network noise
+
+Usage:
+    python benchmark.py --record                  # live run, writes the cassette
+    python benchmark.py --latency 0.05 --repeat 3 # replay with 50 ms per response
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import ALL_WEBSITES
+from scrapers.cassette import Cassette, RecordingAdapter, ReplayAdapter
+from scrapers.http_session import SharedSession, create_session
+from scrapers.politeness import PolitenessScheduler
+import config
+
+
+def build_session(adapter) -> SharedSession:
+    session = create_session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def run_sites(session: SharedSession, politeness: PolitenessScheduler):
+    """Scrape every website with the given session, returns [(name, events, seconds)]"""
+    results = []
+    for website_config in ALL_WEBSITES:
+        scraper = WebScraper(website_config)
+        scraper.session = session
+        scraper.politeness = politeness
+        start = time.perf_counter()
+        events = scraper.scrape()
+        results.append((website_config.name, len(events), time.perf_counter() - start))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against recorded HTTP exchanges")
+    parser.add_argument("cassette", nargs="?", default=config.HTTP_CASSETTE_PATH)
+    parser.add_argument("--record", action="store_true", help="record the live websites instead of replaying")
+    parser.add_argument("--latency", type=float, default=config.HTTP_REPLAY_LATENCY,
+                        help="artificial delay per replayed response, in seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.record:
+        cassette = Cassette(args.cassette)
+        session = build_session(RecordingAdapter(cassette))
+        run_sites(session, PolitenessScheduler())
+        session.close()  # Writes the cassette
+        print(f"📼 Recorded {len(cassette.interactions)} exchanges to {args.cassette}")
+        return 0
+
+    # Replay: no rate limiting, only the artificial latency
+    politeness = PolitenessScheduler(requests_per_second=1000, burst=1000, respect_crawl_delay=False)
+    for run in range(1, args.repeat + 1):
+        session = build_session(ReplayAdapter(Cassette.load(args.cassette), latency=args.latency))
+        total_events = total_seconds = 0
+        for name, count, seconds in run_sites(session, politeness):
+            print(f"  run {run} | {name}: {count} events in {seconds:.3f}s")
+            total_events += count
+            total_seconds += seconds
+        rate = total_events / total_seconds if total_seconds else 0
+        print(f"⏱️ run {run}: {total_events} events in {total_seconds:.3f}s ({rate:.1f} events/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -12,19 +12,82 @@ FIRESTORE_COLLECTIONS = {
     "ASSOCIATIONS": "associations",
     "USERS": "users"
 }
+# Writes per Firestore WriteBatch commit (Firestore's limit is 500)
+FIRESTORE_BATCH_SIZE = 500
+# Values per "in" query filter (Firestore's limit is 30)
+FIRESTORE_IN_FILTER_LIMIT = 30
+# Documents read per get_all call when checking which events exist
+FIRESTORE_GET_ALL_CHUNK = 300
+
+# Local index of the event IDs in Firestore, synced from the events uploaded since the last run
+EVENT_INDEX_PATH = os.environ.get("EVENT_INDEX_PATH", os.path.join(BASE_DIR, ".event_index.sqlite3"))
+# Incremental syncs start this long before the watermark (upload timestamps are not in commit order)
+EVENT_INDEX_SYNC_OVERLAP_SECONDS = 300
+# Days between full re-reads of the collection, which drop deleted events from the index
+EVENT_INDEX_FULL_SYNC_DAYS = 7
 
 
 # Request configuration
 REQUEST_TIMEOUT = 30
+# Enforced per request: time to establish a connection, and maximum wait between two reads
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 20
 REQUEST_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
 }
 
+# On-disk HTTP cache revalidated with ETag / Last-Modified between runs
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", os.path.join(BASE_DIR, ".http_cache"))
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Shared HTTP session: connection pools, retries with exponential backoff and jitter
+HTTP_POOL_HOSTS = 20
+HTTP_POOL_SIZE_PER_HOST = 10
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_BACKOFF_JITTER = 0.5
+# Bodies are streamed and aborted past this size (per site: WebsiteConfig.max_body_bytes)
+HTTP_MAX_BODY_BYTES = 5 * 1024 * 1024
+
+# Record/replay of HTTP exchanges for offline runs and benchmarks: "record", "replay" or "" (live)
+HTTP_CASSETTE_MODE = os.environ.get("HTTP_CASSETTE_MODE", "")
+HTTP_CASSETTE_PATH = os.environ.get("HTTP_CASSETTE_PATH", os.path.join(BASE_DIR, "cassettes", "scrape.cassette"))
+# Artificial delay added to every replayed response, in seconds
+HTTP_REPLAY_LATENCY = float(os.environ.get("HTTP_REPLAY_LATENCY", "0"))
+
+# Per-host politeness: token bucket, connection cap and robots.txt Crawl-delay
+POLITENESS_REQUESTS_PER_SECOND = 2.0
+POLITENESS_BURST = 4
+POLITENESS_MAX_CONNECTIONS_PER_HOST = 4
+POLITENESS_RESPECT_CRAWL_DELAY = True
+
+# Selector hit statistics: collapsing hit rates are reported (extraction keeps the configured priority)
+SELECTOR_STATS_ENABLED = True
+SELECTOR_STATS_PATH = os.environ.get("SELECTOR_STATS_PATH", os.path.join(BASE_DIR, ".selector_stats.json"))
+SELECTOR_STATS_DECAY = 0.8
+SELECTOR_STATS_MIN_SAMPLES = 5
+SELECTOR_STATS_COLLAPSE_RATIO = 0.5
+
+# Detailed pages are parsed in worker processes when > 0 (0: parse in the scraping threads)
+PARSE_PROCESSES = int(os.environ.get("PARSE_PROCESSES", "0"))
+# CPU time a worker may spend on one page before it is abandoned
+PARSE_CPU_SECONDS = 10
+# Wall-clock limit per page; a worker stuck past it (e.g. inside a C parser) is killed
+PARSE_WALL_SECONDS = 30
+
+# Maximum number of requests in flight across all sites for the async scraper
+ASYNC_MAX_IN_FLIGHT = 50
+
 
 # Configuration of the scraper
 SCRAPING_INTERVAL_HOURS = 6
 REQUEST_TIMEOUT = 30
+# Wall-clock budget of a whole run, shared by all websites
+RUN_DEADLINE_SECONDS = 30 * 60
+# Number of websites scraped at the same time
+SITE_RUNNER_WORKERS = 4
 
 
 # Default EPFL location
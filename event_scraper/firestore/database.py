@@ -5,15 +5,18 @@ Handles all interactions with Firebase Firestore database.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
 import firebase_admin
 from firebase_admin import credentials, firestore
 from firebase_admin.exceptions import FirebaseError
+from google.cloud.firestore_v1.base_query import FieldFilter
 
 from models.event_models import Event, Association
+from models.event_batch import EventBatch
+from firestore.event_index import EventIndex, event_fingerprint
 import config
 
 logger = logging.getLogger(__name__)
@@ -50,6 +53,10 @@ class FirebaseDatabase:
             self.db = firestore.client()
             self.events_collection = self.db.collection(config.FIRESTORE_COLLECTIONS["EVENTS"])
             self.associations_collection = self.db.collection(config.FIRESTORE_COLLECTIONS["ASSOCIATIONS"])
+            # IDs of associations known to exist in Firestore, read or created by this instance
+            self._known_associations: Set[str] = set()
+            # Local index of the events in Firestore, kept current with this instance's writes
+            self.event_index: Optional[EventIndex] = None
             
             logger.info("✅ Firebase connection established")
             
@@ -80,6 +87,7 @@ class FirebaseDatabase:
             # Upload to Firestore
             event_ref = self.events_collection.document(event.id)
             event_ref.set(event_data)
+            self._record_uploaded([event_data])
             
             logger.debug(f"Uploaded event: {event.title}")
             return True
@@ -88,45 +96,199 @@ class FirebaseDatabase:
             logger.error(f"Failed to upload event '{event.title}': {e}")
             return False
     
-    def upload_events_batch(self, events: List[Event]) -> Dict[str, int]:
+    def upload_events_batch(self, events: Union[List[Event], EventBatch]) -> Dict[str, int]:
         """
-        Upload multiple events.
+        Upload multiple events with batched writes.
+        
+        Events are committed in WriteBatch chunks of config.FIRESTORE_BATCH_SIZE
+        writes. Missing associations are created in the first chunk. A chunk whose
+        commit fails is written again one document at a time, so that every failing
+        event is reported on its own.
         
         Args:
-            events: List of Event objects
+            events: List of Event objects, or an EventBatch
             
         Returns:
             Dictionary with success/failure counts
         """
-        results = {"total": len(events), "success": 0, "failed": 0}
+        batch = events if isinstance(events, EventBatch) else EventBatch.from_events(events)
+        results = {"total": len(batch), "success": 0, "failed": 0}
+        if not batch:
+            return results
         
-        for event in events:
-            if self.upload_event(event):
-                results["success"] += 1
-            else:
-                results["failed"] += 1
+        associations = self._missing_associations(batch.unique_associations())
+        documents = list(zip(batch.column("ids"), batch.column("titles"), batch.to_firestore_dicts(db=self.db)))
+        start = 0
+        while start < len(documents):
+            # The association writes count against the first chunk's limit
+            chunk_size = max(1, config.FIRESTORE_BATCH_SIZE - len(associations))
+            success, failed = self._write_chunk(documents[start:start + chunk_size], associations)
+            results["success"] += success
+            results["failed"] += failed
+            start += chunk_size
+            associations = []
         
         logger.info(f"Batch upload: {results['success']} successful, {results['failed']} failed")
         return results
     
-    def get_existing_event_ids(self) -> List[str]:
+    def _write_chunk(self, documents: List[Tuple[str, str, Dict[str, Any]]],
+                     associations: Sequence[Association] = ()) -> Tuple[int, int]:
         """
-        Get all existing event IDs from Firestore.
+        Commit (event ID, title, Firestore dictionary) documents in one WriteBatch.
+        
+        Args:
+            documents: Events to write
+            associations: Associations to create in the same batch
         
         Returns:
-            List of event IDs
+            (successful, failed) document counts
         """
+        write_batch = self.db.batch()
+        for association in associations:
+            write_batch.set(self.associations_collection.document(association.id),
+                            self._association_to_firestore_dict(association))
+        for event_id, _, event_data in documents:
+            write_batch.set(self.events_collection.document(event_id), self._add_upload_metadata(event_data))
         try:
-            docs = self.events_collection.select(["id"]).stream()
-            existing_ids = [doc.id for doc in docs]
-            logger.info(f"Found {len(existing_ids)} existing events")
-            return existing_ids
+            write_batch.commit()
+            self._known_associations.update(association.id for association in associations)
+            self._record_uploaded(event_data for _, _, event_data in documents)
+            return len(documents), 0
+        except Exception as e:
+            logger.warning(f"Batch of {len(documents)} events failed ({e}), writing them one by one")
+        
+        for association in associations:
+            self._ensure_association_exists(association)
+        success = 0
+        for event_id, title, event_data in documents:
+            try:
+                self.events_collection.document(event_id).set(event_data)
+                self._record_uploaded([event_data])
+                logger.debug(f"Uploaded event: {title}")
+                success += 1
+            except Exception as e:
+                logger.error(f"Failed to upload event '{title}': {e}")
+        return success, len(documents) - success
+    
+    def _missing_associations(self, associations: List[Association]) -> List[Association]:
+        """
+        Associations that do not exist in Firestore yet.
+        
+        The ones not already known are read with a single get_all; those found
+        are remembered for the lifetime of this instance.
+        """
+        unknown = [association for association in associations if association.id not in self._known_associations]
+        if not unknown:
+            return []
+        try:
+            snapshots = self.db.get_all([self.associations_collection.document(a.id) for a in unknown])
+            existing = {snapshot.id for snapshot in snapshots if snapshot.exists}
+        except Exception as e:
+            # Not creating them: they would overwrite associations that do exist
+            logger.error(f"Error prefetching associations: {e}")
+            return []
+        self._known_associations.update(existing)
+        return [association for association in unknown if association.id not in existing]
+    
+    def get_existing_event_ids(self, association_ids: Optional[Iterable[str]] = None,
+                               uploaded_since: Optional[datetime] = None) -> Set[str]:
+        """
+        Get existing event IDs from Firestore.
+        
+        Without arguments the whole events collection is read. Restricting
+        the query to the scraped associations, or to the events uploaded
+        recently, reads only the documents the run can collide with.
+        
+        Filtering on both needs the composite index on (association,
+        _uploadedAt) declared in firestore.indexes.json. If the scoped query
+        fails, e.g. because that index is missing, the whole collection is
+        read instead.
+        
+        Args:
+            association_ids: Only events of these associations
+            uploaded_since: Only events uploaded (_uploadedAt) at or after this time
             
+        Returns:
+            Set of event IDs
+            
+        Raises:
+            Exception: If the events collection cannot be read at all
+        """
+        if association_ids is not None or uploaded_since is not None:
+            try:
+                existing_ids = self._query_event_ids(association_ids, uploaded_since)
+                logger.info(f"Found {len(existing_ids)} existing events")
+                return existing_ids
+            except Exception as e:
+                logger.warning(f"Scoped lookup of existing events failed, reading all events instead: {e}")
+        
+        try:
+            existing_ids = self._query_event_ids(None, None)
         except Exception as e:
+            # An empty set would make every scraped event look new and be re-uploaded
             logger.error(f"Error getting existing events: {e}")
-            return []
+            raise
+        logger.info(f"Found {len(existing_ids)} existing events")
+        return existing_ids
+    
+    def _query_event_ids(self, association_ids: Optional[Iterable[str]],
+                         uploaded_since: Optional[datetime]) -> Set[str]:
+        """IDs of the events matching the get_existing_event_ids filters"""
+        query = self.events_collection.select(["id"])
+        if uploaded_since is not None:
+            query = query.where(filter=FieldFilter("_uploadedAt", ">=", uploaded_since))
         
-
+        if association_ids is None:
+            queries = [query]
+        else:
+            # Events reference their association document, and an "in" filter takes a limited number of values
+            references = [self.associations_collection.document(a) for a in dict.fromkeys(association_ids)]
+            size = config.FIRESTORE_IN_FILTER_LIMIT
+            queries = [
+                query.where(filter=FieldFilter("association", "in", references[i:i + size]))
+                for i in range(0, len(references), size)
+            ]
+        
+        return {doc.id for q in queries for doc in q.stream()}
+    
+    def events_exist(self, event_ids: Iterable[str]) -> Set[str]:
+        """
+        Check which events already exist, reading their documents in batched get_all calls.
+        
+        Args:
+            event_ids: Event IDs to check
+            
+        Returns:
+            The IDs among event_ids that exist in Firestore
+        """
+        event_ids = list(dict.fromkeys(event_ids))
+        existing = set()
+        size = config.FIRESTORE_GET_ALL_CHUNK
+        try:
+            for i in range(0, len(event_ids), size):
+                refs = [self.events_collection.document(event_id) for event_id in event_ids[i:i + size]]
+                # Only the document IDs are needed
+                snapshots = self.db.get_all(refs, field_paths=["id"])
+                existing.update(snapshot.id for snapshot in snapshots if snapshot.exists)
+        except Exception as e:
+            logger.error(f"Error checking if events exist: {e}")
+        return existing
+    
+    def iter_event_fingerprints(self, uploaded_since: Optional[datetime] = None
+                                ) -> Iterator[Tuple[str, Optional[str], Optional[datetime]]]:
+        """
+        Stream (event ID, content fingerprint, upload time) of the events, for the event index.
+        
+        Args:
+            uploaded_since: Only events uploaded (_uploadedAt) after this time
+        """
+        query = self.events_collection.select(["_fingerprint", "_uploadedAt"])
+        if uploaded_since is not None:
+            query = query.where(filter=FieldFilter("_uploadedAt", ">", uploaded_since))
+        for doc in query.stream():
+            data = doc.to_dict() or {}
+            yield doc.id, data.get("_fingerprint"), data.get("_uploadedAt")
+    
     def event_exists(self, event_id: str) -> bool:
         """
         Check if an event with given ID already exists.
@@ -137,17 +299,12 @@ class FirebaseDatabase:
         Returns:
             True if event exists, False otherwise
         """
-        try:
-            doc_ref = self.events_collection.document(event_id)
-            doc = doc_ref.get()
-            return doc.exists
-        except Exception as e:
-            logger.error(f"Error checking if event exists: {e}")
-            return False
+        return event_id in self.events_exist([event_id])
     
     def _ensure_association_exists(self, association: Association) -> bool:
         """
         Ensure an association exists in Firestore.
+        Associations already known to this instance are not read again.
         
         Args:
             association: Association object
@@ -155,6 +312,8 @@ class FirebaseDatabase:
         Returns:
             True if successful
         """
+        if association.id in self._known_associations:
+            return True
         try:
             assoc_ref = self.associations_collection.document(association.id)
             assoc_doc = assoc_ref.get()
@@ -165,6 +324,7 @@ class FirebaseDatabase:
                 assoc_ref.set(association_data)
                 logger.debug(f"Created association: {association.name}")
             
+            self._known_associations.add(association.id)
             return True
             
         except Exception as e:
@@ -187,12 +347,20 @@ class FirebaseDatabase:
         # Convert association to dictionary
          # event_dict["association"] = self._association_to_firestore_dict(event.association)
         
-        # Add timestamps
+        return self._add_upload_metadata(event_dict)
+    
+    def _add_upload_metadata(self, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the content fingerprint, upload timestamp and source to an event's Firestore dictionary"""
+        event_dict["_fingerprint"] = event_fingerprint(event_dict)
         event_dict["_uploadedAt"] = firestore.SERVER_TIMESTAMP
         event_dict["_source"] = "python_scraper"
-        
         return event_dict
     
+    def _record_uploaded(self, event_dicts: Iterable[Dict[str, Any]]):
+        """Add written events to the event index, if there is one"""
+        if self.event_index is not None:
+            self.event_index.add((event_dict["id"], event_dict.get("_fingerprint")) for event_dict in event_dicts)
+    
     def _association_to_firestore_dict(self, association: Association) -> Dict[str, Any]:
         """
         Convert Association object to Firestore dictionary.
@@ -0,0 +1,173 @@
+"""
+Local index of the events stored in Firestore
+Keeps the ID and a content fingerprint of every event in a SQLite file, so a
+run only reads from Firestore the events uploaded since the previous one
+(by their _uploadedAt timestamp) instead of the whole collection.
+"""
+import collections.abc
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Firestore fields making up an event's content (metadata fields start with "_")
+FINGERPRINT_FIELDS = ("title", "description", "location", "time", "association", "tags", "price", "pictureUrl")
+
+
+def event_fingerprint(event_dict: Dict[str, Any]) -> str:
+    """Hash of the content of an event's Firestore dictionary, equal for identical events"""
+    content = {field: event_dict.get(field) for field in FINGERPRINT_FIELDS}
+    # The association is a DocumentReference when built for Firestore, its ID otherwise
+    association = content["association"]
+    content["association"] = getattr(association, "id", association)
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(serialized.encode()).hexdigest()
+
+
+class EventIndex(collections.abc.Set):
+    """
+    SQLite-backed set of the event IDs in Firestore, with their content fingerprints
+    Safe to share between threads, and usable wherever a set of known IDs is expected
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: SQLite file holding the index
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS events (id TEXT PRIMARY KEY, fingerprint TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)")
+        self._conn.commit()
+
+    def __contains__(self, event_id: object) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM events WHERE id = ?", (event_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM events")]
+        return iter(ids)
+
+    def fingerprint(self, event_id: str) -> Optional[str]:
+        """Content fingerprint of an indexed event, None if unknown or not recorded"""
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint FROM events WHERE id = ?", (event_id,)).fetchone()
+        return row[0] if row else None
+
+    def unchanged_ids(self, event_dicts: Iterable[Dict[str, Any]]) -> Set[str]:
+        """
+        IDs of the events already in Firestore with the same content
+
+        Events whose fingerprint differs from the indexed one are left out, so
+        they are uploaded again. Events indexed without a fingerprint (uploaded
+        before fingerprints were recorded) count as unchanged.
+        """
+        unchanged = set()
+        with self._lock:
+            for event_dict in event_dicts:
+                row = self._conn.execute("SELECT fingerprint FROM events WHERE id = ?",
+                                         (event_dict["id"],)).fetchone()
+                if row and (row[0] is None or row[0] == event_fingerprint(event_dict)):
+                    unchanged.add(event_dict["id"])
+        return unchanged
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """Latest _uploadedAt read from Firestore, None before the first sync"""
+        with self._lock:
+            value = self._get_meta("watermark")
+        return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+    def add(self, entries: Iterable[Tuple[str, Optional[str]]]):
+        """Record (event ID, fingerprint) pairs, e.g. the events this run has just written"""
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?)", entries)
+            self._conn.commit()
+
+    def sync(self, db) -> int:
+        """
+        Bring the index up to date with Firestore.
+
+        The first sync, and one every config.EVENT_INDEX_FULL_SYNC_DAYS (which
+        drops events deleted from Firestore), reads the whole collection. The
+        others only read the events uploaded after the watermark.
+
+        Args:
+            db: FirebaseDatabase to read from
+
+        Returns:
+            Number of events read, 0 if reading failed (the index keeps its events)
+
+        Raises:
+            Exception: If reading fails before any full sync completed, as the
+                index would then be missing events
+        """
+        with self._lock:
+            watermark = self._get_meta("watermark")
+            full_sync_at = self._get_meta("full_sync")
+        full = full_sync_at is None or time.time() - full_sync_at > config.EVENT_INDEX_FULL_SYNC_DAYS * 86400
+        since = None
+        if not full and watermark is not None:
+            # Server timestamps are not assigned in commit order: start a bit before the watermark
+            since = datetime.fromtimestamp(watermark - config.EVENT_INDEX_SYNC_OVERLAP_SECONDS, tz=timezone.utc)
+
+        started = time.time()
+        read = 0
+        newest = watermark
+        try:
+            with self._lock:
+                if full:
+                    self._conn.execute("DELETE FROM events")
+                for event_id, fingerprint, uploaded_at in db.iter_event_fingerprints(uploaded_since=since):
+                    self._conn.execute("INSERT OR REPLACE INTO events VALUES (?, ?)", (event_id, fingerprint))
+                    read += 1
+                    if uploaded_at is not None and (newest is None or uploaded_at.timestamp() > newest):
+                        newest = uploaded_at.timestamp()
+                if newest is not None:
+                    self._set_meta("watermark", newest)
+                if full:
+                    self._set_meta("full_sync", started)
+                self._conn.commit()
+        except Exception as e:
+            with self._lock:
+                self._conn.rollback()
+            logger.error(f"Error syncing the event index: {e}")
+            if full_sync_at is None:
+                raise
+            return 0
+
+        logger.info(f"Event index: read {read} events ({'full' if full else 'incremental'} sync), "
+                    f"{len(self)} known")
+        return read
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _get_meta(self, key: str) -> Optional[float]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: float):
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
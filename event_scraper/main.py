@@ -6,19 +6,26 @@ Main script that runs all scrapers
 import sys
 import os
 import logging
-from typing import List
+from functools import partial
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import scrapers
-from scrapers.web_scraper import WebScraper
+from scrapers.site_runner import create_scraper, run_sites
+from scrapers.http_cache import get_http_cache
+from scrapers.http_session import get_shared_session
+from scrapers.politeness import get_politeness_scheduler
+from scrapers.deadline import Deadline
+from scrapers.selector_stats import get_selector_stats
+from scrapers.parse_pool import shutdown_parse_pool
 
 
 # Import configurations
 from scrapers.website_config import ALL_WEBSITES
 
 from firestore.database import FirebaseDatabase
-from models.event_models import Event
+from firestore.event_index import EventIndex
+from models.event_batch import EventBatch
 import config
 
 logger = logging.getLogger(__name__)
@@ -27,38 +34,81 @@ def main():
     """Run all scrapers"""
     logger.info("Starting EPFL Life Event Scraper")
     
+    # robots.txt and rate limits are re-read for every run
+    get_politeness_scheduler().reset()
+    
+    session = get_shared_session()
+    session.reset_stats()
+    http_cache = get_http_cache()
+    if http_cache:
+        http_cache.reset_stats()
+    
+    event_index = None
     try:
         # 1. Initialize Firebase
         db = FirebaseDatabase()
-        existing_ids = db.get_existing_event_ids()
-        
-        all_events = []
+        # Known events are indexed locally: only the events uploaded since the last run are read
+        event_index = db.event_index = EventIndex(config.EVENT_INDEX_PATH)
+        try:
+            event_index.sync(db)
+            existing_ids = event_index
+        except Exception as e:
+            # The index was never fully read: diffing against it would upload every event again
+            logger.warning(f"Event index unavailable, reading the existing event IDs from Firestore: {e}")
+            existing_ids = db.get_existing_event_ids()
         
-        # 2. Run WEB scrapers 
-        logger.info("Running WEB scrapers...")
-        for website_config in ALL_WEBSITES:
-            try:
-                scraper = WebScraper(website_config)
-                events = scraper.scrape()
-                all_events.extend(events)
-                logger.info(f"  {website_config.name}: {len(events)} events")
-            except Exception as e:
-                logger.error(f"  Failed to scrape {website_config.name}: {e}")
-        
-
+        total_events = 0
+        new_count = 0
+        changed_count = 0
         
-        # 4. Filter duplicates and upload
-        new_events = [e for e in all_events if e.id not in existing_ids]
+        # 2. Run WEB scrapers in parallel, uploading each site as soon as it finishes
+        site_names = ", ".join(website_config.name for website_config in ALL_WEBSITES)
+        logger.info(f"Running WEB scrapers for: {site_names}")
+        run_deadline = Deadline(config.RUN_DEADLINE_SECONDS)
+        # Listings are newest first: each site stops once it only finds known events.
+        # Sites with a feed_url are read from their feed, the others crawled with WebScraper.
+        scraper_factory = partial(create_scraper, run_deadline=run_deadline, known_ids=existing_ids)
+        for result in run_sites(ALL_WEBSITES, scraper_factory, max_workers=config.SITE_RUNNER_WORKERS):
+            if result.failed:
+                logger.error(f"  Failed to scrape {result.name}: {result.error}")
+            logger.info(f"  {result.name}: {len(result.events)} events")
+            
+            # 3. Filter duplicates and upload, along with the known events whose content changed
+            events = EventBatch.from_events(result.events)
+            new_events = events.exclude_ids(existing_ids)
+            if existing_ids is event_index:
+                upload = events.exclude_ids(event_index.unchanged_ids(events.to_firestore_dicts()))
+            else:
+                upload = new_events  # No fingerprints to compare against
+            total_events += len(result.events)
+            new_count += len(new_events)
+            changed_count += len(upload) - len(new_events)
+            
+            if upload:
+                results = db.upload_events_batch(upload)
+                logger.info(f"  {result.name}: Uploaded {results['success']}, Failed {results['failed']}")
         
-        logger.info(f"Total: {len(all_events)} events, New: {len(new_events)}")
+        logger.info(f"Total: {total_events} events, New: {new_count}, Changed: {changed_count}")
+        logger.info(f"HTTP: {session.stats_summary()}")
+        if http_cache:
+            logger.info(f"HTTP cache: {http_cache.stats_summary()}")
         
-        if new_events:
-            results = db.upload_events_batch(new_events)
-            logger.info(f"Uploaded: {results['success']}, Failed: {results['failed']}")
+        # 4. Early warning for markup changes, then keep this run's selector hits for the next one
+        selector_stats = get_selector_stats()
+        if selector_stats:
+            for collapse in selector_stats.collapsed():
+                logger.warning(f"⚠️ Selector {collapse}")
+            selector_stats.save()
         
     except Exception as e:
         logger.error(f"Error: {e}")
         return 1
+    finally:
+        shutdown_parse_pool()
+        if config.HTTP_CASSETTE_MODE == "record":
+            session.close()  # Writes the cassette
+        if event_index is not None:
+            event_index.close()
     
     return 0
 
@@ -0,0 +1,224 @@
+"""
+Columnar storage for many events
+An EventBatch keeps each event field in its own column (arrays for the
+numeric ones), so filtering, slicing and building Firestore payloads work on
+whole columns instead of one Event object at a time.
+"""
+import re
+from array import array
+from datetime import date
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from models.event_models import Association, Event, Location, Price
+
+# Day ordinal stored for events whose date could not be read
+UNKNOWN_DATE = 0
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+    # French month names used by some association sites
+    "janv": 1, "fév": 2, "fev": 2, "févr": 2, "mars": 3, "avr": 4, "mai": 5, "juin": 6,
+    "juil": 7, "aoû": 8, "août": 8, "sept": 9, "déc": 12,
+}
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_NAMED_MONTH_DATE = re.compile(r"(\d{1,2})(?:st|nd|rd|th|er)?\.?\s+([^\W\d_]+)\.?,?\s+(\d{4})")
+_NUMERIC_DATE = re.compile(r"(\d{1,2})[./](\d{1,2})[./](\d{4})")
+
+
+def parse_event_date(text: Optional[str]) -> Optional[date]:
+    """
+    Day of an event time string, None when it cannot be read
+
+    Understands the formats the scrapers produce: ISO 8601, "Sat 14 Feb 2026 - 08:00",
+    "8 May 2026", RSS dates ("Thu, 12 Mar 2026 12:15:00 +0100") and "14.02.2026".
+    """
+    if not text:
+        return None
+    try:
+        match = _ISO_DATE.search(text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        match = _NAMED_MONTH_DATE.search(text)
+        if match:
+            name = match.group(2).lower()
+            month = _MONTHS.get(name) or _MONTHS.get(name[:4]) or _MONTHS.get(name[:3])
+            if month:
+                return date(int(match.group(3)), month, int(match.group(1)))
+        match = _NUMERIC_DATE.search(text)
+        if match:
+            return date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+    except ValueError:
+        pass  # Day or month out of range
+    return None
+
+
+class EventBatch:
+    """
+    Events stored as columns
+
+    Slicing and filtering return views: batches sharing the columns of their
+    parent and only holding the positions of their rows. Only the batch that
+    owns the columns (not a view) can be appended to.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.descriptions: List[str] = []
+        self.times: List[str] = []
+        self.location_names: List[str] = []
+        self.tags: List[Sequence[str]] = []
+        self.picture_urls: List[Optional[str]] = []
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.prices = array("q")  # cents
+        self.dates = array("l")  # date ordinals, UNKNOWN_DATE when unreadable
+        self.association_codes = array("l")  # index in self.associations
+        self.associations: List[Association] = []
+        self._association_index: Dict[str, int] = {}
+        # Row positions of a view, None for the batch owning the columns
+        self._rows: Optional[Sequence[int]] = None
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> "EventBatch":
+        batch = cls()
+        for event in events:
+            batch.append(event)
+        return batch
+
+    def append(self, event: Event):
+        """Add an event as a new row"""
+        if self._rows is not None:
+            raise TypeError("Cannot append to a view of an EventBatch")
+        code = self._association_index.get(event.association.id)
+        if code is None or self.associations[code] != event.association:
+            code = self._association_index[event.association.id] = len(self.associations)
+            self.associations.append(event.association)
+        event_date = parse_event_date(event.time)
+
+        self.ids.append(event.id)
+        self.titles.append(event.title)
+        self.descriptions.append(event.description)
+        self.times.append(event.time)
+        self.location_names.append(event.location.name)
+        self.tags.append(event.tags)
+        self.picture_urls.append(event.picture_url)
+        self.latitudes.append(event.location.latitude)
+        self.longitudes.append(event.location.longitude)
+        self.prices.append(event.price.cents)
+        self.dates.append(event_date.toordinal() if event_date else UNKNOWN_DATE)
+        self.association_codes.append(code)
+
+    def rows(self) -> Sequence[int]:
+        """Positions of this batch's rows in the columns"""
+        return range(len(self.ids)) if self._rows is None else self._rows
+
+    def column(self, name: str) -> List[Any]:
+        """Values of a column (e.g. "ids", "prices") for this batch's rows"""
+        values = getattr(self, name)
+        if self._rows is None:
+            return list(values)
+        return [values[row] for row in self._rows]
+
+    def __len__(self) -> int:
+        return len(self.rows())
+
+    def __iter__(self) -> Iterator[Event]:
+        for row in self.rows():
+            yield self._event(row)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Event, "EventBatch"]:
+        if isinstance(key, slice):
+            # range and array slices copy (at most) the row positions, never the columns
+            return self._view(self.rows()[key])
+        return self._event(self.rows()[key])
+
+    def to_events(self) -> List[Event]:
+        return list(self)
+
+    # Filtering
+
+    def exclude_ids(self, ids: AbstractSet[str]) -> "EventBatch":
+        """Rows whose event ID is not in ids (e.g. the events already in the database)"""
+        event_ids = self.ids
+        return self._view(array("l", (row for row in self.rows() if event_ids[row] not in ids)))
+
+    def only_ids(self, ids: AbstractSet[str]) -> "EventBatch":
+        """Rows whose event ID is in ids"""
+        event_ids = self.ids
+        return self._view(array("l", (row for row in self.rows() if event_ids[row] in ids)))
+
+    def between_dates(self, start: Optional[date] = None, end: Optional[date] = None,
+                      keep_undated: bool = False) -> "EventBatch":
+        """Rows dated from start to end (both included, None for no bound)"""
+        low = start.toordinal() if start else 1
+        high = end.toordinal() if end else date.max.toordinal()
+        dates = self.dates
+        return self._view(array("l", (
+            row for row in self.rows()
+            if low <= dates[row] <= high or (keep_undated and dates[row] == UNKNOWN_DATE)
+        )))
+
+    def for_association(self, association_id: str) -> "EventBatch":
+        """Rows of one association"""
+        codes = {code for code, association in enumerate(self.associations) if association.id == association_id}
+        association_codes = self.association_codes
+        return self._view(array("l", (row for row in self.rows() if association_codes[row] in codes)))
+
+    def unique_associations(self) -> List[Association]:
+        """Associations of this batch's rows, each once"""
+        codes = self.association_codes
+        return [self.associations[code] for code in sorted({codes[row] for row in self.rows()})]
+
+    # Serialization
+
+    def to_firestore_dicts(self, db=None) -> List[Dict[str, Any]]:
+        """
+        Firestore payload of every row, as Event.to_firestore_dict() builds it
+
+        The association reference (or ID) is built once per association.
+        """
+        if db:
+            references = [db.collection("associations").document(association.id)
+                          for association in self.associations]
+        else:
+            references = [association.id for association in self.associations]
+
+        ids, titles, descriptions, times = self.ids, self.titles, self.descriptions, self.times
+        names, latitudes, longitudes = self.location_names, self.latitudes, self.longitudes
+        tags, prices, pictures, codes = self.tags, self.prices, self.picture_urls, self.association_codes
+        return [
+            {
+                "id": ids[row],
+                "title": titles[row],
+                "description": descriptions[row],
+                "location": {"latitude": latitudes[row], "longitude": longitudes[row], "name": names[row]},
+                "time": times[row],
+                "association": references[codes[row]],
+                "tags": list(tags[row]),
+                "price": prices[row],
+                "pictureUrl": pictures[row],
+            }
+            for row in self.rows()
+        ]
+
+    def _event(self, row: int) -> Event:
+        return Event(
+            id=self.ids[row],
+            title=self.titles[row],
+            description=self.descriptions[row],
+            location=Location(latitude=self.latitudes[row], longitude=self.longitudes[row],
+                              name=self.location_names[row]),
+            time=self.times[row],
+            association=self.associations[self.association_codes[row]],
+            tags=self.tags[row],
+            price=Price(cents=self.prices[row]),
+            picture_url=self.picture_urls[row],
+        )
+
+    def _view(self, rows: Sequence[int]) -> "EventBatch":
+        view = object.__new__(EventBatch)
+        view.__dict__.update(self.__dict__)
+        view._rows = rows
+        return view
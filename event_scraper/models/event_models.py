@@ -1,7 +1,9 @@
-from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, fields
+from typing import Optional, Dict, Any, Sequence, Tuple
 from enum import Enum
 import hashlib
+import sys
+import threading
 from google.cloud import firestore
 
 class EventCategory(Enum):
@@ -25,7 +27,7 @@ class EventCategory(Enum):
         """Convert to Firestore-compatible value"""
         return self.name
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Price:
     """
     Price value class - represents price in cents
@@ -41,7 +43,7 @@ class Price:
     
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Location:
     """
     Location data class - represents event location
@@ -50,6 +52,11 @@ class Location:
     longitude: float
     name: str
     
+    def __post_init__(self):
+        # The same few venue names come back for most events
+        if isinstance(self.name, str):
+            object.__setattr__(self, "name", sys.intern(self.name))
+    
     def to_firestore_dict(self) -> Dict[str, Any]:
         """
         Convert to Firestore-compatible dictionary
@@ -60,7 +67,7 @@ class Location:
             "name": self.name
         }
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Association:
     """
     Association data class - represents student associations
@@ -93,7 +100,37 @@ class Association:
             "socialLinks": self.social_links or {}  # Ensure never null
         }
 
-@dataclass
+# One Association instance per association id, shared by all its events
+_associations: Dict[str, Association] = {}
+_associations_lock = threading.Lock()
+# One tuple per distinct tag combination
+_tag_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_association(association: Association) -> Association:
+    """The shared instance equal to association (registered when it is new or changed)"""
+    if not isinstance(association, Association):
+        return association
+    shared = _associations.get(association.id)
+    if shared is association:
+        return shared
+    with _associations_lock:
+        shared = _associations.get(association.id)
+        if shared != association:
+            shared = _associations[association.id] = association
+        return shared
+
+
+def intern_tags(tags: Sequence[str]) -> Tuple[str, ...]:
+    """Shared tuple of interned tag strings"""
+    key = tuple(tags)
+    shared = _tag_tuples.get(key)
+    if shared is None:
+        shared = _tag_tuples.setdefault(key, tuple(sys.intern(tag) for tag in key))
+    return shared
+
+
+@dataclass(slots=True)
 class Event:
     """
     Event data class - represents university events
@@ -106,12 +143,23 @@ class Event:
     location: Location
     time: str
     association: Association
-    tags: List[str]
+    tags: Sequence[str]
     price: Price
     
     #With default values
     picture_url: Optional[str] = None  
     
+    def __post_init__(self):
+        # Events are held by the thousand for deduplication: share what repeats between them
+        self.association = intern_association(self.association)
+        self.tags = intern_tags(self.tags)
+        if isinstance(self.time, str):
+            self.time = sys.intern(self.time)
+    
+    def __reduce__(self):
+        # Rebuilt through __init__ so that unpickled events (e.g. from parse workers) are interned too
+        return (self.__class__, tuple(getattr(self, f.name) for f in fields(self)))
+    
     def to_firestore_dict(self, db=None) -> Dict[str, Any]:
         """
         Convert to Firestore-compatible dictionary
@@ -124,7 +172,7 @@ class Event:
             "location": self.location.to_firestore_dict(),
             "time": self.time,
             "association": self.association.to_firestore_dict(),
-            "tags": self.tags,
+            "tags": list(self.tags),
             "price": self.price.to_firestore_value(),
             "pictureUrl": self.picture_url
         }
@@ -140,6 +188,24 @@ class Event:
 
         return event_dict
     
+    @classmethod
+    def from_firestore_dict(cls, data: Dict[str, Any], association: Association) -> "Event":
+        """
+        Rebuild an event from to_firestore_dict() output
+        The association is passed in, the dictionary only holds its ID or reference
+        """
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            description=data["description"],
+            location=Location(**data["location"]),
+            time=data["time"],
+            association=association,
+            tags=data["tags"],
+            price=Price(cents=data["price"]),
+            picture_url=data.get("pictureUrl"),
+        )
+    
     @classmethod
     def generate_id(cls, title: str, source: str) -> str:
         """
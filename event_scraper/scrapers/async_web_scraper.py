@@ -0,0 +1,245 @@
+"""
+Asynchronous web scraper built on httpx
+Fetches the list page and detail pages of many websites on a single event loop
+"""
+import asyncio
+import logging
+from typing import AbstractSet, Any, List, Optional, Sequence, Tuple
+
+import httpx
+
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import WebsiteConfig, ALL_WEBSITES
+from scrapers.crawl_frontier import CrawlFrontier
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.html_backends import dispose
+from scrapers.http_session import HTML_CONTENT_TYPES, STREAM_CHUNK_SIZE, ResponseRejected
+from models.event_models import Event
+import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def create_async_client(max_in_flight: int = config.ASYNC_MAX_IN_FLIGHT) -> httpx.AsyncClient:
+    """Create the shared HTTP/2 keep-alive client used by every AsyncWebScraper"""
+    if not HTTP2_AVAILABLE:
+        logger.warning("h2 is not installed, AsyncWebScraper falls back to HTTP/1.1")
+
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        headers=config.REQUEST_HEADERS,
+        timeout=httpx.Timeout(config.READ_TIMEOUT, connect=config.CONNECT_TIMEOUT),
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=max_in_flight,
+            max_keepalive_connections=max_in_flight,
+        ),
+    )
+
+
+class AsyncWebScraper(WebScraper):
+    """
+    asyncio counterpart of WebScraper
+    Takes the same WebsiteConfig and follows the same crawl rules as WebScraper.iter_events():
+    pagination, max_events / stop_after_known, per-host politeness and body size / content
+    type limits. Only the HTTP layer is asynchronous; parsing runs in worker threads (or the
+    parse pool) so that it never blocks the other fetches on the event loop.
+    """
+
+    async def scrape_async(self, client: httpx.AsyncClient, in_flight: asyncio.Semaphore) -> List[Event]:
+        """
+        Scrape events from the configured website
+
+        Args:
+            client: Shared async HTTP client
+            in_flight: Global limit on requests in flight, shared by all sites
+        """
+        events = []
+        try:
+            await self._crawl_async(client, in_flight, events)
+
+        except Exception as e:
+            logger.error(f"Error scraping {self.source_name}: {e}")
+            self.last_error = str(e)
+
+        # On error, keep the events collected before it happened
+        logger.info(f"{self.source_name}: Found {len(events)} events")
+        return events
+
+    def scrape(self) -> List[Event]:
+        """Scrape events from the configured website on a private event loop (sets last_error like WebScraper)"""
+        async def run() -> List[Event]:
+            max_in_flight = config.ASYNC_MAX_IN_FLIGHT
+            async with create_async_client(max_in_flight) as client:
+                return await self.scrape_async(client, asyncio.Semaphore(max(1, max_in_flight)))
+        return asyncio.run(run())
+
+    async def _crawl_async(self, client: httpx.AsyncClient, in_flight: asyncio.Semaphore, events: List[Event]):
+        """Crawl the list pages of the website, appending events to events as each page is done"""
+        self.last_error = None
+        self.deadline = Deadline(self.config.deadline_seconds, parent=self.run_deadline)
+        frontier = CrawlFrontier(self.config.url, max_pages=self.config.max_pages)
+        consecutive_known = 0
+        stop_after_known = self.config.stop_after_known if self.known_ids else 0
+        # Per-site limit on top of the global one
+        site_limit = asyncio.Semaphore(max(1, self.config.detail_concurrency))
+
+        for page_url in frontier:
+            logger.info(f"Fetching from {page_url}")
+            content = await self._fetch_async(client, in_flight, page_url)
+            soup, candidates = await asyncio.to_thread(
+                self._read_list_page, content, page_url, frontier, self.config.max_events - len(events))
+
+            detailed_events = await asyncio.gather(*(
+                self._scrape_detailed_page_async(client, in_flight, site_limit, link)
+                for _, link in candidates
+            ))
+            page_events = await asyncio.to_thread(self._finish_list_page, soup, candidates, list(detailed_events))
+            del soup, candidates, detailed_events
+
+            for event in page_events:
+                events.append(event)
+
+                consecutive_known = consecutive_known + 1 if event.id in self.known_ids else 0
+                if stop_after_known and consecutive_known >= stop_after_known:
+                    logger.info(f"{self.source_name}: {consecutive_known} known events in a row, "
+                                f"stopping after {frontier.pages_visited} page(s)")
+                    return
+
+            if len(events) >= self.config.max_events:
+                logger.info(f"{self.source_name}: Reached the limit of {self.config.max_events} events")
+                return
+
+    def _read_list_page(self, content: bytes, page_url: str, frontier: CrawlFrontier,
+                        limit: int) -> Tuple[Any, List[Tuple[Any, Optional[str]]]]:
+        """Parse a list page, queue its next pages and return (tree, up to limit new candidates)"""
+        soup = self._parse_list_page(content)
+        for next_url in self._extract_next_pages(soup, page_url):
+            frontier.add_page(next_url)
+        candidates = [
+            (element, link) for element, link in self._collect_candidates(soup)
+            if not link or frontier.add_event(link)
+        ][:limit]
+        return soup, candidates
+
+    def _finish_list_page(self, soup, candidates: List[Tuple[Any, Optional[str]]],
+                          detailed_events: List[Optional[Event]]) -> List[Event]:
+        """Merge the detailed events of a list page with its list view, then drop the page tree"""
+        events = self._merge_detailed_events(candidates, detailed_events)
+        dispose(soup)
+        return events
+
+    async def _scrape_detailed_page_async(self, client: httpx.AsyncClient, in_flight: asyncio.Semaphore,
+                                          site_limit: asyncio.Semaphore, url: Optional[str]) -> Optional[Event]:
+        """Scrape detailed event page"""
+        if not url:
+            return None
+        if self.deadline.expired():
+            # Out of time: skip the page, the list view is used instead
+            logger.warning(f"  ⏱️ Time budget exhausted, skipping detailed page: {url}")
+            return None
+
+        try:
+            async with site_limit:
+                logger.info(f"  Visiting detailed page: {url}")
+                content = await self._fetch_async(client, in_flight, url)
+            # In a worker thread, which waits for the parse pool when it is enabled
+            return await asyncio.to_thread(self._parse_detailed_page, url, content)
+
+        except Exception as e:
+            logger.error(f"Error scraping detailed page {url}: {e}")
+            return None
+
+    async def _fetch_async(self, client: httpx.AsyncClient, in_flight: asyncio.Semaphore, url: str) -> bytes:
+        """
+        GET a page once the per-host politeness limits allow it, while holding a slot of the
+        global in-flight limit, within the site's time budget
+        """
+        if self.deadline.expired():
+            raise DeadlineExceeded(f"Time budget of {self.source_name} exhausted before {url}")
+        async with self.politeness.async_slot(self.config.base_domain, fetch=self._robots_fetcher(client, in_flight),
+                                              deadline=self.deadline):
+            async with in_flight:
+                if self.deadline.expired():
+                    raise DeadlineExceeded(f"Time budget of {self.source_name} exhausted before {url}")
+                # httpx timeouts apply per phase; wait_for bounds the whole request by the deadline
+                return await asyncio.wait_for(self._read_limited_async(client, url),
+                                              timeout=self.deadline.remaining())
+
+    async def _read_limited_async(self, client: httpx.AsyncClient, url: str) -> bytes:
+        """Stream a page, aborting it as read_limited() does on its content type or size"""
+        max_bytes = self.config.max_body_bytes
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            media_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            announced = response.headers.get("Content-Length", "")
+            try:
+                if media_type and media_type not in HTML_CONTENT_TYPES:
+                    raise ResponseRejected(f"Unexpected content type {media_type}")
+                if announced.isdigit() and int(announced) > max_bytes:
+                    raise ResponseRejected(f"Body of {announced} bytes exceeds {max_bytes}")
+
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ResponseRejected(f"Body exceeds {max_bytes} bytes")
+                    chunks.append(chunk)
+
+            except ResponseRejected as e:
+                logger.warning(f"Aborted {url}: {e}")
+                raise
+        return b"".join(chunks)
+
+    def _robots_fetcher(self, client: httpx.AsyncClient, in_flight: asyncio.Semaphore):
+        """Coroutine function GETting robots.txt for the politeness scheduler"""
+        async def fetch(url: str, **kwargs) -> httpx.Response:
+            async with in_flight:
+                return await client.get(url, timeout=httpx.Timeout(config.READ_TIMEOUT,
+                                                                   connect=config.CONNECT_TIMEOUT))
+        return fetch
+
+
+async def scrape_websites_async(website_configs: Sequence[WebsiteConfig] = ALL_WEBSITES,
+                                max_in_flight: int = config.ASYNC_MAX_IN_FLIGHT,
+                                client: Optional[httpx.AsyncClient] = None,
+                                run_deadline: Optional[Deadline] = None,
+                                known_ids: Optional[AbstractSet[str]] = None) -> List[List[Event]]:
+    """
+    Scrape every website concurrently on the running event loop
+
+    Args:
+        website_configs: Websites to scrape
+        max_in_flight: Maximum number of requests in flight across all websites
+        client: Optional client to use instead of a new HTTP/2 client
+        run_deadline: Time budget of the whole run, bounding each site's own budget
+        known_ids: IDs of events already in the database, used to stop incremental crawls early
+
+    Returns:
+        One list of events per website, in the order of website_configs
+    """
+    in_flight = asyncio.Semaphore(max(1, max_in_flight))
+    scrapers = [AsyncWebScraper(website_config, run_deadline=run_deadline, known_ids=known_ids)
+                for website_config in website_configs]
+
+    if client is not None:
+        return list(await asyncio.gather(*(s.scrape_async(client, in_flight) for s in scrapers)))
+
+    async with create_async_client(max_in_flight) as own_client:
+        return list(await asyncio.gather(*(s.scrape_async(own_client, in_flight) for s in scrapers)))
+
+
+def scrape_websites(website_configs: Sequence[WebsiteConfig] = ALL_WEBSITES,
+                    max_in_flight: int = config.ASYNC_MAX_IN_FLIGHT,
+                    run_deadline: Optional[Deadline] = None,
+                    known_ids: Optional[AbstractSet[str]] = None) -> List[List[Event]]:
+    """Synchronous entry point running scrape_websites_async on a new event loop"""
+    return asyncio.run(scrape_websites_async(website_configs, max_in_flight, run_deadline=run_deadline,
+                                             known_ids=known_ids))
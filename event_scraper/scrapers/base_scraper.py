@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List
-from models.event_models import Event
+from typing import List, Optional
+from models.event_models import Event, Price
+from models.event_batch import EventBatch
+from config import MAX_FIELD_LENGTHS
 import logging
+import re
 
 class BaseScraper(ABC):
     """Abstract base class for all platform scrapers"""
@@ -9,14 +12,98 @@ class BaseScraper(ABC):
     def __init__(self, source_name: str):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.source_name = source_name
+        # Error that made the last scrape() fail, if any
+        self.last_error: Optional[str] = None
     
     @abstractmethod
     def scrape(self) -> List[Event]:  
         """Main scraping method - must be implemented by subclasses"""
         pass
     
+    def scrape_batch(self) -> EventBatch:
+        """
+        Scrape into a columnar EventBatch
+        
+        Scrapers producing events through iter_events() fill the batch as events
+        come, without building a list first.
+        """
+        iter_events = getattr(self, "iter_events", None)
+        if iter_events is None:
+            return EventBatch.from_events(self.scrape())
+        
+        batch = EventBatch()
+        try:
+            for event in iter_events():
+                batch.append(event)
+        except Exception as e:
+            self.logger.error(f"Error scraping {self.source_name}: {e}")
+            self.last_error = str(e)
+        
+        # On error, keep the events collected before it happened
+        self.logger.info(f"{self.source_name}: Found {len(batch)} events")
+        return batch
+    
     def log_results(self, events: List[Event]):
         """Standardized logging for all scrapers"""
         self.logger.info(f"{self.source_name}: Found {len(events)} events")
-    
-    
\ No newline at end of file
+
+    def _generate_tags(self, title: str, description: str) -> List[str]:
+        """Generate tags based on content"""
+        tags = []
+        text = (title + " " + description).lower()
+        
+        
+        if any(word in text for word in ["ski", "snowboard", "bouldering", "sport", "hike"]):
+            tags.append("Sports")
+        if any(word in text for word in ["party", "social", "dinner", "apero", "drinks"]):
+            tags.append("Social")
+        if any(word in text for word in ["weekend", "trip", "travel", "excursion"]):
+            tags.append("Trip")
+        if any(word in text for word in ["workshop", "course", "tutorial", "lecture"]):
+            tags.append("Workshop")
+        if any(word in text for word in ["market", "christmas", "festive"]):
+            tags.append("Cultural")
+        if any(word in text for word in ["chocolate", "food", "dinner", "sushi"]):
+            tags.append("Food")
+        
+        return tags
+
+    def _safe_truncate(self, text: str, field: str) -> str:
+        """Safely truncate text to max length for field"""
+        
+        if not text:
+            return text
+        
+        max_len = MAX_FIELD_LENGTHS.get(field, 500)
+        return text.strip()[:max_len]
+
+    def _parse_price(self, price_text: Optional[str]) -> Price:
+        """Parse price text robustly"""
+        if not price_text:
+            return Price(cents=0)
+        
+        price_text = price_text.lower()
+        
+        # 2. Look for "free" first if there are no numbers following
+        if "free" in price_text and not re.search(r'\d+', price_text):
+            return Price(cents=0)
+        
+        # 2. Looks for common
+        patterns = [
+            r'chf\s*(\d+\.?\d*)',          # "CHF 5"
+            r'(\d+\.?\d*)\s*chf',          # "5 CHF"
+            r'(\d+)\s*\.-',                # "5.-"
+            r'entry\s*:\s*(\d+)',          # "Entry: 5"
+            r'entrée\s*:\s*(\d+)',         # "Entrée: 5"
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, price_text, re.IGNORECASE)
+            if match:
+                try:
+                    amount = float(match.group(1))
+                    return Price(cents=int(amount * 100))
+                except ValueError:
+                    pass
+        
+        return Price(cents=0)
@@ -0,0 +1,179 @@
+"""
+Record/replay HTTP transport for offline, deterministic scraper runs
+RecordingAdapter stores every request/response exchange in a cassette file,
+ReplayAdapter serves them back, optionally with artificial latency, so
+parsing, concurrency and caching can be benchmarked without the live sites
+"""
+import base64
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+from scrapers.crawl_frontier import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of a cassette changes; older files are refused
+CASSETTE_VERSION = 1
+# Request headers worth keeping to understand a recording; cookies and the like are dropped
+RECORDED_REQUEST_HEADERS = ("Accept", "Accept-Encoding", "If-None-Match", "If-Modified-Since")
+# Bodies are stored decoded, so these no longer describe them
+DROPPED_RESPONSE_HEADERS = ("Content-Encoding", "Transfer-Encoding", "Content-Length", "Connection")
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+class Cassette:
+    """
+    Gzipped JSON file of HTTP exchanges, in recording order
+
+    Layout: {"version": 1, "interactions": [{"request": {...}, "response": {...}}]}
+    with response bodies in base64.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: List[Dict] = []
+        self._lock = threading.Lock()
+        # Recorded responses and replay position of every (method, canonical url)
+        self._responses: Dict[Tuple[str, str], List[Dict]] = {}
+        self._played: Dict[Tuple[str, str], int] = {}
+        # Number of interactions in the file, to skip saves with nothing new
+        self._saved = 0
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')} in {path}")
+        for interaction in data["interactions"]:
+            cassette._add(interaction)
+        cassette._saved = len(cassette.interactions)
+        logger.info(f"Loaded {len(cassette.interactions)} HTTP exchanges from {path}")
+        return cassette
+
+    def save(self):
+        """Write the cassette atomically, so an interrupted run never leaves a truncated file"""
+        with self._lock:
+            if self._saved == len(self.interactions) and os.path.exists(self.path):
+                return
+            data = {"version": CASSETTE_VERSION, "interactions": list(self.interactions)}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._saved = len(data["interactions"])
+        logger.info(f"Saved {self._saved} HTTP exchanges to {self.path}")
+
+    def record(self, request: requests.PreparedRequest, status: int, reason: str,
+               headers: Dict[str, str], body: bytes):
+        with self._lock:
+            self._add({
+                "request": {
+                    "method": request.method,
+                    "url": request.url,
+                    "headers": {name: request.headers[name] for name in RECORDED_REQUEST_HEADERS
+                                if name in request.headers},
+                },
+                "response": {
+                    "status": status,
+                    "reason": reason,
+                    "headers": {name: value for name, value in headers.items()
+                                if name not in DROPPED_RESPONSE_HEADERS},
+                    "body": base64.b64encode(body).decode("ascii"),
+                },
+            })
+
+    def _add(self, interaction: Dict):
+        self.interactions.append(interaction)
+        request = interaction["request"]
+        key = (request["method"], canonicalize_url(request["url"]))
+        self._responses.setdefault(key, []).append(interaction["response"])
+
+    def play(self, method: str, url: str) -> Optional[Dict]:
+        """
+        Next recorded response for a request, None if it was never recorded
+
+        Repeated requests get the recorded responses in order, the last one is
+        served again once they are used up.
+        """
+        key = (method, canonicalize_url(url))
+        with self._lock:
+            matches = self._responses.get(key)
+            if not matches:
+                return None
+            position = self._played.get(key, 0)
+            self._played[key] = position + 1
+            return matches[min(position, len(matches) - 1)]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that also records every exchange in a cassette
+    The cassette file is written once, when the adapter (or its session) is closed
+    """
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Read here even for streamed requests: recordings are made offline, not under size limits
+        body = response.content
+        self.cassette.record(request, response.status_code, response.reason, dict(response.headers), body)
+        return response
+
+    def close(self):
+        self.cassette.save()
+        super().close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Adapter answering from a cassette, never touching the network"""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0, **kwargs):
+        """
+        Args:
+            cassette: Recorded exchanges
+            latency: Seconds of artificial delay added to every response
+        """
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.latency = latency
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recorded = self.cassette.play(request.method, request.url)
+        if recorded is None:
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}", request=request)
+        if self.latency:
+            time.sleep(self.latency)
+
+        body = base64.b64decode(recorded["body"])
+        headers = dict(recorded["headers"])
+        headers["Content-Length"] = str(len(body))
+        raw = HTTPResponse(
+            body=BytesIO(body),
+            headers=headers,
+            status=recorded["status"],
+            reason=recorded["reason"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
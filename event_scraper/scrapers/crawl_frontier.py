@@ -0,0 +1,78 @@
+"""
+Crawl frontier for paginated event listings
+Keeps the queue of list pages still to visit and remembers every page and
+event URL already seen, in canonical form
+"""
+from collections import deque
+from typing import Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change the content of a page
+IGNORED_QUERY_PARAMS = ("utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "fbclid")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent spellings compare equal
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query and removes trailing slashes.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in IGNORED_QUERY_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class CrawlFrontier:
+    """
+    Breadth-first queue of list pages with a page limit
+
+    Iterating over the frontier hands out the next unvisited page until the
+    queue is empty or max_pages pages have been handed out; pages added while
+    iterating are picked up.
+    """
+
+    def __init__(self, start_url: str, max_pages: int = 1):
+        self.max_pages = max_pages
+        self.pages_visited = 0
+        self._queue = deque()
+        self._seen_pages = set()
+        self._seen_events = set()
+        self.add_page(start_url)
+
+    def add_page(self, url: Optional[str]) -> bool:
+        """Queue a list page, returns False if it was already seen"""
+        if not url:
+            return False
+        canonical = canonicalize_url(url)
+        if canonical in self._seen_pages:
+            return False
+        self._seen_pages.add(canonical)
+        self._queue.append(url)
+        return True
+
+    def add_event(self, url: str) -> bool:
+        """Record an event URL, returns False if the event was already seen"""
+        canonical = canonicalize_url(url)
+        if canonical in self._seen_events:
+            return False
+        self._seen_events.add(canonical)
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        while self._queue and self.pages_visited < self.max_pages:
+            self.pages_visited += 1
+            yield self._queue.popleft()
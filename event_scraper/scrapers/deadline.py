@@ -0,0 +1,68 @@
+"""
+Wall-clock time budgets for scraping
+A site deadline is nested in the run deadline, so it never outlives it
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request is attempted after its time budget ran out"""
+
+
+# Deadline of the request being sent, read by the HTTP retry policy
+_active_deadline: ContextVar[Optional["Deadline"]] = ContextVar("active_deadline", default=None)
+
+
+class Deadline:
+    """Wall-clock budget, optionally bounded by a parent budget"""
+
+    def __init__(self, seconds: Optional[float], parent: Optional["Deadline"] = None,
+                 clock: Optional[Callable[[], float]] = None):
+        """
+        Start a new budget.
+
+        Args:
+            seconds: Budget in seconds, None for no limit of its own
+            parent: Enclosing budget (e.g. the run for a site)
+            clock: Monotonic clock, time.monotonic by default
+        """
+        self._clock = clock or time.monotonic
+        self._expires_at = self._clock() + seconds if seconds is not None else None
+        self.parent = parent
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), None when unlimited"""
+        remaining = None
+        if self._expires_at is not None:
+            remaining = max(0.0, self._expires_at - self._clock())
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None:
+                remaining = parent_remaining if remaining is None else min(remaining, parent_remaining)
+        return remaining
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cap(self, timeout: float) -> float:
+        """Shorten a timeout so it does not run past the deadline"""
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    @contextmanager
+    def applied(self) -> Iterator[None]:
+        """Bound the retries of the requests sent meanwhile (in this thread) by this deadline"""
+        token = _active_deadline.set(self)
+        try:
+            yield
+        finally:
+            _active_deadline.reset(token)
+
+
+def active_deadline() -> Optional[Deadline]:
+    """Deadline applied to the request being sent, None when unbounded"""
+    return _active_deadline.get()
@@ -0,0 +1,126 @@
+"""
+Single-pass field extraction
+An ExtractionPlan matches the selectors of every field during one walk over
+an element's subtree, instead of one select_one() scan per field and selector
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import Tag
+from soupsieve.css_match import CSSMatch
+
+from scrapers.html_backends import SKIPPED_SELECTORS, compile_selector
+
+
+_TAG_NAME = re.compile(r"[A-Za-z][\w-]*")
+
+
+def required_tag(selector: str) -> Optional[str]:
+    """
+    Tag name every element matched by the selector must have, if any
+
+    Read from the selector's last compound ("div.content p" -> "p"); None for
+    selector groups and compounds without a tag name.
+    """
+    depth = 0
+    start = 0
+    for position, char in enumerate(selector):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0:
+            if char == ",":
+                return None
+            if char.isspace() or char in ">+~":
+                start = position + 1
+    match = _TAG_NAME.match(selector, start)
+    return match.group(0).lower() if match else None
+
+
+def has_text(element) -> bool:
+    return bool(element.text.strip())
+
+
+def has_src(element) -> bool:
+    return bool(element.get('src'))
+
+
+class ExtractionPlan:
+    """
+    Selectors of all fields, in priority order, matched in one pass
+
+    run() returns the first element (in document order) matched by each
+    selector, exactly what select_one() would have returned. A selector stops
+    being matched once it has matched, and lower-priority selectors of a field
+    are dropped as soon as a higher-priority one produced a usable value.
+    """
+
+    def __init__(self, fields: Dict[str, Tuple[List[str], Callable[[Any], bool]]]):
+        """
+        Args:
+            fields: Field name -> (selectors in priority order, test of a usable match)
+        """
+        self.fields = {
+            name: ([compile_selector(selector) for selector in selectors if selector.strip() not in SKIPPED_SELECTORS],
+                   is_usable)
+            for name, (selectors, is_usable) in fields.items()
+        }
+
+    def run(self, element: Tag) -> Dict[str, Tag]:
+        """First match of every selector that can still decide a field (selector -> element)"""
+        needed = {name: selectors for name, (selectors, _) in self.fields.items()}
+        matches: Dict[str, Tag] = {}
+        usable: Dict[Tuple[Callable, str], bool] = {}
+        active = self._active(needed, matches)
+        # One matcher per selector for the whole walk; SoupSieve.match() would build one per call
+        matchers = {
+            selector: CSSMatch(selector.compiled.selectors, element, selector.compiled.namespaces,
+                               selector.compiled.flags).match
+            for selector in active
+        }
+        # Cheap tag name check before the full soupsieve match
+        tag_names = {selector: required_tag(selector) for selector in active}
+
+        for tag in element.descendants:
+            if not active:
+                break
+            if not isinstance(tag, Tag):
+                continue
+            matched = False
+            for selector in active:
+                tag_name = tag_names[selector]
+                if tag_name is not None and tag_name != tag.name:
+                    continue
+                if matchers[selector](tag):
+                    matches[selector] = tag
+                    matched = True
+            if matched:
+                self._trim(needed, matches, usable)
+                active = self._active(needed, matches)
+        return matches
+
+    def _trim(self, needed: Dict[str, List], matches: Dict[str, Tag], usable: Dict[Tuple[Callable, str], bool]):
+        """Drop the selectors ranked below a field's best usable match"""
+        for name, selectors in needed.items():
+            is_usable = self.fields[name][1]
+            for position, selector in enumerate(selectors):
+                if selector not in matches:
+                    continue
+                key = (is_usable, selector)
+                if key not in usable:
+                    # Text of big blocks is only computed once per element
+                    usable[key] = is_usable(matches[selector])
+                if usable[key]:
+                    needed[name] = selectors[:position + 1]
+                    break
+
+    @staticmethod
+    def _active(needed: Dict[str, List], matches: Dict[str, Tag]) -> List:
+        """Selectors still worth matching, without duplicates"""
+        active = {}
+        for selectors in needed.values():
+            for selector in selectors:
+                if selector not in matches:
+                    active[selector] = None
+        return list(active)
@@ -0,0 +1,345 @@
+"""
+Feed scraper for RSS, Atom and iCalendar exports
+One feed request replaces a list page and its detailed pages. Feeds are
+parsed incrementally: each item becomes an Event as soon as it is complete
+and is then dropped from the tree.
+"""
+import codecs
+import html
+import logging
+import re
+import xml.etree.ElementTree as ElementTree
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+from typing import AbstractSet, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from scrapers.base_scraper import BaseScraper
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.http_session import get_shared_session, iter_limited
+from scrapers.politeness import get_politeness_scheduler
+from scrapers.website_config import WebsiteConfig
+from models.event_models import Event, Location
+import config
+
+logger = logging.getLogger(__name__)
+
+FEED_CONTENT_TYPES = (
+    "application/rss+xml", "application/atom+xml", "application/rdf+xml", "application/xml", "text/xml",
+    "text/calendar", "text/plain",
+)
+
+ICAL_MAGIC = b"BEGIN:VCALENDAR"
+LEADING_BYTES = b"\xef\xbb\xbf \t\r\n"  # UTF-8 BOM and blank lines
+
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass
+class FeedEntry:
+    """Fields of one feed item or calendar event"""
+    title: Optional[str] = None
+    date: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    link: Optional[str] = None
+    image: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class FeedScraper(BaseScraper):
+    """Scraper reading the events of a website from its RSS, Atom or iCal feed (WebsiteConfig.feed_url)"""
+
+    def __init__(self, website_config: WebsiteConfig, run_deadline: Optional[Deadline] = None,
+                 known_ids: Optional[AbstractSet[str]] = None):
+        """
+        Args:
+            website_config: Website configuration with a feed_url
+            run_deadline: Time budget of the whole run, bounding the site's own budget
+            known_ids: IDs of events already in the database, used to stop early
+        """
+        super().__init__(website_config.name)
+        self.config = website_config
+        self.session = get_shared_session()
+        self.run_deadline = run_deadline
+        self.deadline = Deadline(self.config.deadline_seconds, parent=run_deadline)
+        self.politeness = get_politeness_scheduler()
+        self.known_ids = known_ids if known_ids is not None else frozenset()
+        logger.info(f"Initialized FeedScraper for: {self.source_name}")
+
+    def scrape(self) -> List[Event]:
+        """Read events from the configured feed"""
+        events = []
+        try:
+            for event in self.iter_events():
+                events.append(event)
+
+        except Exception as e:
+            logger.error(f"Error scraping {self.source_name}: {e}")
+            self.last_error = str(e)
+
+        # On error, keep the events collected before it happened
+        logger.info(f"{self.source_name}: Found {len(events)} events")
+        return events
+
+    def iter_events(self) -> Iterator[Event]:
+        """
+        Yield the events of the feed, in feed order
+
+        Stops after WebsiteConfig.max_events events, or once
+        WebsiteConfig.stop_after_known consecutive events are already known.
+        """
+        self.last_error = None
+        self.deadline = Deadline(self.config.deadline_seconds, parent=self.run_deadline)
+        logger.info(f"Fetching feed {self.config.feed_url}")
+        produced = 0
+        consecutive_known = 0
+        stop_after_known = self.config.stop_after_known if self.known_ids else 0
+
+        with self._stream(self.config.feed_url) as response:
+            # Items are parsed as their bytes arrive, max_body_bytes is enforced while reading
+            chunks = iter_limited(self.session, response, self.config.max_body_bytes, FEED_CONTENT_TYPES)
+            for entry in iter_feed_entries(chunks):
+                event = self._create_event(entry)
+                if event is None:
+                    continue
+                produced += 1
+                yield event
+
+                consecutive_known = consecutive_known + 1 if event.id in self.known_ids else 0
+                if stop_after_known and consecutive_known >= stop_after_known:
+                    logger.info(f"{self.source_name}: {consecutive_known} known events in a row, stopping")
+                    return
+                if produced >= self.config.max_events:
+                    logger.info(f"{self.source_name}: Reached the limit of {self.config.max_events} events")
+                    return
+
+    @contextmanager
+    def _stream(self, url: str) -> Iterator[requests.Response]:
+        """
+        GET the feed once the per-host politeness limits allow it, within the site's time budget
+
+        The body is left unread, for the caller to stream. The connection slot is
+        held, and the response closed, when the caller is done with it.
+        """
+        if self.deadline.expired():
+            raise DeadlineExceeded(f"Time budget of {self.source_name} exhausted before {url}")
+        with self.politeness.slot(self.config.base_domain, fetch=self._get_robots, deadline=self.deadline):
+            # The budget may have run out while waiting for the slot
+            timeout = self._timeout()
+            with self.deadline.applied():
+                response = self.session.get(url, timeout=timeout, stream=True)
+            try:
+                response.raise_for_status()
+                yield response
+            finally:
+                response.close()
+
+    def _get_robots(self, url: str, **kwargs) -> requests.Response:
+        """GET robots.txt for the politeness scheduler"""
+        timeout = self._timeout()
+        with self.deadline.applied():
+            return self.session.get(url, timeout=timeout)
+
+    def _timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeouts, shortened so they never run past the deadline"""
+        remaining = self.deadline.remaining()
+        if remaining is None:
+            return (config.CONNECT_TIMEOUT, config.READ_TIMEOUT)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Time budget of {self.source_name} exhausted")
+        return (min(config.CONNECT_TIMEOUT, remaining), min(config.READ_TIMEOUT, remaining))
+
+    def _create_event(self, entry: FeedEntry) -> Optional[Event]:
+        """Event of a feed entry, None when it has no title"""
+        if not entry.title:
+            return None
+        title = entry.title
+        description = entry.description or (
+            f"Event organized by {self.source_name}. {title}. Visit event page for details."
+        )
+        has_geo = entry.latitude is not None and entry.longitude is not None
+        location = Location(
+            latitude=entry.latitude if has_geo else self.config.coordinates["latitude"],
+            longitude=entry.longitude if has_geo else self.config.coordinates["longitude"],
+            name=(entry.location or self.config.default_location)[:100],
+        )
+        return Event(
+            id=Event.generate_id(title, self.source_name),
+            title=self._safe_truncate(title, "title"),
+            description=self._safe_truncate(description, "description"),
+            location=location,
+            time=entry.date or "Date TBA",
+            association=self.config.association,
+            tags=self._generate_tags(title, description),
+            price=self._parse_price(description),
+            picture_url=entry.image,
+        )
+
+
+def iter_feed_entries(chunks: Iterable[bytes]) -> Iterator[FeedEntry]:
+    """Entries of an RSS, Atom or iCalendar feed, told apart by its first bytes"""
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head.lstrip(LEADING_BYTES)) >= len(ICAL_MAGIC):
+            break
+    # Blank lines before an XML declaration would be a syntax error
+    head = head.lstrip(LEADING_BYTES)
+    chunks = chain([head], chunks)
+    if head.upper().startswith(ICAL_MAGIC):
+        return iter_ical_entries(chunks)
+    return iter_xml_entries(chunks)
+
+
+# RSS and Atom
+
+XML_ENTRY_TAGS = {"item", "entry"}
+
+
+def iter_xml_entries(chunks: Iterable[bytes]) -> Iterator[FeedEntry]:
+    """Items of an RSS 2.0 / RSS 1.0 feed or entries of an Atom feed"""
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    parents = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == "start":
+                parents.append(element)
+                continue
+            parents.pop()
+            if _local_name(element.tag) in XML_ENTRY_TAGS:
+                yield _xml_entry(element)
+                # Only the current item is kept in memory
+                if parents:
+                    parents[-1].remove(element)
+    parser.close()
+
+
+def _xml_entry(item: ElementTree.Element) -> FeedEntry:
+    entry = FeedEntry()
+    for child in item:
+        name = _local_name(child.tag)
+        text = (child.text or "").strip()
+        if name == "title":
+            entry.title = _plain_text(text)
+        elif name == "link":
+            # Atom: <link rel="alternate" href="..."/>, RSS: <link>...</link>
+            if child.get("href") and child.get("rel", "alternate") == "alternate":
+                entry.link = child.get("href")
+            elif text:
+                entry.link = text
+        elif name in ("description", "summary") or (name == "content" and "url" not in child.attrib):
+            entry.description = entry.description or _plain_text(text)
+        elif name == "startdate":  # RSS event module (ev:startdate)
+            entry.date = text or None
+        # pubDate, published and updated date the post, not the event: without ev:startdate the date is unknown
+        elif name == "location":
+            entry.location = _plain_text(text)
+        elif name in ("enclosure", "content", "thumbnail") and not entry.image:
+            if child.get("url") and child.get("type", "image/").startswith("image/"):
+                entry.image = child.get("url")
+    return entry
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _plain_text(value: str) -> Optional[str]:
+    """Text of an HTML fragment (feeds often carry escaped HTML)"""
+    text = _SPACES.sub(" ", html.unescape(_TAGS.sub(" ", value))).strip()
+    return text or None
+
+
+# iCalendar (RFC 5545)
+
+_ICAL_ESCAPES = re.compile(r"\\([\\;,nN])")
+
+
+def iter_ical_entries(chunks: Iterable[bytes]) -> Iterator[FeedEntry]:
+    """VEVENTs of an iCalendar file"""
+    entry = None
+    for name, params, value in _ical_properties(_ical_lines(chunks)):
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            entry = FeedEntry()
+        elif entry is None:
+            continue
+        elif name == "END" and value.upper() == "VEVENT":
+            yield entry
+            entry = None
+        elif name == "SUMMARY":
+            entry.title = _ical_text(value)
+        elif name == "DESCRIPTION":
+            entry.description = _ical_text(value)
+        elif name == "LOCATION":
+            entry.location = _ical_text(value)
+        elif name == "URL":
+            entry.link = value.strip() or None
+        elif name == "DTSTART":
+            entry.date = _ical_date(value)
+        elif name == "GEO":
+            latitude, _, longitude = value.partition(";")
+            try:
+                entry.latitude, entry.longitude = float(latitude), float(longitude)
+            except ValueError:
+                pass
+        elif name == "ATTACH" and params.get("FMTTYPE", "").startswith("image/"):
+            entry.image = value.strip()
+
+
+def _ical_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Unfolded content lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    texts = chain((decoder.decode(chunk) for chunk in chunks), [decoder.decode(b"", final=True) + "\n"])
+    pending = ""
+    current = None
+    for text in texts:
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line = line.rstrip("\r")
+            if line[:1] in (" ", "\t") and current is not None:
+                current += line[1:]  # Folded continuation of the previous line
+                continue
+            if current is not None:
+                yield current
+            current = line
+    if current is not None:
+        yield current
+
+
+def _ical_properties(lines: Iterable[str]) -> Iterator[Tuple[str, dict, str]]:
+    """(NAME, {PARAM: value}, value) of each content line"""
+    for line in lines:
+        head, separator, value = line.partition(":")
+        if not separator:
+            continue
+        name, *params = head.split(";")
+        yield (name.strip().upper(),
+               {key.upper(): val.strip('"') for key, _, val in (param.partition("=") for param in params)},
+               value)
+
+
+def _ical_text(value: str) -> Optional[str]:
+    text = _ICAL_ESCAPES.sub(lambda match: "\n" if match.group(1) in "nN" else match.group(1), value).strip()
+    return text or None
+
+
+def _ical_date(value: str) -> Optional[str]:
+    """DTSTART as ISO 8601 (20260214T080000Z -> 2026-02-14T08:00:00Z)"""
+    value = value.strip()
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            parsed = datetime.strptime(value.rstrip("Z"), fmt)
+        except ValueError:
+            continue
+        iso = parsed.date().isoformat() if fmt == "%Y%m%d" else parsed.isoformat()
+        return iso + ("Z" if value.endswith("Z") else "")
+    return value or None
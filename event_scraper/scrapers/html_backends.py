@@ -0,0 +1,319 @@
+"""
+Pluggable HTML parser backends and pre-compiled CSS selectors
+Every backend returns a document exposing the small selector API the scrapers
+use: select(), select_one(), get(), [] and .text, as BeautifulSoup tags do
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.dammit import UnicodeDammit
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401  (used by BeautifulSoup's "lxml" builder)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+HTML_PARSER = "html.parser"
+LXML = "lxml"
+SELECTOLAX = "selectolax"
+PARSER_BACKENDS = (HTML_PARSER, LXML, SELECTOLAX)
+
+# Tags whose text BeautifulSoup leaves out of .text
+HIDDEN_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+# Placeholders the scrapers skip instead of matching
+SKIPPED_SELECTORS = frozenset({"", ".", "*"})
+
+_warned_fallbacks = set()
+
+
+class CompiledSelector(str):
+    """
+    CSS selector that carries its soupsieve compiled form
+
+    Still a str, so it can be logged, compared and passed to backends that
+    compile selectors themselves (selectolax).
+    """
+
+    def __new__(cls, selector: str):
+        obj = super().__new__(cls, selector)
+        try:
+            obj.compiled = soupsieve.compile(selector)
+        except soupsieve.SelectorSyntaxError as e:
+            raise ValueError(f"Invalid CSS selector {selector!r}: {e}") from None
+        return obj
+
+    def __reduce__(self):
+        # Compiled patterns are rebuilt on unpickling rather than serialized
+        return compile_selector, (str(self),)
+
+
+@lru_cache(maxsize=None)
+def compile_selector(selector: str) -> CompiledSelector:
+    """Compile a selector once per process"""
+    if isinstance(selector, CompiledSelector):
+        return selector
+    return CompiledSelector(selector)
+
+
+def compile_selectors(selectors: List[str], field_name: str = "selector") -> List[str]:
+    """
+    Compile a selector list, keeping the placeholders the scrapers skip.
+
+    Raises:
+        ValueError: A selector is not valid CSS
+    """
+    compiled = []
+    for selector in selectors:
+        if selector.strip() in SKIPPED_SELECTORS:
+            compiled.append(selector)
+            continue
+        try:
+            compiled.append(compile_selector(selector))
+        except ValueError as e:
+            raise ValueError(f"{field_name}: {e}") from None
+    return compiled
+
+
+def select(element, selector: str) -> list:
+    """element.select(selector), with the pre-compiled selector on BeautifulSoup trees"""
+    if isinstance(element, Tag):
+        return compile_selector(selector).compiled.select(element)
+    return element.select(selector)
+
+
+def select_one(element, selector: str):
+    """element.select_one(selector), with the pre-compiled selector on BeautifulSoup trees"""
+    if isinstance(element, Tag):
+        return compile_selector(selector).compiled.select_one(element)
+    return element.select_one(selector)
+
+
+class LexborNode:
+    """selectolax (lexbor) node behind the BeautifulSoup tag API"""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector: str) -> List["LexborNode"]:
+        # lexbor compiles selectors itself and only accepts exact str instances
+        return [LexborNode(node) for node in self._node.css(str(selector))]
+
+    def select_one(self, selector: str) -> Optional["LexborNode"]:
+        node = self._node.css_first(str(selector))
+        return LexborNode(node) if node is not None else None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._node.attributes.get(name, default)
+
+    def __getitem__(self, name: str) -> Any:
+        return self._node.attributes[name]
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._node.tag
+
+    @property
+    def attrs(self) -> Dict[str, Any]:
+        return dict(self._node.attributes)
+
+    @property
+    def string(self) -> str:
+        """Raw content, also of script and style elements"""
+        return self._node.text(deep=True)
+
+    @property
+    def text(self) -> str:
+        if self._node.css_first("script, style, template") is None:
+            return self._node.text(deep=True)
+        return "".join(
+            node.text(deep=False) for node in self._node.traverse(include_text=True)
+            if node.tag == "-text" and node.parent.tag not in HIDDEN_TEXT_TAGS
+        )
+
+
+def available_backends() -> List[str]:
+    """Backends whose libraries are installed"""
+    available = {HTML_PARSER: True, LXML: LXML_AVAILABLE, SELECTOLAX: SELECTOLAX_AVAILABLE}
+    return [backend for backend in PARSER_BACKENDS if available[backend]]
+
+
+def resolve_backend(backend: str) -> str:
+    """The requested backend, or html.parser when it is not installed"""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}, expected one of {', '.join(PARSER_BACKENDS)}")
+    if backend in available_backends():
+        return backend
+    if backend not in _warned_fallbacks:
+        _warned_fallbacks.add(backend)
+        logger.warning(f"Parser backend {backend} is not installed, falling back to {HTML_PARSER}")
+    return HTML_PARSER
+
+
+def parse_html(content, backend: str = HTML_PARSER, parse_only: Optional[SoupStrainer] = None):
+    """
+    Parse a page with the given backend.
+
+    Args:
+        content: Page as bytes (encoding detected like BeautifulSoup does) or str
+        backend: One of PARSER_BACKENDS
+        parse_only: Strainer limiting the tree to matching subtrees (BeautifulSoup backends only)
+
+    Returns:
+        Document supporting select(), select_one() and .text
+    """
+    backend = resolve_backend(backend)
+    if backend == SELECTOLAX:
+        if isinstance(content, bytes):
+            content = UnicodeDammit(content, is_html=True).unicode_markup or ""
+        return LexborNode(LexborHTMLParser(content).root)
+    return BeautifulSoup(content, backend, parse_only=parse_only)
+
+
+def dispose(document):
+    """
+    Free a parsed tree right away.
+
+    BeautifulSoup trees are full of parent/child reference cycles and would
+    otherwise wait for the garbage collector.
+    """
+    if isinstance(document, Tag):
+        # BeautifulSoup.decompose() does not walk into the document's children, so decompose them one by one
+        for child in list(document.contents):
+            if isinstance(child, Tag):
+                child.decompose()
+            else:
+                child.extract()
+        document.decompose()
+
+
+# One compound selector: optional tag, then .class, #id and [attr] filters
+_COMPOUND = re.compile(r"""^(?P<tag>[A-Za-z][\w-]*|\*)?(?P<filters>(?:[.#][\w-]+|\[[^\]]+\])*)$""")
+_FILTER = re.compile(r"""([.#])([\w-]+)|\[\s*([\w-]+)\s*(?:([~|^$*]?=)\s*("[^"]*"|'[^']*'|[^\]\s]+)\s*)?\]""")
+
+
+class _CompoundMatcher:
+    """Matches a start tag (name, attributes) against one compound selector"""
+
+    def __init__(self, compound: str):
+        match = _COMPOUND.match(compound)
+        if not match or not (match.group("tag") or match.group("filters")):
+            raise ValueError(f"Unsupported compound selector {compound!r}")
+        tag = match.group("tag")
+        self.tag = tag.lower() if tag and tag != "*" else None
+        self.classes = []
+        self.ids = []
+        self.attributes = []
+        for dot_or_hash, name, attribute, operator, value in _FILTER.findall(match.group("filters")):
+            if dot_or_hash == ".":
+                self.classes.append(name)
+            elif dot_or_hash == "#":
+                self.ids.append(name)
+            else:
+                self.attributes.append((attribute.lower(), operator, value.strip("\"'")))
+
+    def __call__(self, name: str, attrs: Dict[str, Any]) -> bool:
+        if self.tag and name != self.tag:
+            return False
+        classes = attrs.get("class") or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        if any(css_class not in classes for css_class in self.classes):
+            return False
+        if any(attrs.get("id") != element_id for element_id in self.ids):
+            return False
+        for attribute, operator, expected in self.attributes:
+            value = attrs.get(attribute)
+            if value is None:
+                return False
+            if not isinstance(value, str):
+                value = " ".join(value)
+            if operator and not _attribute_matches(value, operator, expected):
+                return False
+        return True
+
+
+def _attribute_matches(value: str, operator: str, expected: str) -> bool:
+    if operator == "=":
+        return value == expected
+    if operator == "~=":
+        return expected in value.split()
+    if operator == "|=":
+        return value == expected or value.startswith(expected + "-")
+    if operator == "^=":
+        return bool(expected) and value.startswith(expected)
+    if operator == "$=":
+        return bool(expected) and value.endswith(expected)
+    return bool(expected) and expected in value  # *=
+
+
+def _leftmost_compounds(selector: str) -> Optional[List[str]]:
+    """
+    First compound of every selector in a (comma separated) group.
+
+    None when the selector needs context a partial tree does not have:
+    sibling combinators or pseudo-classes.
+    """
+    compounds = []
+    current = []
+    depth = 0
+    in_first_compound = True
+    for char in selector.strip() + ",":
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif depth == 0:
+            if char in ":+~":
+                return None
+            if char == ",":
+                compounds.append("".join(current).strip())
+                current = []
+                in_first_compound = True
+                continue
+            if char.isspace() or char == ">":
+                in_first_compound = in_first_compound and not current
+                continue
+        if in_first_compound:
+            current.append(char)
+    return compounds if all(compounds) else None
+
+
+def build_strainer(selectors: Iterable[str]) -> Optional[SoupStrainer]:
+    """
+    SoupStrainer keeping only the subtrees the selectors can match in.
+
+    Every element matching the leftmost compound of a selector is kept with
+    all its descendants, so the full selector still finds the same elements
+    in the partial tree. Returns None (parse everything) when a selector
+    cannot be reduced that way.
+    """
+    matchers = []
+    for selector in selectors:
+        if selector.strip() in SKIPPED_SELECTORS:
+            continue
+        compounds = _leftmost_compounds(selector)
+        if compounds is None:
+            return None
+        try:
+            matchers.extend(_CompoundMatcher(compound) for compound in compounds)
+        except ValueError:
+            return None
+    if not matchers:
+        return None
+    return SoupStrainer(lambda name, attrs: any(matcher(name, attrs) for matcher in matchers))
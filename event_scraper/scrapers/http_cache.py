@@ -0,0 +1,246 @@
+"""
+Persistent HTTP cache with conditional requests
+Stores response bodies with their ETag / Last-Modified validators on disk and
+revalidates them with If-None-Match / If-Modified-Since on the next run
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Optional
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body; everything else is recomputed by requests
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+@dataclass
+class CacheEntry:
+    """Cached response body with its validators"""
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def validator(self) -> Optional[str]:
+        """Value identifying this version of the body"""
+        return self.etag or self.last_modified
+
+
+class HttpCache:
+    """
+    SQLite-backed cache of HTTP responses with a size cap and LRU eviction
+    Safe to share between threads
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Open (or create) the cache.
+
+        Args:
+            directory: Directory holding the cache database
+            max_bytes: Maximum total size of the cached bodies
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "http_cache.sqlite3")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT,"
+            " body BLOB, size INTEGER, last_used REAL)"
+        )
+        # Results derived from a cached body (e.g. the event parsed from it), valid for one validator
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            " url TEXT, source TEXT, validator TEXT, data TEXT, PRIMARY KEY (url, source))"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def reset_stats(self):
+        """Start a new set of hit/miss counters, e.g. at the beginning of a run"""
+        with self._lock:
+            self.stats = self._empty_stats()
+
+    def stats_summary(self) -> str:
+        """One line summary of the counters for the run log"""
+        stats = self.stats
+        return (f"{stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['stores']} stored, {stats['evictions']} evicted, "
+                f"{self._total_bytes} bytes cached")
+
+    def record(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for url, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        etag, last_modified, headers, body = row
+        return CacheEntry(url=url, body=body, headers=json.loads(headers),
+                          etag=etag, last_modified=last_modified)
+
+    def touch(self, url: str):
+        """Mark an entry as recently used"""
+        with self._lock:
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes):
+        """Store a response body with its validators, evicting old entries if needed"""
+        size = len(body)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, headers.get("ETag"), headers.get("Last-Modified"),
+                 json.dumps(headers), sqlite3.Binary(body), size, time.time())
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self.stats["stores"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def lookup_parsed(self, url: str, source: str, validator: str) -> Optional[str]:
+        """Data stored by store_parsed() for this version (validator) of the body of url, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM parsed WHERE url = ? AND source = ? AND validator = ?", (url, source, validator)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store_parsed(self, url: str, source: str, validator: str, data: str):
+        """
+        Keep data derived from the body of url, so that later runs can skip deriving it again
+        after a 304. source tells apart the consumers of the same url.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?)", (url, source, validator, data))
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (lock held)"""
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT url, size FROM entries ORDER BY last_used ASC LIMIT 1"
+            ).fetchone()
+            if not row:
+                break
+            self._conn.execute("DELETE FROM entries WHERE url = ?", (row[0],))
+            self._conn.execute("DELETE FROM parsed WHERE url = ?", (row[0],))
+            self._total_bytes -= row[1]
+            self.stats["evictions"] += 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    Transport adapter adding conditional requests on top of HTTPAdapter
+
+    A 304 answer is turned into a regular 200 response carrying the cached
+    body; such responses have from_cache=True and cache_validator set so
+    callers can skip parsing content they have already seen.
+    """
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        if entry:
+            if entry.etag and "If-None-Match" not in request.headers:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified and "If-Modified-Since" not in request.headers:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.cache.record("hits")
+            self.cache.touch(request.url)
+            return self._build_cached_response(request, response, entry)
+
+        self.cache.record("misses")
+        response.from_cache = False
+        response.cache_validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if response.status_code == 200 and response.cache_validator:
+            headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            if kwargs.get("stream"):
+                # The caller reads the body, and stores it once it has been read in full
+                response.store_in_cache = partial(self.cache.store, request.url, headers)
+            else:
+                self.cache.store(request.url, headers, response.content)
+        return response
+
+    def _build_cached_response(self, request, not_modified: Response, entry: CacheEntry) -> Response:
+        """Turn a 304 answer into a 200 response with the cached body"""
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        for name in ("ETag", "Last-Modified"):
+            if name in not_modified.headers:
+                response.headers[name] = not_modified.headers[name]
+        response._content = entry.body
+        # The body is already in memory: nothing may be streamed from the (absent) raw connection
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        response.cache_validator = entry.validator
+        not_modified.close()
+        return response
+
+
+_shared_cache: Optional[HttpCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Process-wide HttpCache, or None when caching is disabled"""
+    global _shared_cache
+    if not config.HTTP_CACHE_ENABLED:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HttpCache(config.HTTP_CACHE_DIR, config.HTTP_CACHE_MAX_BYTES)
+        return _shared_cache
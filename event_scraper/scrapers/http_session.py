@@ -0,0 +1,323 @@
+"""
+Process-wide HTTP session shared by all scrapers
+One tuned connection pool per host, gzip/br negotiation, retries with
+exponential backoff and jitter on idempotent requests, size-limited streamed
+reads and transfer statistics
+"""
+import logging
+import threading
+from typing import Dict, Iterator, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from scrapers.deadline import active_deadline
+from scrapers.http_cache import CachingAdapter, get_http_cache
+from scrapers.cassette import Cassette, RecordingAdapter, ReplayAdapter
+import config
+
+logger = logging.getLogger(__name__)
+
+# Only these methods are retried, they are safe to send twice
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Content types worth parsing for events; anything else is aborted before its body is read
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ResponseRejected(requests.RequestException):
+    """Streamed response aborted because of its size or content type"""
+
+
+class DeadlineRetry(Retry):
+    """
+    Retry policy that stays within the deadline applied to the request (Deadline.applied)
+
+    A retry is only made when its wait (backoff or Retry-After) still leaves a
+    full read timeout before the deadline, and the waits are capped accordingly.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        budget = _retry_budget()
+        if budget is not None:
+            wait = None
+            if response is not None and retry.respect_retry_after_header:
+                wait = Retry.get_retry_after(retry, response)
+            if wait is None:
+                wait = Retry.get_backoff_time(retry)
+            if wait > budget:
+                raise MaxRetryError(_pool, url, error or ResponseError("Time budget too short for a retry"))
+        return retry
+
+    def get_backoff_time(self) -> float:
+        return _cap_wait(super().get_backoff_time())
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else _cap_wait(retry_after)
+
+
+def _retry_budget() -> Optional[float]:
+    """Seconds a retry may wait and still get a full read timeout before the active deadline"""
+    deadline = active_deadline()
+    remaining = deadline.remaining() if deadline else None
+    return None if remaining is None else remaining - config.READ_TIMEOUT
+
+
+def _cap_wait(seconds: float) -> float:
+    budget = _retry_budget()
+    return seconds if budget is None else max(0.0, min(seconds, budget))
+
+
+class SharedSession(requests.Session):
+    """requests.Session that counts requests, bytes transferred and connection reuse"""
+
+    def __init__(self):
+        super().__init__()
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._bytes = 0
+        self._aborted = 0
+        self._bytes_saved = 0
+        self._baseline = (0, 0)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if not kwargs.get("stream"):
+            # Body already read by requests; streamed bodies are counted by whoever reads them
+            self.record_transfer(response)
+        return response
+
+    def record_transfer(self, response: requests.Response, body_bytes: Optional[int] = None):
+        """
+        Count a finished response.
+
+        Args:
+            response: Response whose body has been read
+            body_bytes: Bytes read from the network when the caller streamed the body itself
+        """
+        if body_bytes is None:
+            body_bytes = self._wire_bytes(response)
+        with self._stats_lock:
+            self._requests += 1
+            self._bytes += body_bytes
+
+    def record_abort(self, bytes_saved: int):
+        """Count a response dropped before its body was read in full"""
+        with self._stats_lock:
+            self._aborted += 1
+            self._bytes_saved += bytes_saved
+
+    @staticmethod
+    def _wire_bytes(response: requests.Response) -> int:
+        """Body bytes as received on the wire (i.e. still compressed), 0 when served from cache"""
+        if getattr(response, "from_cache", False) is True:
+            return 0
+        raw = getattr(response, "raw", None)
+        if raw is not None and hasattr(raw, "tell"):
+            try:
+                return int(raw.tell())
+            except Exception:
+                pass
+        return len(response.content or b"")
+
+    def _pool_counters(self):
+        """(connections opened, requests sent) over all live host pools"""
+        opened = sent = 0
+        # The same adapter is usually mounted for both http:// and https://
+        unique_adapters = {id(adapter): adapter for adapter in self.adapters.values()}
+        for adapter in unique_adapters.values():
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    sent += pool.num_requests
+        return opened, sent
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since the last reset_stats()"""
+        opened, sent = self._pool_counters()
+        opened -= self._baseline[0]
+        sent -= self._baseline[1]
+        with self._stats_lock:
+            return {
+                "requests": self._requests,
+                "bytes": self._bytes,
+                "connections_opened": opened,
+                "connections_reused": max(0, sent - opened),
+                "aborted_fetches": self._aborted,
+                "bytes_saved": self._bytes_saved,
+            }
+
+    def reset_stats(self):
+        """Start new counters, e.g. at the beginning of a run"""
+        with self._stats_lock:
+            self._requests = 0
+            self._bytes = 0
+            self._aborted = 0
+            self._bytes_saved = 0
+            self._baseline = self._pool_counters()
+
+    def stats_summary(self) -> str:
+        """One line summary of the counters for the run log"""
+        stats = self.stats()
+        return (f"{stats['requests']} requests, {stats['bytes']} bytes transferred, "
+                f"{stats['connections_opened']} connections opened, "
+                f"{stats['connections_reused']} reused, "
+                f"{stats['aborted_fetches']} aborted ({stats['bytes_saved']} bytes saved)")
+
+
+def read_limited(session: requests.Session, response: requests.Response, max_bytes: int,
+                 content_types: Sequence[str] = HTML_CONTENT_TYPES) -> bytes:
+    """
+    Read the body of a streamed response, giving up as early as possible.
+
+    Successful responses with another content type, or with a body larger than
+    max_bytes (announced by Content-Length or found while reading), are closed
+    without reading the rest of the body.
+
+    Args:
+        session: Session that sent the request, counts transfers and aborts
+        response: Response of a request sent with stream=True
+        max_bytes: Largest accepted (decoded) body
+        content_types: Accepted media types, checked on successful responses only
+
+    Returns:
+        The body, also available as response.content afterwards
+
+    Raises:
+        ResponseRejected: The response was aborted
+    """
+    if not isinstance(response, requests.Response) or response._content_consumed:
+        # Body already in memory (e.g. served from the HTTP cache)
+        return response.content
+
+    response._content = b"".join(iter_limited(session, response, max_bytes, content_types))
+    return response._content
+
+
+def iter_limited(session: requests.Session, response: requests.Response, max_bytes: int,
+                 content_types: Sequence[str] = HTML_CONTENT_TYPES) -> Iterator[bytes]:
+    """
+    Chunks of the body of a streamed response as they arrive, with the checks of read_limited
+
+    The transfer is counted, and the body stored in the HTTP cache, once the
+    body has been read in full. A caller that stops early should close the response.
+
+    Raises:
+        ResponseRejected: The response was aborted
+    """
+    if not isinstance(response, requests.Response) or response._content_consumed:
+        if response.content:
+            yield response.content
+        return
+
+    announced = _content_length(response)
+    media_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    store_in_cache = getattr(response, "store_in_cache", None)
+    # Only kept when the body goes to the cache
+    chunks = [] if callable(store_in_cache) else None
+    size = 0
+    try:
+        if response.ok and media_type and media_type not in content_types:
+            raise ResponseRejected(f"Unexpected content type {media_type}", response=response)
+        if announced is not None and announced > max_bytes:
+            raise ResponseRejected(f"Body of {announced} bytes exceeds {max_bytes}", response=response)
+
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseRejected(f"Body exceeds {max_bytes} bytes", response=response)
+            if chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+
+    except ResponseRejected as e:
+        read = _raw_position(response)
+        response.close()
+        if hasattr(session, "record_abort"):
+            session.record_abort(max(0, (announced or 0) - read))
+        logger.warning(f"Aborted {response.url}: {e}")
+        raise
+
+    if hasattr(session, "record_transfer"):
+        session.record_transfer(response, body_bytes=_raw_position(response) or size)
+    if chunks is not None:
+        store_in_cache(b"".join(chunks))
+
+
+def _content_length(response: requests.Response) -> Optional[int]:
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _raw_position(response: requests.Response) -> int:
+    """Bytes read so far from the network for a partly read body"""
+    try:
+        return int(response.raw.tell())
+    except Exception:
+        return 0
+
+
+def create_session() -> SharedSession:
+    """Build a session with the tuned pool, retry policy and HTTP cache (or cassette)"""
+    session = SharedSession()
+    session.headers.update(config.REQUEST_HEADERS)
+    # gzip and deflate always, br when a brotli decoder is installed
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+    retry = DeadlineRetry(
+        total=config.HTTP_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        backoff_jitter=config.HTTP_BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter_options = {
+        "pool_connections": config.HTTP_POOL_HOSTS,
+        "pool_maxsize": config.HTTP_POOL_SIZE_PER_HOST,
+        "max_retries": retry,
+    }
+
+    http_cache = get_http_cache()
+    if config.HTTP_CASSETTE_MODE == "replay":
+        # Offline: every response comes from the cassette
+        adapter = ReplayAdapter(Cassette.load(config.HTTP_CASSETTE_PATH), latency=config.HTTP_REPLAY_LATENCY,
+                                **adapter_options)
+    elif config.HTTP_CASSETTE_MODE == "record":
+        # Bypasses the HTTP cache so that full responses are recorded, not 304s
+        adapter = RecordingAdapter(Cassette(config.HTTP_CASSETTE_PATH), **adapter_options)
+    elif http_cache:
+        # Revalidate pages from previous runs instead of downloading them again
+        adapter = CachingAdapter(http_cache, **adapter_options)
+    else:
+        adapter = HTTPAdapter(**adapter_options)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_shared_session: Optional[SharedSession] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> SharedSession:
+    """Process-wide session, so scrapers of the same host share TCP/TLS connections"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
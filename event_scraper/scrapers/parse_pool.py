@@ -0,0 +1,207 @@
+"""
+Process pool for parsing detailed pages
+BeautifulSoup parsing holds the GIL, so the fetching threads only use one core
+for it. The pool parses raw page bytes in worker processes and sends back the
+Event, with a CPU and a wall-clock limit per page so a pathological page is
+reported instead of hanging the run.
+"""
+import logging
+import multiprocessing
+import signal
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class ParseTimeout(TimeoutError):
+    """Raised when a page could not be parsed within its CPU or wall-clock limit"""
+
+
+class ParseFailed(RuntimeError):
+    """Raised when the worker parsing a page died"""
+
+
+@contextmanager
+def cpu_limit(seconds: Optional[float]):
+    """
+    Raise ParseTimeout once the process used `seconds` of CPU time in the block
+
+    Must run in the main thread (as worker tasks do); no limit on platforms
+    without setitimer.
+    """
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def on_limit(signum, frame):
+        raise ParseTimeout(f"more than {seconds:g}s of CPU")
+
+    previous = signal.signal(signal.SIGPROF, on_limit)
+    signal.setitimer(signal.ITIMER_PROF, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous)
+
+
+# Worker side: one scraper per website, reused by every page of the site
+_worker_scrapers: Dict[str, Any] = {}
+
+
+def _init_worker():
+    # Workers only parse: no HTTP cache or cassette to open
+    config.HTTP_CACHE_ENABLED = False
+    config.HTTP_CASSETTE_MODE = ""
+
+
+def _worker_scraper(website_config):
+    from scrapers.web_scraper import WebScraper
+
+    scraper = _worker_scrapers.get(website_config.name)
+    if scraper is None or scraper.config != website_config:
+        scraper = _worker_scrapers[website_config.name] = WebScraper(website_config)
+    return scraper
+
+
+def parse_detailed_page_task(website_config, content: bytes, cpu_seconds: Optional[float]):
+    """Parse one detailed page in a worker: (event, selector hits of the page)"""
+    scraper = _worker_scraper(website_config)
+    stats = scraper.selector_stats
+    if stats:
+        stats.take_run()  # Left over by a page that timed out
+    with cpu_limit(cpu_seconds):
+        event = scraper._parse_detailed_content(content)
+    return event, stats.take_run() if stats else {}
+
+
+class ParsePool:
+    """Worker processes parsing pages, with per-page limits"""
+
+    def __init__(self, processes: int, cpu_seconds: Optional[float] = config.PARSE_CPU_SECONDS,
+                 wall_seconds: float = config.PARSE_WALL_SECONDS):
+        """
+        Args:
+            processes: Number of worker processes
+            cpu_seconds: CPU time a worker may spend on one page, None for no limit
+            wall_seconds: Time to wait for one page before killing the workers
+        """
+        self.processes = processes
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        # Pages are only submitted when a worker is free, so the wall-clock limit does not count queueing
+        self._slots = threading.BoundedSemaphore(processes)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Executors killed for a stuck page: their other pages did not fail
+        self._killed = weakref.WeakSet()
+
+    def parse_detailed_page(self, website_config, url: str, content: bytes) -> Tuple[Any, Dict]:
+        """
+        Parse a detailed page in a worker
+
+        Returns:
+            (Event or None, selector hits recorded while parsing)
+
+        Raises:
+            ParseTimeout: The page exceeded its CPU or wall-clock limit
+            ParseFailed: The worker died twice while parsing the page
+        """
+        try:
+            return self.call(parse_detailed_page_task, website_config, content, self.cpu_seconds)
+        except ParseTimeout as e:
+            raise ParseTimeout(f"Parsing {url} took {e}") from None
+
+    def call(self, function: Callable, *args):
+        """Run a picklable function in a worker, within the wall-clock limit"""
+        crashes = 0
+        while crashes < 2:
+            with self._slots:
+                executor = self._get_executor()
+                future = executor.submit(function, *args)
+                try:
+                    return future.result(timeout=self.wall_seconds)
+                except ParseTimeout:
+                    raise  # CPU limit hit in the worker, which is still usable
+                except FutureTimeout:
+                    # Stuck where the CPU limit cannot interrupt it
+                    self._kill(executor)
+                    raise ParseTimeout(f"more than {self.wall_seconds:g}s") from None
+                except BrokenProcessPool:
+                    self._discard(executor)
+                    # Killed with another page that was stuck: not this page's fault, submit it again.
+                    # Crashed: try once more on fresh workers
+                    if executor not in self._killed:
+                        crashes += 1
+        raise ParseFailed("parse worker died")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process full of threads is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _kill(self, executor: ProcessPoolExecutor):
+        logger.warning("⏱️ Killing parse workers stuck on a page")
+        # The executor has no API to kill a single busy worker
+        with self._lock:
+            self._killed.add(executor)
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.kill()
+        self._discard(executor)
+
+
+_shared_pool: Optional[ParsePool] = None
+_shared_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """Process-wide ParsePool, or None to parse in-process (disabled or unsupported here)"""
+    global _shared_pool, _pool_unavailable
+    if config.PARSE_PROCESSES <= 0 or _pool_unavailable:
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            try:
+                # Fails where semaphores are missing (some sandboxes, AWS Lambda)
+                multiprocessing.get_context("spawn").Semaphore()
+            except (ImportError, OSError, NotImplementedError) as e:
+                logger.warning(f"Parsing in-process, no process pool available: {e}")
+                _pool_unavailable = True
+                return None
+            _shared_pool = ParsePool(config.PARSE_PROCESSES)
+        return _shared_pool
+
+
+def shutdown_parse_pool():
+    """Stop the shared pool's workers"""
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,276 @@
+"""
+Per-host politeness for the HTTP layer
+Limits every host with a token bucket, a cap on concurrent connections and
+the Crawl-delay announced in its robots.txt
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from scrapers.deadline import Deadline, DeadlineExceeded
+import config
+
+logger = logging.getLogger(__name__)
+
+# How often a coroutine checks for a connection held by a synchronous scraper's thread
+ASYNC_CONNECTION_POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts of `capacity`"""
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take one token if one is available: 0, otherwise the seconds until there is one"""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, sleeping until one is available; False if that would take longer than timeout"""
+        give_up_at = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if give_up_at is not None and self._clock() + wait > give_up_at:
+                return False
+            self._sleep(wait)
+
+
+class HostLimiter:
+    """Token bucket plus connection cap for a single host"""
+
+    def __init__(self, rate: float, burst: float, max_connections: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_connections = max(1, max_connections)
+        self.connections = threading.BoundedSemaphore(self.max_connections)
+        # Coroutines queue on an asyncio.Semaphore of their event loop, created on first use
+        self._loop_connections = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """Hold a connection and take a token, raising DeadlineExceeded rather than waiting past deadline"""
+        if not self.connections.acquire(timeout=deadline.remaining() if deadline else None):
+            raise DeadlineExceeded("Time budget exhausted waiting for a connection to the host")
+        try:
+            if not self.bucket.acquire(timeout=deadline.remaining() if deadline else None):
+                raise DeadlineExceeded("Time budget exhausted waiting for the host's rate limit")
+            yield
+        finally:
+            self.connections.release()
+
+    @asynccontextmanager
+    async def async_slot(self, deadline: Optional[Deadline] = None) -> AsyncIterator[None]:
+        """slot() for coroutines: waits on the event loop (asyncio.Semaphore, asyncio.sleep), never in a thread"""
+        loop_connections = self._async_connections()
+        try:
+            await asyncio.wait_for(loop_connections.acquire(), timeout=deadline.remaining() if deadline else None)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Time budget exhausted waiting for a connection to the host") from None
+        try:
+            # Also counted against the cap shared with the synchronous scrapers' threads
+            while not self.connections.acquire(blocking=False):
+                await _sleep_within(ASYNC_CONNECTION_POLL_SECONDS, deadline, "a connection to the host")
+            try:
+                wait = self.bucket.try_acquire()
+                while wait:
+                    await _sleep_within(wait, deadline, "the host's rate limit")
+                    wait = self.bucket.try_acquire()
+                yield
+            finally:
+                self.connections.release()
+        finally:
+            loop_connections.release()
+
+    def _async_connections(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._loop_connections.get(loop)
+            if semaphore is None:
+                semaphore = self._loop_connections[loop] = asyncio.Semaphore(self.max_connections)
+        return semaphore
+
+
+async def _sleep_within(seconds: float, deadline: Optional[Deadline], waiting_for: str):
+    """asyncio.sleep, raising DeadlineExceeded instead when the sleep would outlast deadline"""
+    remaining = deadline.remaining() if deadline else None
+    if remaining is not None and seconds > remaining:
+        raise DeadlineExceeded(f"Time budget exhausted waiting for {waiting_for}")
+    await asyncio.sleep(seconds)
+
+
+class PolitenessScheduler:
+    """
+    Hands out request slots per host, keyed by WebsiteConfig.base_domain
+
+    robots.txt is read once per host and cached until reset() is called,
+    which main does at the start of each run.
+    """
+
+    def __init__(self,
+                 requests_per_second: float = config.POLITENESS_REQUESTS_PER_SECOND,
+                 burst: float = config.POLITENESS_BURST,
+                 max_connections_per_host: int = config.POLITENESS_MAX_CONNECTIONS_PER_HOST,
+                 respect_crawl_delay: bool = config.POLITENESS_RESPECT_CRAWL_DELAY):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_connections_per_host = max_connections_per_host
+        self.respect_crawl_delay = respect_crawl_delay
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the limiters and robots.txt data of the previous run"""
+        with self._lock:
+            self._limiters.clear()
+
+    @contextmanager
+    def slot(self, base_domain: str, fetch: Optional[Callable] = None,
+             deadline: Optional[Deadline] = None) -> Iterator[None]:
+        """
+        Wait until a request to base_domain is allowed, and hold a connection slot meanwhile
+
+        Args:
+            base_domain: Website root the request belongs to
+            fetch: Callable used to GET robots.txt (e.g. session.get) the first time the host is seen
+            deadline: Time budget of the request, the wait never outlasts it
+
+        Raises:
+            DeadlineExceeded: The slot could not be had within the deadline
+        """
+        with self._limiter(base_domain, fetch).slot(deadline):
+            yield
+
+    @asynccontextmanager
+    async def async_slot(self, base_domain: str, fetch: Optional[Callable[..., Awaitable]] = None,
+                         deadline: Optional[Deadline] = None) -> AsyncIterator[None]:
+        """
+        slot() for coroutines, sharing the per-host limits of slot()
+
+        Waiting coroutines are parked on the event loop, not in worker threads.
+
+        Args:
+            base_domain: Website root the request belongs to
+            fetch: Coroutine function used to GET robots.txt the first time the host is seen
+            deadline: Time budget of the request, the wait never outlasts it
+
+        Raises:
+            DeadlineExceeded: The slot could not be had within the deadline
+        """
+        limiter = await self._limiter_async(base_domain, fetch)
+        async with limiter.async_slot(deadline):
+            yield
+
+    def _limiter(self, base_domain: str, fetch: Optional[Callable]) -> HostLimiter:
+        limiter = self._cached_limiter(base_domain)
+        if limiter:
+            return limiter
+        # robots.txt is fetched outside the lock so other hosts are not blocked meanwhile
+        crawl_delay = self._crawl_delay(base_domain, fetch) if self.respect_crawl_delay else None
+        return self._add_limiter(base_domain, crawl_delay)
+
+    async def _limiter_async(self, base_domain: str, fetch: Optional[Callable[..., Awaitable]]) -> HostLimiter:
+        limiter = self._cached_limiter(base_domain)
+        if limiter:
+            return limiter
+        crawl_delay = await self._crawl_delay_async(base_domain, fetch) if self.respect_crawl_delay else None
+        return self._add_limiter(base_domain, crawl_delay)
+
+    def _cached_limiter(self, base_domain: str) -> Optional[HostLimiter]:
+        with self._lock:
+            return self._limiters.get(self._host_key(base_domain))
+
+    def _add_limiter(self, base_domain: str, crawl_delay: Optional[float]) -> HostLimiter:
+        host = self._host_key(base_domain)
+        rate, burst = self.requests_per_second, self.burst
+        if crawl_delay:
+            # One request every crawl_delay seconds, without bursts
+            rate, burst = min(rate, 1.0 / crawl_delay), 1
+            logger.info(f"Using robots.txt Crawl-delay of {crawl_delay}s for {host}")
+
+        with self._lock:
+            return self._limiters.setdefault(host, HostLimiter(rate, burst, self.max_connections_per_host))
+
+    @staticmethod
+    def _host_key(base_domain: str) -> str:
+        parsed = urlparse(base_domain)
+        return (parsed.netloc or parsed.path).lower()
+
+    @staticmethod
+    def _crawl_delay(base_domain: str, fetch: Optional[Callable]) -> Optional[float]:
+        """Read Crawl-delay from the robots.txt of base_domain, None if absent or unreachable"""
+        if fetch is None:
+            return None
+
+        robots_url = f"{base_domain.rstrip('/')}/robots.txt"
+        try:
+            response = fetch(robots_url, timeout=(config.CONNECT_TIMEOUT, config.READ_TIMEOUT))
+            return _parse_crawl_delay(robots_url, response)
+        except DeadlineExceeded:
+            # Not cached without its Crawl-delay: robots.txt is read again by the next request
+            raise
+        except Exception as e:
+            logger.debug(f"Could not read {robots_url}: {e}")
+            return None
+
+    @staticmethod
+    async def _crawl_delay_async(base_domain: str, fetch: Optional[Callable[..., Awaitable]]) -> Optional[float]:
+        """_crawl_delay() with a coroutine function as fetch"""
+        if fetch is None:
+            return None
+
+        robots_url = f"{base_domain.rstrip('/')}/robots.txt"
+        try:
+            response = await fetch(robots_url, timeout=(config.CONNECT_TIMEOUT, config.READ_TIMEOUT))
+            return _parse_crawl_delay(robots_url, response)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.debug(f"Could not read {robots_url}: {e}")
+            return None
+
+
+def _parse_crawl_delay(robots_url: str, response) -> Optional[float]:
+    """Crawl-delay for our User-Agent in a robots.txt response, None if absent"""
+    if response.status_code != 200:
+        return None
+    parser = RobotFileParser(robots_url)
+    parser.parse(response.text.splitlines())
+    delay = parser.crawl_delay(config.REQUEST_HEADERS.get("User-Agent", "*"))
+    return float(delay) if delay else None
+
+
+_shared_scheduler: Optional[PolitenessScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_politeness_scheduler() -> PolitenessScheduler:
+    """Process-wide PolitenessScheduler shared by all scrapers"""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = PolitenessScheduler()
+        return _shared_scheduler
@@ -0,0 +1,167 @@
+"""
+Per-site selector hit statistics
+Records which selector of each fallback list actually produced a field,
+persists the counts between runs and flags selectors whose hit rate
+collapsed (site markup changed). Extraction keeps the configured selector
+priority: the stats never change which selector wins.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+STATS_VERSION = 1
+
+
+@dataclass
+class SelectorCollapse:
+    """A selector that used to produce a field much more often than in this run"""
+    site: str
+    field: str
+    selector: str
+    historical_rate: float
+    current_rate: float
+
+    def __str__(self) -> str:
+        return (f"{self.site} / {self.field}: {self.selector!r} hit rate dropped "
+                f"from {self.historical_rate:.0%} to {self.current_rate:.0%}")
+
+
+class FieldStats:
+    """Extractions of one field and the selector that won each of them"""
+
+    __slots__ = ("extractions", "hits")
+
+    def __init__(self, extractions: float = 0, hits: Optional[Dict[str, float]] = None):
+        self.extractions = extractions
+        self.hits = hits or {}
+
+    def record(self, selector: Optional[str]):
+        self.extractions += 1
+        if selector is not None:
+            self.hits[selector] = self.hits.get(selector, 0) + 1
+
+    def rate(self, selector: str) -> float:
+        return self.hits.get(selector, 0) / self.extractions if self.extractions else 0.0
+
+
+class SelectorStats:
+    """Selector hit counts: the history loaded from disk plus the current run"""
+
+    def __init__(self, path: str, decay: float = config.SELECTOR_STATS_DECAY,
+                 min_samples: int = config.SELECTOR_STATS_MIN_SAMPLES,
+                 collapse_ratio: float = config.SELECTOR_STATS_COLLAPSE_RATIO):
+        """
+        Args:
+            path: JSON file holding the history
+            decay: Weight of the history when a run is merged into it, so old markup fades out
+            min_samples: Extractions needed, in the history and in the run, before comparing rates
+            collapse_ratio: A selector is flagged when its rate falls below this share of its historical rate
+        """
+        self.path = path
+        self.decay = decay
+        self.min_samples = min_samples
+        self.collapse_ratio = collapse_ratio
+        self._lock = threading.Lock()
+        self._history: Dict[Tuple[str, str], FieldStats] = {}
+        self._run: Dict[Tuple[str, str], FieldStats] = {}
+        self._load()
+
+    def record(self, site: str, field: str, selector: Optional[str]):
+        """Count one extraction of a field, won by selector (None when nothing matched)"""
+        with self._lock:
+            stats = self._run.get((site, field))
+            if stats is None:
+                stats = self._run[(site, field)] = FieldStats()
+            stats.record(selector)
+
+    def take_run(self) -> Dict[Tuple[str, str], FieldStats]:
+        """Remove and return the counts of this run (e.g. to send them from a worker process)"""
+        with self._lock:
+            run, self._run = self._run, {}
+        return run
+
+    def add_run(self, run: Dict[Tuple[str, str], FieldStats]):
+        """Add counts taken from another SelectorStats to this run"""
+        with self._lock:
+            for key, other in run.items():
+                stats = self._run.get(key)
+                if stats is None:
+                    stats = self._run[key] = FieldStats()
+                stats.extractions += other.extractions
+                for selector, count in other.hits.items():
+                    stats.hits[selector] = stats.hits.get(selector, 0) + count
+
+    def collapsed(self) -> List[SelectorCollapse]:
+        """Selectors hitting far less often in this run than they used to"""
+        collapses = []
+        with self._lock:
+            for (site, field), run in self._run.items():
+                history = self._history.get((site, field))
+                if history is None or history.extractions < self.min_samples or run.extractions < self.min_samples:
+                    continue
+                for selector in history.hits:
+                    historical_rate = history.rate(selector)
+                    current_rate = run.rate(selector)
+                    if historical_rate >= 0.5 and current_rate < historical_rate * self.collapse_ratio:
+                        collapses.append(SelectorCollapse(site, field, selector, historical_rate, current_rate))
+        return collapses
+
+    def save(self):
+        """Merge the run into the history, write it and start a new run"""
+        with self._lock:
+            for key, run in self._run.items():
+                history = self._history.get(key, FieldStats())
+                hits = {selector: count * self.decay for selector, count in history.hits.items()}
+                for selector, count in run.hits.items():
+                    hits[selector] = hits.get(selector, 0) + count
+                self._history[key] = FieldStats(history.extractions * self.decay + run.extractions, hits)
+            self._run = {}
+            data = {"version": STATS_VERSION, "sites": {}}
+            for (site, field), stats in self._history.items():
+                data["sites"].setdefault(site, {})[field] = {"extractions": stats.extractions, "hits": stats.hits}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable selector stats {self.path}: {e}")
+            return
+        if data.get("version") != STATS_VERSION:
+            logger.warning(f"Ignoring selector stats {self.path} of version {data.get('version')}")
+            return
+        for site, fields in data.get("sites", {}).items():
+            for field, stats in fields.items():
+                self._history[(site, field)] = FieldStats(stats["extractions"], dict(stats["hits"]))
+
+
+_shared_stats: Optional[SelectorStats] = None
+_shared_stats_lock = threading.Lock()
+
+
+def get_selector_stats() -> Optional[SelectorStats]:
+    """Process-wide SelectorStats, or None when disabled"""
+    global _shared_stats
+    if not config.SELECTOR_STATS_ENABLED:
+        return None
+    with _shared_stats_lock:
+        if _shared_stats is None:
+            _shared_stats = SelectorStats(config.SELECTOR_STATS_PATH)
+        return _shared_stats
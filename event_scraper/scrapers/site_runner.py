@@ -0,0 +1,101 @@
+"""
+Parallel runner that scrapes several websites at the same time
+Each website is scraped in its own worker and reported as a separate result
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from scrapers.base_scraper import BaseScraper
+from scrapers.feed_scraper import FeedScraper
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import WebsiteConfig
+from models.event_models import Event
+import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SiteResult:
+    """Outcome of scraping a single website"""
+    name: str
+    events: List[Event] = field(default_factory=list)
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+def create_scraper(website_config: WebsiteConfig, **kwargs) -> BaseScraper:
+    """
+    Scraper for a website: FeedScraper when it has a feed_url, WebScraper otherwise
+
+    Args:
+        website_config: Website to scrape
+        **kwargs: Passed to the scraper (run_deadline, known_ids)
+    """
+    if website_config.feed_url:
+        return FeedScraper(website_config, **kwargs)
+    return WebScraper(website_config, **kwargs)
+
+
+def scrape_site(website_config: WebsiteConfig,
+                scraper_factory: Callable[[WebsiteConfig], BaseScraper]) -> SiteResult:
+    """
+    Scrape one website, turning any failure into a SiteResult instead of raising
+
+    Args:
+        website_config: Website to scrape
+        scraper_factory: Callable building a scraper for the website
+
+    Returns:
+        SiteResult with the events found or the error that occurred
+    """
+    start = time.monotonic()
+    try:
+        scraper = scraper_factory(website_config)
+        events = scraper.scrape()
+        return SiteResult(
+            name=website_config.name,
+            events=events,
+            error=scraper.last_error,
+            duration=time.monotonic() - start
+        )
+    except Exception as e:
+        return SiteResult(name=website_config.name, error=str(e), duration=time.monotonic() - start)
+
+
+def run_sites(website_configs: Sequence[WebsiteConfig],
+              scraper_factory: Callable[[WebsiteConfig], BaseScraper],
+              max_workers: int = config.SITE_RUNNER_WORKERS) -> Iterator[SiteResult]:
+    """
+    Scrape websites in parallel and yield each result as soon as its site finishes
+
+    A failure in one website never aborts the others, it is reported in its SiteResult.
+
+    Args:
+        website_configs: Websites to scrape
+        scraper_factory: Callable building a scraper for a website
+        max_workers: Number of websites scraped at the same time
+
+    Yields:
+        One SiteResult per website, in completion order
+    """
+    if not website_configs:
+        return
+
+    workers = min(max(1, max_workers), len(website_configs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="site") as executor:
+        futures = [
+            executor.submit(scrape_site, website_config, scraper_factory)
+            for website_config in website_configs
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            logger.debug(f"{result.name} finished in {result.duration:.1f}s")
+            yield result
@@ -2,8 +2,12 @@
 Universal web scraper for various association websites
 Extracts HTML from multiple sources and converts to Event objects
 """
+import hashlib
+import json
 import logging
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, List, Optional, Dict, Any, Tuple, Iterator
+from urllib.parse import urljoin
 from datetime import datetime
 import re
 from scrapers.website_config import WebsiteConfig, SelectorConfig
@@ -14,18 +18,39 @@ import requests
 from bs4 import BeautifulSoup
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.http_cache import get_http_cache
+from scrapers.http_session import get_shared_session, read_limited
+from scrapers.politeness import get_politeness_scheduler
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.crawl_frontier import CrawlFrontier
+from scrapers.selector_stats import get_selector_stats
+from scrapers.extraction_plan import ExtractionPlan, has_src, has_text
+from scrapers.parse_pool import ParseFailed, ParseTimeout, get_parse_pool
+from scrapers.structured_data import STRUCTURED_DATA_SELECTORS, StructuredEvent, extract_structured_event
+from bs4 import Tag
+from scrapers.html_backends import parse_html, select, select_one, build_strainer, dispose
 from models.event_models import Event, Association, Location, Price, EventCategory
 import config
 
 logger = logging.getLogger(__name__)
 
+# Fallback selectors for a field the site defines none for: (list view, detailed page)
+DEFAULT_FIELD_SELECTORS = {
+    "title": (["h2", ".title"], ["h1", "h2"]),
+    "date": ([".date", "time"], [".date", "time"]),
+    "description": ([], [".content", "article"]),
+    "location": ([".location", ".venue"], [".location", ".venue"]),
+    "price": ([".price", ".cost"], [".price", ".cost"]),
+}
+
 class WebScraper(BaseScraper):
     """
     Universal web scraper that can handle multiple association websites
     Each website configuration defines how to parse its specific HTML structure
     """
     
-    def __init__(self, website_config: Dict[str, Any]):
+    def __init__(self, website_config: Dict[str, Any], run_deadline: Optional[Deadline] = None,
+                 known_ids: Optional[AbstractSet[str]] = None):
         """
         Initialize web scraper for a specific website
         
@@ -35,6 +60,8 @@ class WebScraper(BaseScraper):
                 - url: Events page URL
                 - association: Association object for this website
                 - selectors: CSS selectors for parsing (dict or SelectorConfig)
+            run_deadline: Time budget of the whole run, bounding the site's own budget
+            known_ids: IDs of events already in the database, used to stop incremental crawls early
         """
         # Handle both dict and WebsiteConfig object
         if hasattr(website_config, 'name'):  
@@ -61,77 +88,313 @@ class WebScraper(BaseScraper):
 
         self.base_url = self.config.base_domain  # or use self.config.url if that's what you need
 
-        # Setup HTTP session (keep existing code)
-        self.session = requests.Session()
-        self.session.headers.update(config.REQUEST_HEADERS)
-        self.session.timeout = config.REQUEST_TIMEOUT
+        # Shared HTTP session: pooled connections, retries and HTTP cache
+        self.session = get_shared_session()
+        
+        # Time budget of the current scrape() call, nested in the run's budget
+        self.run_deadline = run_deadline
+        self.deadline = Deadline(self.config.deadline_seconds, parent=run_deadline)
+        
+        # Per-host rate limiting shared by every scraper of the process
+        self.politeness = get_politeness_scheduler()
+        
+        self.known_ids = known_ids if known_ids is not None else frozenset()
+        
+        # Which fallback selector produced each field, to report markup changes
+        self.selector_stats = get_selector_stats()
+        # Single-pass extraction plans for list elements (False) and detailed pages (True)
+        self._plans: Dict[bool, ExtractionPlan] = {}
+        
+        # Partial parsing: only the subtrees the selectors can match in are built
+        self._list_strainer = self._build_list_strainer()
+        self._detail_strainer = self._build_detail_strainer()
+        
+        # Key of the events this configuration parses, stored in the HTTP cache next to the pages:
+        # a change of the configuration (e.g. of its selectors) invalidates them
+        self._parsed_key = f"{self.source_name}:{hashlib.md5(repr(self.config).encode()).hexdigest()}"
         
         logger.info(f"Initialized WebScraper for: {self.source_name}")
     
     def scrape(self) -> List[Event]:
         """Scrape events from the configured website"""
         events = []
-        
         try:
-            target_url = self.config.url
-            logger.info(f"Fetching from {target_url}")
-            response = self.session.get(target_url)
+            for event in self.iter_events():
+                events.append(event)
+            
+        except Exception as e:
+            logger.error(f"Error scraping {self.source_name}: {e}")
+            self.last_error = str(e)
+        
+        # On error, keep the events collected before it happened
+        logger.info(f"{self.source_name}: Found {len(events)} events")
+        return events
+    
+    def iter_events(self) -> Iterator[Event]:
+        """
+        Crawl the list pages of the website and yield events as they are parsed
+        
+        Follows next_page links up to WebsiteConfig.max_pages and stops after
+        WebsiteConfig.max_events events, or once WebsiteConfig.stop_after_known
+        consecutive events are already known. Only one list page tree exists at a time, and
+        it is decomposed as soon as its events are built.
+        """
+        self.last_error = None
+        self.deadline = Deadline(self.config.deadline_seconds, parent=self.run_deadline)
+        frontier = CrawlFrontier(self.config.url, max_pages=self.config.max_pages)
+        produced = 0
+        consecutive_known = 0
+        stop_after_known = self.config.stop_after_known if self.known_ids else 0
+        
+        for page_url in frontier:
+            logger.info(f"Fetching from {page_url}")
+            response = self._get(page_url)
+            soup = self._parse_list_page(response.content)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            for next_url in self._extract_next_pages(soup, page_url):
+                frontier.add_page(next_url)
             
-            # Get event elements using configured selectors
-            event_elements = self._find_event_elements(soup)
-            logger.info(f"Found {len(event_elements)} event elements")
+            # Collect detail links first so the detailed pages can be fetched concurrently
+            candidates = [
+                (element, link) for element, link in self._collect_candidates(soup)
+                if not link or frontier.add_event(link)
+            ][:self.config.max_events - produced]
+            detailed_events = self._scrape_detailed_pages([link for _, link in candidates])
             
-            # Parse each element
-            for element in event_elements[:10]:
-                try:
-                    event_link = self._extract_event_link(element)
-                    
-                    if event_link:
-                        # Try detailed page first
-                        detailed_event = self._scrape_detailed_page(event_link)
-                        if detailed_event:
-                            events.append(detailed_event)
-                            continue  # Success, skip fallback
-                    
-                    # Fallback: parse from list view
-                    event = self._parse_event_element(element, is_detailed_page=False)
-                    if event and self._validate_event(event):
-                        events.append(event)
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to parse event: {e}")
-                    continue
+            events = self._merge_detailed_events(candidates, detailed_events)
             
-            logger.info(f"{self.source_name}: Found {len(events)} events")
-            return events  
+            # Events only hold plain strings, the page tree can go before they are handed out
+            dispose(soup)
+            del soup, candidates, detailed_events
             
-        except Exception as e:
-            logger.error(f"Error scraping {self.source_name}: {e}")
-            return []  # Return empty list on error
+            for event in events:
+                produced += 1
+                yield event
+                
+                consecutive_known = consecutive_known + 1 if event.id in self.known_ids else 0
+                if stop_after_known and consecutive_known >= stop_after_known:
+                    logger.info(f"{self.source_name}: {consecutive_known} known events in a row, "
+                                f"stopping after {frontier.pages_visited} page(s)")
+                    return
+            
+            del events
+            if produced >= self.config.max_events:
+                logger.info(f"{self.source_name}: Reached the limit of {self.config.max_events} events")
+                return
+    
+    def _build_list_strainer(self):
+        """Strainer for list pages: event containers and pagination links"""
+        selectors = self.config.selectors
+        if not selectors.event_container:
+            return None  # The built-in fallback containers need the whole page
+        return build_strainer(selectors.event_container + selectors.next_page)
+    
+    def _build_detail_strainer(self):
+        """Strainer for detailed pages: every selector (or fallback) a field is read from"""
+        detail_selectors = [self._field_selectors(field_name, True) for field_name in DEFAULT_FIELD_SELECTORS]
+        detail_selectors.append(self.config.selectors.get("image", detailed=True))
+        if self.config.structured_data:
+            detail_selectors.append(STRUCTURED_DATA_SELECTORS)
+        return build_strainer(selector for field_selectors in detail_selectors for selector in field_selectors)
+    
+    def _field_selectors(self, field_name: str, is_detailed_page: bool) -> List[str]:
+        """Configured selectors of a field, or its fallback selectors"""
+        return (self.config.selectors.get(field_name, detailed=is_detailed_page)
+                or DEFAULT_FIELD_SELECTORS[field_name][is_detailed_page])
+    
+    def _parse_page(self, content: bytes, strainer=None):
+        """Parse a page, restricted to the strainer's subtrees when partial parsing is enabled"""
+        parse_only = strainer if self.config.partial_parse else None
+        return parse_html(content, self.config.parser_backend, parse_only=parse_only)
+    
+    def _parse_list_page(self, content: bytes):
+        """Parse a list page, falling back to the whole page when the partial tree has no events"""
+        soup = self._parse_page(content, self._list_strainer)
+        if not self.config.partial_parse or self._list_strainer is None or self._find_event_elements(soup):
+            return soup
+        logger.info(f"{self.source_name}: No events in the partial tree, parsing the whole page")
+        dispose(soup)
+        return self._parse_page(content)
+    
+    def _extract_next_pages(self, soup: BeautifulSoup, page_url: str) -> List[str]:
+        """Absolute URLs of the next list pages linked from a list page"""
+        urls = []
+        for selector in self.config.selectors.next_page:
+            for link_elem in select(soup, selector):
+                href = link_elem.get('href')
+                if href and not href.startswith('#'):
+                    urls.append(urljoin(page_url, href))
+        return urls
+        
+    def _get(self, url: str) -> requests.Response:
+        """GET a page once the per-host politeness limits allow it, within the site's time budget"""
+        if self.deadline.expired():
+            raise DeadlineExceeded(f"Time budget of {self.source_name} exhausted before {url}")
+        with self.politeness.slot(self.config.base_domain, fetch=self._get_robots, deadline=self.deadline):
+            # Streamed so that oversized or non-HTML bodies are dropped before being downloaded
+            # The budget may have run out while waiting for the slot
+            timeout = self._timeout()
+            with self.deadline.applied():
+                response = self.session.get(url, timeout=timeout, stream=True)
+            read_limited(self.session, response, self.config.max_body_bytes)
+            return response
+    
+    def _get_robots(self, url: str, **kwargs) -> requests.Response:
+        """GET robots.txt for the politeness scheduler"""
+        timeout = self._timeout()
+        with self.deadline.applied():
+            return self.session.get(url, timeout=timeout)
+    
+    def _timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeouts, shortened so they never run past the deadline"""
+        remaining = self.deadline.remaining()
+        if remaining is None:
+            return (config.CONNECT_TIMEOUT, config.READ_TIMEOUT)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Time budget of {self.source_name} exhausted")
+        return (min(config.CONNECT_TIMEOUT, remaining), min(config.READ_TIMEOUT, remaining))
+    
+    def _collect_candidates(self, soup: BeautifulSoup,
+                            limit: Optional[int] = None) -> List[Tuple[Any, Optional[str]]]:
+        """Find event elements on a list page and pair each one with its detail link"""
+        # Get event elements using configured selectors
+        event_elements = self._find_event_elements(soup)
+        logger.info(f"Found {len(event_elements)} event elements")
+        
+        if limit is None:
+            limit = self.config.max_events
+        
+        candidates = []
+        for element in event_elements[:limit]:
+            try:
+                candidates.append((element, self._extract_event_link(element)))
+            except Exception as e:
+                logger.warning(f"Failed to parse event: {e}")
+        return candidates
+    
+    def _merge_detailed_events(self, candidates: List[Tuple[Any, Optional[str]]],
+                               detailed_events: List[Optional[Event]]) -> List[Event]:
+        """Combine detailed events with list view fallbacks, keeping the list view order"""
+        events = []
+        for (element, _), detailed_event in zip(candidates, detailed_events):
+            try:
+                if detailed_event:
+                    events.append(detailed_event)
+                    continue  # Success, skip fallback
+                
+                # Fallback: parse from list view
+                event = self._parse_event_element(element, is_detailed_page=False)
+                if event and self._validate_event(event):
+                    events.append(event)
+                    
+            except Exception as e:
+                logger.warning(f"Failed to parse event: {e}")
+                continue
+        return events
+    
+    def _scrape_detailed_pages(self, urls: List[Optional[str]]) -> List[Optional[Event]]:
+        """
+        Scrape detailed pages with a bounded worker pool
         
+        Returns one entry per url, in the same order; None where the url is
+        missing or the detailed page could not be scraped.
+        """
+        def scrape_one(url: Optional[str]) -> Optional[Event]:
+            if not url:
+                return None
+            if self.deadline.expired():
+                # Out of time: skip the page, the list view is used instead
+                logger.warning(f"  ⏱️ Time budget exhausted, skipping detailed page: {url}")
+                return None
+            return self._scrape_detailed_page(url)
+        
+        workers = min(max(1, self.config.detail_concurrency), len(urls))
+        if workers <= 1:
+            return [scrape_one(url) for url in urls]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="detail") as executor:
+            # map() yields results in submission order, whatever order they finish in
+            return list(executor.map(scrape_one, urls))
+    
     def _scrape_detailed_page(self, url: str) -> Optional[Event]:
         """Scrape detailed event page"""
         try:
             logger.info(f"  Visiting detailed page: {url}")
-            response = self.session.get(url)
+            response = self._get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
             
+            validator = getattr(response, "cache_validator", None)
+            if not isinstance(validator, str):
+                validator = None
             
-            event = self._parse_event_element(soup, is_detailed_page=True)
+            # Page unchanged since it was last parsed: reuse the event
+            if validator and getattr(response, "from_cache", False) is True:
+                event = self._get_parsed_page(url, validator)
+                if event:
+                    logger.info(f"  ♻️ Detailed page not modified: {url}")
+                    return event
             
-            if event:
-                logger.info(f"  ✅ Successfully scraped detailed event: {event.title[:50]}...")
-            else:
-                logger.warning(f"  ❌ Could not parse detailed event from {url}")
-                
+            event = self._parse_detailed_page(url, response.content)
+            if event and validator:
+                self._remember_parsed_page(url, validator, event)
             return event
             
         except Exception as e:
             logger.error(f"Error scraping detailed page {url}: {e}")
             return None
+    
+    def _get_parsed_page(self, url: str, validator: str) -> Optional[Event]:
+        """Event parsed earlier, possibly by a previous run, from the same version of a detailed page"""
+        http_cache = get_http_cache()
+        data = http_cache.lookup_parsed(url, self._parsed_key, validator) if http_cache else None
+        if data is None:
+            return None
+        try:
+            return Event.from_firestore_dict(json.loads(data), self.config.association)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable parsed event of {url}: {e}")
+            return None
+    
+    def _remember_parsed_page(self, url: str, validator: str, event: Event):
+        """Store the event parsed from a detailed page next to the page in the HTTP cache, for later runs"""
+        http_cache = get_http_cache()
+        if http_cache:
+            http_cache.store_parsed(url, self._parsed_key, validator,
+                                    json.dumps(event.to_firestore_dict(), ensure_ascii=False))
+    
+    def _parse_detailed_page(self, url: str, content: bytes) -> Optional[Event]:
+        """Parse the downloaded content of a detailed event page"""
+        parse_pool = get_parse_pool()
+        if parse_pool is None:
+            event = self._parse_detailed_content(content)
+        else:
+            try:
+                event, selector_hits = parse_pool.parse_detailed_page(self.config, url, content)
+            except (ParseTimeout, ParseFailed) as e:
+                logger.error(f"  ⏱️ Skipping pathological page: {e}")
+                return None
+            if self.selector_stats:
+                self.selector_stats.add_run(selector_hits)
+        
+        if event:
+            logger.info(f"  ✅ Successfully scraped detailed event: {event.title[:50]}...")
+        else:
+            logger.warning(f"  ❌ Could not parse detailed event from {url}")
+            
+        return event
+    
+    def _parse_detailed_content(self, content: bytes) -> Optional[Event]:
+        """Build the event of a detailed page (runs in a parse worker when the pool is enabled)"""
+        soup = self._parse_page(content, self._detail_strainer)
+        event = self._parse_event_element(soup, is_detailed_page=True)
+        
+        if event is None and self.config.partial_parse and self._detail_strainer is not None:
+            # Nothing found in the partial tree, try again with the whole page
+            dispose(soup)
+            soup = self._parse_page(content)
+            event = self._parse_event_element(soup, is_detailed_page=True)
+        dispose(soup)
+        return event
             
 
     def _extract_event_link(self, element) -> Optional[str]:
@@ -140,7 +403,7 @@ class WebScraper(BaseScraper):
         selectors = self.config.selectors.event_link or ["a"]
         
         for selector in selectors:
-            link_elem = element.select_one(selector)
+            link_elem = select_one(element, selector)
             if link_elem and link_elem.get('href'):
                 url = link_elem['href']
                 
@@ -160,7 +423,7 @@ class WebScraper(BaseScraper):
         selectors = self.config.selectors.event_container
         
         for selector in selectors:
-            elements = soup.select(selector)
+            elements = select(soup, selector)
             if elements:
                 return elements
         
@@ -174,7 +437,7 @@ class WebScraper(BaseScraper):
         ]
         
         for selector in default_selectors:
-            elements = soup.select(selector)
+            elements = select(soup, selector)
             if elements:
                 return elements
         
@@ -185,17 +448,30 @@ class WebScraper(BaseScraper):
         try:
             logger.debug(f"  Parsing {'detailed' if is_detailed_page else 'list'} page element")
             
-            # Extract basic fields
-            title = self._extract_title_from_element(element, is_detailed_page)
+            # Structured data first, the CSS selectors only fill the fields it lacks
+            structured = self._extract_structured_data(element, is_detailed_page)
+            
+            # Match the selectors of every field in one pass over the element
+            matches = None if structured.complete() else self._match_fields(element, is_detailed_page)
+            
+            # Extract basic fields. The title always comes from the selectors when they find one:
+            # the event ID is derived from it and must not change with the page's structured data
+            title = self._extract_title_from_element(element, is_detailed_page, matches) or structured.title
             if not title:
                 return None
             
             event_id = Event.generate_id(title, self.source_name)
             
             # Extract remaining fields
-            date_str = self._extract_date_from_element(element, is_detailed_page)
-            description = self._extract_description_from_element(element, is_detailed_page, title)
-            location = self._create_location_from_element(element, is_detailed_page)
+            date_str = (self._safe_truncate(structured.date, "time") if structured.date
+                        else self._extract_date_from_element(element, is_detailed_page, matches))
+            description = (structured.description
+                           or self._extract_description_from_element(element, is_detailed_page, title, matches,
+                                                                     fallback=structured.excerpt))
+            if structured.location:
+                location = self._create_structured_location(structured)
+            else:
+                location = self._create_location_from_element(element, is_detailed_page, matches)
             
             # Get association from config
             association = self.config.association
@@ -204,9 +480,16 @@ class WebScraper(BaseScraper):
                 return None
             
             # Extract remaining fields
-            price = self._extract_price_from_element(element, is_detailed_page)
+            if structured.price_chf is not None:
+                price = Price(cents=round(structured.price_chf * 100))
+            else:
+                price = self._extract_price_from_element(element, is_detailed_page, matches)
             tags = self._generate_tags(title, description)
-            image_url = self._extract_image_url(element, self._get_image_selectors(is_detailed_page))
+            if structured.image:
+                image_url = urljoin(self.config.base_domain.rstrip('/') + '/', structured.image)
+            else:
+                image_url = self._extract_image_url(element, self._get_image_selectors(is_detailed_page),
+                                                    detailed=is_detailed_page, matches=matches)
             
             # Create Event object
             return self._create_event_from_fields(
@@ -218,44 +501,86 @@ class WebScraper(BaseScraper):
             self.logger.error(f"Error parsing event: {e}")
             return None
         
-    def _extract_title_from_element(self, element, is_detailed_page: bool) -> Optional[str]:
+    def _extract_structured_data(self, element, is_detailed_page: bool) -> StructuredEvent:
+        """JSON-LD / OpenGraph fields of a detailed page (nothing for list elements, whose page data is the listing's)"""
+        if not is_detailed_page or not self.config.structured_data:
+            return StructuredEvent()
+        return extract_structured_event(element)
+    
+    def _create_structured_location(self, structured: StructuredEvent) -> Location:
+        """Location named by structured data, at its coordinates when given"""
+        has_geo = structured.latitude is not None
+        return Location(
+            latitude=structured.latitude if has_geo else self.config.coordinates["latitude"],
+            longitude=structured.longitude if has_geo else self.config.coordinates["longitude"],
+            name=structured.location[:100]
+        )
+    
+    def _match_fields(self, element, is_detailed_page: bool) -> Optional[Dict[str, Any]]:
+        """First match of every field selector (selector -> element), None when the element is not a BeautifulSoup tag"""
+        if not isinstance(element, Tag):
+            return None  # Other backends are searched field by field
+        plan = self._plans.get(is_detailed_page)
+        if plan is None:
+            fields = {
+                field_name: (self._field_selectors(field_name, is_detailed_page), has_text)
+                for field_name in DEFAULT_FIELD_SELECTORS
+            }
+            fields["image"] = (self._get_image_selectors(is_detailed_page), has_src)
+            plan = self._plans[is_detailed_page] = ExtractionPlan(fields)
+        return plan.run(element)
+    
+    def _extract_title_from_element(self, element, is_detailed_page: bool,
+                                    matches: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Extract title from element"""
         return self._extract_text_with_selectors(
             element, 
             self.config.selectors.get("title", detailed=is_detailed_page),
             field_name="title",
-            default_selectors=["h1", "h2"] if is_detailed_page else ["h2", ".title"]
+            detailed=is_detailed_page,
+            matches=matches,
+            default_selectors=DEFAULT_FIELD_SELECTORS["title"][is_detailed_page]
         )
     
-    def _extract_date_from_element(self, element, is_detailed_page: bool) -> str:
+    def _extract_date_from_element(self, element, is_detailed_page: bool,
+                                   matches: Optional[Dict[str, Any]] = None) -> str:
         """Extract date from element"""
         return self._extract_text_with_selectors(
             element,
             self.config.selectors.get("date", is_detailed_page),
             field_name="date",
-            default_selectors=[".date", "time"],
+            detailed=is_detailed_page,
+            matches=matches,
+            default_selectors=DEFAULT_FIELD_SELECTORS["date"][is_detailed_page],
             default_value="Date TBA"
         )
     
-    def _extract_description_from_element(self, element, is_detailed_page: bool, title: str) -> str:
-        """Extract description from element"""
+    def _extract_description_from_element(self, element, is_detailed_page: bool, title: str,
+                                          matches: Optional[Dict[str, Any]] = None,
+                                          fallback: Optional[str] = None) -> str:
+        """Extract description from element, fallback (e.g. og:description) when no selector matches"""
         return self._extract_text_with_selectors(
             element,
             self.config.selectors.get("description", is_detailed_page),
             field_name="description",
-            default_selectors=[".content", "article"] if is_detailed_page else [],
-            default_value=f"Event organized by {self.source_name}. {title}. Visit event page for details."
+            detailed=is_detailed_page,
+            matches=matches,
+            default_selectors=DEFAULT_FIELD_SELECTORS["description"][is_detailed_page],
+            default_value=fallback or f"Event organized by {self.source_name}. {title}. Visit event page for details."
         )
     
 
         
-    def _create_location_from_element(self, element, is_detailed_page: bool) -> Location:
+    def _create_location_from_element(self, element, is_detailed_page: bool,
+                                      matches: Optional[Dict[str, Any]] = None) -> Location:
         """Create Location object from element"""
         location_name = self._extract_text_with_selectors(
             element,
             self.config.selectors.get("location", is_detailed_page),
             field_name="location",
-            default_selectors=[".location", ".venue"],
+            detailed=is_detailed_page,
+            matches=matches,
+            default_selectors=DEFAULT_FIELD_SELECTORS["location"][is_detailed_page],
             default_value="EPFL Campus (check event for exact location)"
         )
         return Location(
@@ -264,13 +589,16 @@ class WebScraper(BaseScraper):
             name=location_name[:100]
         )
     
-    def _extract_price_from_element(self, element, is_detailed_page: bool) -> Price:
+    def _extract_price_from_element(self, element, is_detailed_page: bool,
+                                    matches: Optional[Dict[str, Any]] = None) -> Price:
         """Extract price from element"""
         price_text = self._extract_text_with_selectors(
             element,
             self.config.selectors.get("price", is_detailed_page),
             field_name="price",
-            default_selectors=[".price", ".cost"],
+            detailed=is_detailed_page,
+            matches=matches,
+            default_selectors=DEFAULT_FIELD_SELECTORS["price"][is_detailed_page],
             default_value=""
         )
         return self._parse_price(price_text)
@@ -299,25 +627,40 @@ class WebScraper(BaseScraper):
     def _extract_text_with_selectors(self, element, selectors: List[str], 
                                 field_name: str, 
                                 default_selectors: List[str] = None,
-                                default_value: str = "") -> str:
+                                default_value: str = "",
+                                detailed: bool = False,
+                                matches: Optional[Dict[str, Any]] = None) -> str:
         """
         Extract text using selectors with proper fallback logic
+        
+        matches holds the precomputed first match of each selector (see _match_fields)
         """
         if not selectors and default_selectors:
             selectors = default_selectors
         
+        stats_field = self._stats_field(field_name, detailed)
+        # Always in the configured priority: the winning selector decides the value (and, for titles, the ID)
         for selector in selectors:
             if not selector or selector.strip() in ["", ".", "*"]:
                 continue
                 
-            elem = element.select_one(selector)
+            elem = matches.get(selector) if matches is not None else select_one(element, selector)
             if elem and elem.text.strip():
-                
+                self._record_selector_hit(stats_field, selector)
                 
                 max_len = MAX_FIELD_LENGTHS.get(field_name, 500)
                 return elem.text.strip()[:max_len]
         
+        self._record_selector_hit(stats_field, None)
         return default_value
+    
+    @staticmethod
+    def _stats_field(field_name: str, is_detailed_page: bool) -> str:
+        return f"detailed_{field_name}" if is_detailed_page else field_name
+    
+    def _record_selector_hit(self, stats_field: str, selector: Optional[str]):
+        if self.selector_stats:
+            self.selector_stats.record(self.source_name, stats_field, selector)
             
     def _validate_event(self, event: Event) -> bool:
         """Validate that an event has required fields"""
@@ -329,52 +672,21 @@ class WebScraper(BaseScraper):
             return False
         return True
 
-    def _generate_tags(self, title: str, description: str) -> List[str]:
-        """Generate tags based on content"""
-        tags = []
-        text = (title + " " + description).lower()
-        
-        
-        if any(word in text for word in ["ski", "snowboard", "bouldering", "sport", "hike"]):
-            tags.append("Sports")
-        if any(word in text for word in ["party", "social", "dinner", "apero", "drinks"]):
-            tags.append("Social")
-        if any(word in text for word in ["weekend", "trip", "travel", "excursion"]):
-            tags.append("Trip")
-        if any(word in text for word in ["workshop", "course", "tutorial", "lecture"]):
-            tags.append("Workshop")
-        if any(word in text for word in ["market", "christmas", "festive"]):
-            tags.append("Cultural")
-        if any(word in text for word in ["chocolate", "food", "dinner", "sushi"]):
-            tags.append("Food")
-        
-        return tags
-
-
-    
-
-    
-    def _safe_truncate(self, text: str, field: str) -> str:
-        """Safely truncate text to max length for field"""
-        
-        if not text:
-            return text
-        
-        max_len = MAX_FIELD_LENGTHS.get(field, 500)
-        return text.strip()[:max_len]
-    
     def _extract_image_url(self, element, selectors: List[str], 
-                       default_selectors: List[str] = None) -> Optional[str]:
+                       default_selectors: List[str] = None, detailed: bool = False,
+                       matches: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Extract image URL from selectors"""
         if not selectors and default_selectors:
             selectors = default_selectors
         
+        stats_field = self._stats_field("image", detailed)
         for selector in selectors:
             if not selector or selector.strip() in ["", ".", "*"]:
                 continue
                 
-            img_elem = element.select_one(selector)
+            img_elem = matches.get(selector) if matches is not None else select_one(element, selector)
             if img_elem and img_elem.get('src'):
+                self._record_selector_hit(stats_field, selector)
                 url = img_elem['src']
                 
                 if url and not url.startswith('http'):
@@ -385,37 +697,5 @@ class WebScraper(BaseScraper):
                         url = f"{base_domain}/{url}"
                 return url
         
+        self._record_selector_hit(stats_field, None)
         return None
-
-    
-    def _parse_price(self, price_text: Optional[str]) -> Price:
-        """Parse price text robustly"""
-        if not price_text:
-            return Price(cents=0)
-        
-        price_text = price_text.lower()
-        
-        # 2. Look for "free" first if there are no numbers following
-        if "free" in price_text and not re.search(r'\d+', price_text):
-            return Price(cents=0)
-        
-        # 2. Looks for common
-        patterns = [
-            r'chf\s*(\d+\.?\d*)',          # "CHF 5"
-            r'(\d+\.?\d*)\s*chf',          # "5 CHF"
-            r'(\d+)\s*\.-',                # "5.-"
-            r'entry\s*:\s*(\d+)',          # "Entry: 5"
-            r'entrée\s*:\s*(\d+)',         # "Entrée: 5"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, price_text, re.IGNORECASE)
-            if match:
-                try:
-                    amount = float(match.group(1))
-                    return Price(cents=int(amount * 100))
-                except ValueError:
-                    pass
-        
-        return Price(cents=0) 
-    
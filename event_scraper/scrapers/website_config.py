@@ -1,6 +1,6 @@
 
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
 from models.event_models import Association, EventCategory
 from config import VENUE_SELECTOR
 from config import LOCATION_FIELD_SELECTOR
@@ -9,10 +9,18 @@ from config import PRICE_FIELD_SELECTOR
 from config import COST_SELECTOR
 from config import PRICE_ELEMENT_SELECTOR
 from config import IMAGE_FIELD_SELECTOR
+from config import HTTP_MAX_BODY_BYTES
+from scrapers.html_backends import compile_selectors
 
 
 DEFAULT_LOCATION_NAME = "EPFL Campus" 
 DEFAULT_COORDINATES = {"latitude": 46.5191, "longitude": 6.5668, "name": DEFAULT_LOCATION_NAME}
+DEFAULT_DETAIL_CONCURRENCY = 4
+DEFAULT_SITE_DEADLINE_SECONDS = 300
+DEFAULT_MAX_PAGES = 1
+DEFAULT_MAX_EVENTS = 10
+DEFAULT_STOP_AFTER_KNOWN = 5
+DEFAULT_PARSER_BACKEND = "html.parser"
 
 @dataclass
 class SelectorConfig:
@@ -31,6 +39,14 @@ class SelectorConfig:
     detailed_location: List[str] = field(default_factory=list)
     detailed_price: List[str] = field(default_factory=list)
     detailed_image: List[str] = field(default_factory=list)
+    # Links to the next list page(s), followed up to WebsiteConfig.max_pages
+    next_page: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        """Compile every selector once; invalid CSS fails here instead of on every event"""
+        for selector_field in fields(self):
+            selectors = getattr(self, selector_field.name)
+            setattr(self, selector_field.name, compile_selectors(selectors, selector_field.name))
     
     def get(self, key: str, detailed: bool = False) -> List[str]:
         """Get selectors with fallback logic"""
@@ -59,6 +75,7 @@ class SelectorConfig:
             "detailed_location": self.detailed_location,
             "detailed_price": self.detailed_price,
             "detailed_image": self.detailed_image,
+            "next_page": self.next_page,
         }
 
 @dataclass
@@ -71,6 +88,25 @@ class WebsiteConfig:
     association: Association
     coordinates: dict = field(default_factory=lambda: DEFAULT_COORDINATES.copy())
     default_location: str = DEFAULT_LOCATION_NAME
+    # Maximum number of detail pages fetched and parsed at the same time
+    detail_concurrency: int = DEFAULT_DETAIL_CONCURRENCY
+    # Wall-clock budget for the whole site; remaining detail pages are skipped once spent
+    deadline_seconds: Optional[float] = DEFAULT_SITE_DEADLINE_SECONDS
+    # Crawl limits: list pages followed through next_page links, and events returned
+    max_pages: int = DEFAULT_MAX_PAGES
+    max_events: int = DEFAULT_MAX_EVENTS
+    # Newest-first listings: stop crawling after this many consecutive already known events (0 = never)
+    stop_after_known: int = DEFAULT_STOP_AFTER_KNOWN
+    # Responses larger than this are aborted while streaming
+    max_body_bytes: int = HTTP_MAX_BODY_BYTES
+    # HTML parser: "html.parser", "lxml" or "selectolax" (see scrapers.html_backends)
+    parser_backend: str = DEFAULT_PARSER_BACKEND
+    # Build only the subtrees matched by the container/detail selectors (BeautifulSoup backends)
+    partial_parse: bool = True
+    # Read detailed pages' JSON-LD / OpenGraph data first, CSS selectors only fill the missing fields
+    structured_data: bool = True
+    # RSS, Atom or iCal feed of the events: read by FeedScraper instead of crawling the HTML pages
+    feed_url: Optional[str] = None
 
 
 ESN_EPFL_CONFIG = WebsiteConfig(
@@ -95,7 +131,11 @@ ESN_EPFL_CONFIG = WebsiteConfig(
         detailed_location=[LOCATION_FIELD_SELECTOR],
         detailed_price=[PRICE_FIELD_SELECTOR],
         detailed_image=[IMAGE_FIELD_SELECTOR , ".main-image img"],
+        next_page=["li.pager-next a", ".pager__item--next a"],
     ),
+    max_pages=3,
+    max_events=30,
+    parser_backend="lxml",
     
     association=Association(
         id="esn_epfl_lausanne",
@@ -153,7 +193,13 @@ AGEPOLY_CONFIG = WebsiteConfig(
         detailed_location=[".event-location", VENUE_SELECTOR, LOCATION_ELEMENT_SELECTOR],
         detailed_price=[PRICE_ELEMENT_SELECTOR, COST_SELECTOR, ".event-price"],
         detailed_image=[".wp-post-image", "img.attachment-post-thumbnail", ".entry-content img"],
+
+        # WordPress pagination
+        next_page=["a.next.page-numbers", ".nav-links a.next"],
     ),
+    max_pages=3,
+    max_events=30,
+    parser_backend="lxml",
 
     association=Association(
         id="agepoly_epfl",
@@ -2,10 +2,16 @@
 
 import sys
 import os
+import tempfile
 
 # Set up path to include project root
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 # Set environment variable for Firebase credentials
-os.environ['FIREBASE_CREDENTIALS_PATH'] = os.path.join(project_root, "serviceAccountKey.json")
\ No newline at end of file
+os.environ['FIREBASE_CREDENTIALS_PATH'] = os.path.join(project_root, "serviceAccountKey.json")
+
+# Keep the HTTP cache of test runs out of the project directory
+os.environ['HTTP_CACHE_DIR'] = tempfile.mkdtemp(prefix="http_cache_")
+os.environ['SELECTOR_STATS_PATH'] = os.path.join(tempfile.mkdtemp(prefix="selector_stats_"), "selector_stats.json")
+os.environ['EVENT_INDEX_PATH'] = os.path.join(tempfile.mkdtemp(prefix="event_index_"), "event_index.sqlite3")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Unit tests for AsyncWebScraper with a mocked httpx transport"""
+import asyncio
+import dataclasses
+import threading
+import pytest
+import httpx
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.async_web_scraper import AsyncWebScraper, scrape_websites_async
+from scrapers.deadline import Deadline
+from scrapers.politeness import PolitenessScheduler
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import WebsiteConfig, SelectorConfig
+from models.event_models import Association, EventCategory
+
+LIST_HTML = """
+<html><body>
+    <div class="event-item"><h2 class="event-title"><a href="/events/1">List Event 1</a></h2></div>
+    <div class="event-item"><h2 class="event-title"><a href="/events/2">List Event 2</a></h2></div>
+</body></html>
+"""
+
+PAGED_LIST_HTML = """
+<html><body>
+    <div class="event-item"><h2 class="event-title"><a href="/events/{a}">List Event {a}</a></h2></div>
+    <div class="event-item"><h2 class="event-title"><a href="/events/{b}">List Event {b}</a></h2></div>
+    <a class="next" href="/events?page={next}">Next</a>
+</body></html>
+"""
+
+DETAIL_HTML = """
+<html><body>
+    <h1 class="event-title">Detailed {n}</h1>
+    <div class="event-content"><p>Details of event {n}.</p></div>
+</body></html>
+"""
+
+
+def make_config(name: str, domain: str) -> WebsiteConfig:
+    return WebsiteConfig(
+        name=name,
+        url=f"https://{domain}/events",
+        base_domain=f"https://{domain}",
+        selectors=SelectorConfig(
+            event_container=[".event-item"],
+            title=[".event-title"],
+            event_link=[".event-title a"],
+            detailed_title=["h1.event-title"],
+            detailed_description=[".event-content"],
+        ),
+        association=Association(
+            id=f"{name}_association",
+            name=name,
+            description="Test Description",
+            event_category=EventCategory.SOCIAL
+        ),
+    )
+
+
+class TestAsyncWebScraper:
+    """Test AsyncWebScraper on a single event loop"""
+
+    @pytest.fixture(autouse=True)
+    def politeness(self):
+        scheduler = PolitenessScheduler(requests_per_second=1000, burst=1000, respect_crawl_delay=False)
+        with patch("scrapers.web_scraper.get_politeness_scheduler", return_value=scheduler):
+            yield scheduler
+
+    def run(self, handler, configs, max_in_flight=10, known_ids=None):
+        async def go():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await scrape_websites_async(configs, max_in_flight=max_in_flight, client=client,
+                                                   known_ids=known_ids)
+        return asyncio.run(go())
+
+    def test_scrapes_all_sites_with_detail_fallback(self):
+        """Every site is scraped and failed detail pages fall back to the list view"""
+        def handler(request):
+            path = request.url.path
+            if path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            if request.url.host == "b.example.com" and path.endswith("/2"):
+                return httpx.Response(500)
+            return httpx.Response(200, html=DETAIL_HTML.format(n=path[-1]))
+
+        results = self.run(handler, [make_config("A", "a.example.com"), make_config("B", "b.example.com")])
+
+        assert [e.title for e in results[0]] == ["Detailed 1", "Detailed 2"]
+        assert [e.title for e in results[1]] == ["Detailed 1", "List Event 2"]
+
+    def test_failing_site_returns_empty_list(self):
+        """A site whose list page fails does not affect the others"""
+        def handler(request):
+            if request.url.host == "down.example.com":
+                raise httpx.ConnectError("down")
+            if request.url.path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            return httpx.Response(200, html=DETAIL_HTML.format(n=request.url.path[-1]))
+
+        results = self.run(handler, [make_config("Down", "down.example.com"), make_config("Up", "up.example.com")])
+
+        assert results[0] == []
+        assert len(results[1]) == 2
+
+    def test_global_in_flight_limit(self):
+        """No more than max_in_flight requests are awaited at the same time"""
+        state = {"current": 0, "max": 0}
+
+        async def handler(request):
+            state["current"] += 1
+            state["max"] = max(state["max"], state["current"])
+            await asyncio.sleep(0.01)
+            state["current"] -= 1
+            if request.url.path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            return httpx.Response(200, html=DETAIL_HTML.format(n=request.url.path[-1]))
+
+        configs = [make_config(f"S{i}", f"s{i}.example.com") for i in range(5)]
+        results = self.run(handler, configs, max_in_flight=2)
+
+        assert all(len(events) == 2 for events in results)
+        assert state["max"] == 2
+
+
+    def test_pagination_stops_after_known_events(self):
+        """List pages are followed like in WebScraper, until only known events are found"""
+        def handler(request):
+            if request.url.path == "/events":
+                page = int(request.url.params.get("page", 1))
+                return httpx.Response(200, html=PAGED_LIST_HTML.format(a=2 * page - 1, b=2 * page, next=page + 1))
+            return httpx.Response(200, html=DETAIL_HTML.format(n=request.url.path[-1]))
+
+        base = make_config("A", "a.example.com")
+        config = dataclasses.replace(base, max_pages=5, stop_after_known=2,
+                                     selectors=dataclasses.replace(base.selectors, next_page=["a.next"]))
+        [all_events] = self.run(handler, [dataclasses.replace(config, max_pages=2)])
+        known = {event.id for event in all_events[2:]}  # Everything from page 2 on is known
+
+        [events] = self.run(handler, [config], known_ids=known)
+
+        assert [e.title for e in all_events] == ["Detailed 1", "Detailed 2", "Detailed 3", "Detailed 4"]
+        assert [e.title for e in events] == ["Detailed 1", "Detailed 2", "Detailed 3", "Detailed 4"]
+
+    def test_body_limits(self):
+        """Oversized or non-HTML detail pages are dropped and the list view is used instead"""
+        def handler(request):
+            if request.url.path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            if request.url.path.endswith("/1"):
+                return httpx.Response(200, content=b"%PDF-1.4", headers={"Content-Type": "application/pdf"})
+            return httpx.Response(200, html=DETAIL_HTML.format(n=2) + "<!--" + "x" * 4096 + "-->")
+
+        config = dataclasses.replace(make_config("A", "a.example.com"), max_body_bytes=2048)
+        [events] = self.run(handler, [config])
+
+        assert [e.title for e in events] == ["List Event 1", "List Event 2"]
+
+    def test_parsing_off_the_event_loop(self):
+        """Pages are parsed in worker threads, never on the event loop's thread"""
+        parse_threads = set()
+        parse_detailed_page = WebScraper._parse_detailed_page
+
+        def recording_parse(self, url, content):
+            parse_threads.add(threading.get_ident())
+            return parse_detailed_page(self, url, content)
+
+        def handler(request):
+            if request.url.path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            return httpx.Response(200, html=DETAIL_HTML.format(n=request.url.path[-1]))
+
+        with patch.object(AsyncWebScraper, "_parse_detailed_page", recording_parse):
+            [events] = self.run(handler, [make_config("A", "a.example.com")])
+
+        assert len(events) == 2
+        assert parse_threads and threading.get_ident() not in parse_threads
+
+    def test_politeness_slot_per_request(self, politeness):
+        """Every request goes through the per-host politeness scheduler"""
+        hosts = []
+        async_slot = politeness.async_slot
+
+        def recording_slot(base_domain, fetch=None, deadline=None):
+            hosts.append(base_domain)
+            return async_slot(base_domain, fetch, deadline)
+
+        def handler(request):
+            if request.url.path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            return httpx.Response(200, html=DETAIL_HTML.format(n=request.url.path[-1]))
+
+        with patch.object(politeness, "async_slot", recording_slot):
+            self.run(handler, [make_config("A", "a.example.com")])
+
+        assert hosts == ["https://a.example.com"] * 3
+
+    def test_scrape_on_private_loop(self):
+        """scrape() keeps the scraper's run deadline and reports failures in last_error"""
+        def handler(request):
+            if request.url.host == "down.example.com":
+                raise httpx.ConnectError("down")
+            if request.url.path == "/events":
+                return httpx.Response(200, html=LIST_HTML)
+            return httpx.Response(200, html=DETAIL_HTML.format(n=request.url.path[-1]))
+
+        def client(max_in_flight):
+            return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        with patch("scrapers.async_web_scraper.create_async_client", client):
+            up = AsyncWebScraper(make_config("Up", "up.example.com"))
+            down = AsyncWebScraper(make_config("Down", "down.example.com"))
+            out_of_time = AsyncWebScraper(make_config("Up", "up.example.com"), run_deadline=Deadline(0))
+
+            assert [e.title for e in up.scrape()] == ["Detailed 1", "Detailed 2"]
+            assert up.last_error is None
+            assert down.scrape() == [] and "down" in down.last_error
+            assert out_of_time.scrape() == [] and "Time budget" in out_of_time.last_error
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Tests for the record/replay HTTP transport"""
+import gzip
+import json
+import pytest
+from unittest.mock import patch
+import requests
+from requests.adapters import HTTPAdapter
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.cassette import Cassette, CassetteMiss, RecordingAdapter, ReplayAdapter
+from scrapers.http_session import SharedSession, read_limited
+from scrapers.politeness import PolitenessScheduler
+from scrapers.web_scraper import WebScraper
+from models.event_models import Association, EventCategory
+
+LIST_PAGE = b"""
+<div class="event-item">
+    <h2 class="event-title"><a href="/events/1">Replayed Event</a></h2>
+    <div class="event-description">Served from a cassette</div>
+</div>
+"""
+
+
+def make_response(status, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.reason = "OK" if status == 200 else "Not Found"
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+def session_with(adapter):
+    session = SharedSession()
+    session.mount("https://", adapter)
+    return session
+
+
+def record(path, exchanges):
+    """Record {url: [(status, body)]} through a RecordingAdapter, returns the cassette"""
+    cassette = Cassette(str(path))
+    pending = {url: list(responses) for url, responses in exchanges.items()}
+
+    def fake_send(self, request, **kwargs):
+        status, body = pending[request.url].pop(0)
+        return make_response(status, body, {"Content-Type": "text/html", "Content-Encoding": "gzip"})
+
+    session = session_with(RecordingAdapter(cassette))
+    with patch.object(HTTPAdapter, "send", fake_send):
+        for url, responses in exchanges.items():
+            for _ in responses:
+                session.get(url)
+    session.close()
+    return cassette
+
+
+class TestCassette:
+    """Test recording and replaying exchanges"""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        record(path, {"https://a.ch/events": [(200, b"<html>list</html>")]})
+
+        session = session_with(ReplayAdapter(Cassette.load(str(path))))
+        response = session.get("https://a.ch/events")
+
+        assert response.status_code == 200
+        assert response.content == b"<html>list</html>"
+        # Bodies are stored decoded
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Content-Length"] == str(len(b"<html>list</html>"))
+
+    def test_file_format_is_versioned_gzip(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        record(path, {"https://a.ch/events": [(200, b"x")]})
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["version"] == 1
+        assert data["interactions"][0]["request"]["url"] == "https://a.ch/events"
+
+        data["version"] = 99
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        with pytest.raises(ValueError):
+            Cassette.load(str(path))
+
+    def test_written_once_when_closed(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        cassette = Cassette(str(path))
+        session = session_with(RecordingAdapter(cassette))
+        session.mount("http://", session.get_adapter("https://a.ch"))
+
+        with patch.object(HTTPAdapter, "send", lambda self, request, **kwargs: make_response(200, b"x")):
+            for page in range(3):
+                session.get(f"https://a.ch/{page}")
+        assert not path.exists()
+
+        with patch("scrapers.cassette.os.replace", wraps=os.replace) as replace:
+            session.close()  # The adapter is mounted twice, the file is written once
+
+        replace.assert_called_once()
+        assert len(Cassette.load(str(path)).interactions) == 3
+        assert list(tmp_path.iterdir()) == [path]  # No temporary file left
+
+    def test_repeated_requests_replay_in_order(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        record(path, {"https://a.ch/page": [(404, b"missing"), (200, b"found")]})
+
+        session = session_with(ReplayAdapter(Cassette.load(str(path))))
+
+        assert session.get("https://a.ch/page").status_code == 404
+        assert session.get("https://a.ch/page").content == b"found"
+        assert session.get("https://a.ch/page").content == b"found"
+
+    def test_unknown_request_is_a_miss(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        record(path, {"https://a.ch/events": [(200, b"x")]})
+
+        session = session_with(ReplayAdapter(Cassette.load(str(path))))
+
+        with pytest.raises(CassetteMiss):
+            session.get("https://a.ch/other")
+
+    def test_replay_latency_and_streaming(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        record(path, {"https://a.ch/events": [(200, b"<html>list</html>")]})
+        session = session_with(ReplayAdapter(Cassette.load(str(path)), latency=0.25))
+
+        with patch("scrapers.cassette.time.sleep") as sleep:
+            response = session.get("https://a.ch/events", stream=True)
+
+        sleep.assert_called_once_with(0.25)
+        assert read_limited(session, response, max_bytes=100) == b"<html>list</html>"
+
+    def test_web_scraper_runs_offline(self, tmp_path):
+        path = tmp_path / "site.cassette"
+        record(path, {
+            "https://test.example.com/events": [(200, LIST_PAGE)],
+            "https://test.example.com/events/1": [(404, b"")],
+        })
+        scraper = WebScraper({
+            "name": "Test Website",
+            "url": "https://test.example.com/events",
+            "base_domain": "https://test.example.com",
+            "association": Association("test-assoc", "Test Association", "desc", EventCategory.SOCIAL),
+            "selectors": {
+                "event_container": [".event-item"],
+                "title": [".event-title"],
+                "event_link": [".event-title a"],
+                "description": [".event-description"],
+            },
+        })
+        scraper.session = session_with(ReplayAdapter(Cassette.load(str(path))))
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+
+        events = scraper.scrape()
+
+        assert [event.title for event in events] == ["Replayed Event"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the crawl frontier and URL canonicalization"""
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.crawl_frontier import CrawlFrontier, canonicalize_url
+
+
+class TestCanonicalizeUrl:
+    """Test canonicalize_url"""
+
+    @pytest.mark.parametrize("url,expected", [
+        ("HTTPS://Epfl.ESN.ch/events/", "https://epfl.esn.ch/events"),
+        ("https://epfl.esn.ch:443/events#top", "https://epfl.esn.ch/events"),
+        ("https://epfl.esn.ch:8443/events", "https://epfl.esn.ch:8443/events"),
+        ("https://agepoly.ch/?page=2&lang=en", "https://agepoly.ch/?lang=en&page=2"),
+        ("https://agepoly.ch/e?utm_source=fb&id=1", "https://agepoly.ch/e?id=1"),
+        ("https://agepoly.ch", "https://agepoly.ch/"),
+    ])
+    def test_canonical_forms(self, url, expected):
+        assert canonicalize_url(url) == expected
+
+
+class TestCrawlFrontier:
+    """Test CrawlFrontier"""
+
+    def test_pages_are_deduplicated(self):
+        frontier = CrawlFrontier("https://epfl.esn.ch/events", max_pages=5)
+
+        assert not frontier.add_page("https://epfl.esn.ch/events/")
+        assert frontier.add_page("https://epfl.esn.ch/events?page=1")
+        assert not frontier.add_page("https://epfl.esn.ch/events?page=1#list")
+        assert list(frontier) == ["https://epfl.esn.ch/events", "https://epfl.esn.ch/events?page=1"]
+
+    def test_max_pages(self):
+        frontier = CrawlFrontier("https://a.ch/p0", max_pages=2)
+        visited = []
+        for page in frontier:
+            visited.append(page)
+            frontier.add_page(f"https://a.ch/p{len(visited)}")  # Every page links to the next one
+
+        assert visited == ["https://a.ch/p0", "https://a.ch/p1"]
+        assert frontier.pages_visited == 2
+
+    def test_events_are_deduplicated(self):
+        frontier = CrawlFrontier("https://a.ch/events")
+
+        assert frontier.add_event("https://a.ch/events/1")
+        assert not frontier.add_event("https://A.ch/events/1/")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for wall-clock deadlines"""
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.deadline import Deadline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline:
+    """Test Deadline"""
+
+    def test_unlimited(self):
+        deadline = Deadline(None)
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        assert deadline.cap(30) == 30
+
+    def test_expires(self):
+        clock = FakeClock()
+        deadline = Deadline(10, clock=clock)
+
+        clock.now += 4
+        assert deadline.remaining() == pytest.approx(6)
+        assert deadline.cap(30) == pytest.approx(6)
+
+        clock.now += 7
+        assert deadline.remaining() == 0
+        assert deadline.expired()
+
+    def test_bounded_by_parent(self):
+        clock = FakeClock()
+        run = Deadline(5, clock=clock)
+        site = Deadline(60, parent=run, clock=clock)
+        unlimited_site = Deadline(None, parent=run, clock=clock)
+
+        assert site.remaining() == pytest.approx(5)
+        assert unlimited_site.remaining() == pytest.approx(5)
+
+        clock.now += 5
+        assert site.expired()
+        assert unlimited_site.expired()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
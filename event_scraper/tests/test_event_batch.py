@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Tests for the columnar EventBatch"""
+from datetime import date
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.event_batch import EventBatch, parse_event_date
+from models.event_models import Association, Event, EventCategory, Location, Price
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import AGEPOLY_CONFIG, ESN_EPFL_CONFIG
+from tests.test_feed_scraper import RSS_FEED, feed_scraper
+from tests.test_html_backends import ESN_PAGES, scrape_with
+
+ESN = ESN_EPFL_CONFIG.association
+AGEPOLY = AGEPOLY_CONFIG.association
+
+
+def make_event(title, time, association=ESN, cents=0):
+    return Event(
+        id=Event.generate_id(title, association.name),
+        title=title,
+        description=f"About {title}",
+        location=Location(latitude=46.52, longitude=6.57, name="EPFL"),
+        time=time,
+        association=association,
+        tags=["Social"],
+        price=Price(cents=cents),
+        picture_url=None,
+    )
+
+
+@pytest.fixture
+def events():
+    return [
+        make_event("Ski Weekend", "Sat 14 Feb 2026 - 08:00"),
+        make_event("Balélec", "2026-05-08T17:00:00+02:00", AGEPOLY, cents=3500),
+        make_event("Apéro", "Date TBA"),
+        make_event("CV Workshop", "12 March 2026", AGEPOLY),
+    ]
+
+
+class TestParseEventDate:
+    """Test parse_event_date"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Sat 14 Feb 2026 - 08:00", date(2026, 2, 14)),
+        ("2026-05-08T17:00:00+02:00", date(2026, 5, 8)),
+        ("Thu, 12 Mar 2026 12:15:00 +0100", date(2026, 3, 12)),
+        ("8 mai 2026", date(2026, 5, 8)),
+        ("1er décembre 2026", date(2026, 12, 1)),
+        ("14.02.2026", date(2026, 2, 14)),
+        ("Date TBA", None),
+        ("31 Feb 2026", None),
+    ])
+    def test_formats(self, text, expected):
+        assert parse_event_date(text) == expected
+
+
+class TestEventBatch:
+    """Test EventBatch"""
+
+    def test_round_trip(self, events):
+        batch = EventBatch.from_events(events)
+
+        assert len(batch) == 4
+        assert batch.to_events() == events
+        assert batch[1] == events[1]
+        assert len(batch.associations) == 2  # Stored once per association
+
+    def test_slices_share_columns(self, events):
+        batch = EventBatch.from_events(events)
+
+        view = batch[1:3]
+
+        assert view.titles is batch.titles
+        assert view.column("titles") == ["Balélec", "Apéro"]
+        assert view[1:].to_events() == events[2:3]
+        with pytest.raises(TypeError):
+            view.append(events[0])
+
+    def test_filters(self, events):
+        batch = EventBatch.from_events(events)
+
+        new = batch.exclude_ids({events[0].id, events[2].id})
+        assert new.to_events() == [events[1], events[3]]
+        assert batch.only_ids({events[2].id}).to_events() == [events[2]]
+        assert new.for_association(AGEPOLY.id).column("titles") == ["Balélec", "CV Workshop"]
+        assert batch.for_association(ESN.id).unique_associations() == [ESN]
+
+        spring = batch.between_dates(date(2026, 3, 1), date(2026, 5, 31))
+        assert spring.column("titles") == ["Balélec", "CV Workshop"]
+        assert batch.between_dates(start=date(2026, 5, 1), keep_undated=True).column("titles") == ["Balélec", "Apéro"]
+
+    def test_firestore_payloads(self, events):
+        batch = EventBatch.from_events(events)
+
+        assert batch.to_firestore_dicts() == [event.to_firestore_dict() for event in events]
+        assert batch[2:].to_firestore_dicts() == [event.to_firestore_dict() for event in events[2:]]
+
+    def test_changed_association_gets_new_code(self, events):
+        renamed = Association(ESN.id, "ESN renamed", ESN.description, EventCategory.SOCIAL)
+        batch = EventBatch.from_events(events[:1] + [make_event("Party", "Date TBA", renamed)])
+
+        assert [event.association.name for event in batch] == [ESN.name, "ESN renamed"]
+
+
+class TestScrapersProduceBatches:
+    """Both scrapers can fill an EventBatch directly"""
+
+    def test_web_scraper(self):
+        events = scrape_with(ESN_EPFL_CONFIG, ESN_PAGES, "html.parser")
+
+        # Same crawl, collected through scrape_batch()
+        with patch.object(WebScraper, "scrape", lambda self: self.scrape_batch().to_events()):
+            batch_events = scrape_with(ESN_EPFL_CONFIG, ESN_PAGES, "html.parser")
+
+        assert len(events) >= 3
+        assert batch_events == events
+
+    def test_feed_scraper(self):
+        scraper = feed_scraper(AGEPOLY_CONFIG, RSS_FEED)
+
+        batch = scraper.scrape_batch()
+
+        assert isinstance(batch, EventBatch)
+        assert batch.column("titles") == ["Balélec Festival", "CV Workshop"]
+        assert batch.column("prices") == [3500, 0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
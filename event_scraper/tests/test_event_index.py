@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Tests for the local event index"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firestore.event_index import EventIndex, event_fingerprint
+from models.event_batch import EventBatch
+from models.event_models import Association, Event, EventCategory, Location, Price
+from tests.test_firebase_logic import offline_database
+
+UPLOADED = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeFirestore:
+    """Stands in for FirebaseDatabase.iter_event_fingerprints"""
+
+    def __init__(self, documents):
+        self.documents = documents  # (id, fingerprint, uploaded_at)
+        self.queries = []
+
+    def iter_event_fingerprints(self, uploaded_since=None):
+        self.queries.append(uploaded_since)
+        for document in self.documents:
+            if uploaded_since is None or document[2] > uploaded_since:
+                yield document
+
+
+def make_event(title):
+    association = Association("assoc", "Assoc", "Desc", EventCategory.SOCIAL)
+    return Event(Event.generate_id(title, "Assoc"), title, "Desc", Location(46.5, 6.5, "EPFL"), "Date TBA",
+                 association, ["Social"], Price(cents=0))
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = EventIndex(str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+
+class TestEventFingerprint:
+    """Test event_fingerprint"""
+
+    def test_same_content_same_fingerprint(self):
+        event = make_event("Apéro")
+        as_reference = event.to_firestore_dict()
+        as_reference["association"] = MagicMock(id="assoc")
+
+        assert event_fingerprint(event.to_firestore_dict()) == event_fingerprint(as_reference)
+        changed = event.to_firestore_dict()
+        changed["time"] = "12 March 2026"
+        assert event_fingerprint(changed) != event_fingerprint(event.to_firestore_dict())
+
+
+class TestEventIndex:
+    """Test EventIndex"""
+
+    def test_first_sync_reads_everything(self, index):
+        firestore = FakeFirestore([("a", "fa", UPLOADED), ("b", None, None)])
+
+        assert index.sync(firestore) == 2
+
+        assert firestore.queries == [None]
+        assert set(index) == {"a", "b"} and len(index) == 2
+        assert "a" in index and "c" not in index
+        assert index.fingerprint("a") == "fa"
+        assert index.watermark == UPLOADED
+
+    def test_incremental_sync_after_watermark(self, index, monkeypatch):
+        monkeypatch.setattr("firestore.event_index.config.EVENT_INDEX_SYNC_OVERLAP_SECONDS", 60)
+        firestore = FakeFirestore([("a", "fa", UPLOADED)])
+        index.sync(firestore)
+        firestore.documents += [("b", "fb", UPLOADED + timedelta(hours=6))]
+
+        assert index.sync(firestore) == 2  # "a" is read again within the overlap
+
+        assert firestore.queries[1] == UPLOADED - timedelta(seconds=60)
+        assert set(index) == {"a", "b"}
+        assert index.watermark == UPLOADED + timedelta(hours=6)
+
+    def test_persisted_between_runs(self, index):
+        index.sync(FakeFirestore([("a", "fa", UPLOADED)]))
+
+        reopened = EventIndex(index.path)
+        firestore = FakeFirestore([])
+        reopened.sync(firestore)
+
+        assert "a" in reopened
+        assert firestore.queries[0] is not None  # No full read
+        reopened.close()
+
+    def test_periodic_full_sync_drops_deleted_events(self, index, monkeypatch):
+        index.sync(FakeFirestore([("a", "fa", UPLOADED), ("deleted", "fd", UPLOADED)]))
+        monkeypatch.setattr("firestore.event_index.config.EVENT_INDEX_FULL_SYNC_DAYS", -1)
+
+        index.sync(FakeFirestore([("a", "fa", UPLOADED)]))
+
+        assert set(index) == {"a"}
+
+    def test_failed_sync_keeps_index(self, index):
+        index.sync(FakeFirestore([("a", "fa", UPLOADED)]))
+        failing = MagicMock()
+        failing.iter_event_fingerprints.return_value = iter([("b", "fb", UPLOADED + timedelta(hours=1)),
+                                                             ("c", None, None), None])
+
+        assert index.sync(failing) == 0
+
+        assert set(index) == {"a"}
+        assert index.watermark == UPLOADED
+
+    def test_failed_first_sync_raises(self, index):
+        failing = MagicMock()
+        failing.iter_event_fingerprints.side_effect = Exception("unavailable")
+
+        with pytest.raises(Exception, match="unavailable"):
+            index.sync(failing)
+
+        assert len(index) == 0 and index.watermark is None
+
+    def test_known_ids_for_batches(self, index):
+        events = [make_event("Apéro"), make_event("Ski Weekend")]
+        index.add([(events[0].id, None)])
+
+        assert EventBatch.from_events(events).exclude_ids(index).to_events() == [events[1]]
+
+    def test_changed_events_uploaded_again(self, index):
+        same, changed, legacy, new = (make_event(title) for title in ("Apéro", "Ski Weekend", "Gala", "Rallye"))
+        index.add([(same.id, event_fingerprint(same.to_firestore_dict())),
+                   (changed.id, event_fingerprint(changed.to_firestore_dict())),
+                   (legacy.id, None)])
+        changed.time = "12 March 2026"
+        batch = EventBatch.from_events([same, changed, legacy, new])
+
+        unchanged = index.unchanged_ids(batch.to_firestore_dicts())
+
+        assert unchanged == {same.id, legacy.id}
+        assert batch.exclude_ids(unchanged).to_events() == [changed, new]
+
+
+class TestDatabaseWritesIndexed:
+    """Events written by FirebaseDatabase are added to its index"""
+
+    def test_uploaded_events_recorded(self, index):
+        db = offline_database()
+        db.event_index = index
+        events = [make_event("Apéro"), make_event("Ski Weekend")]
+
+        results = db.upload_events_batch(events)
+
+        assert results["success"] == 2
+        payload = db.db.batch.return_value.set.call_args.args[1]
+        assert set(index) == {event.id for event in events}
+        assert index.fingerprint(events[1].id) == payload["_fingerprint"]
+
+    def test_failed_events_not_recorded(self, index):
+        db = offline_database()
+        db.event_index = index
+        db._known_associations.add("assoc")
+        db.db.batch.return_value.commit.side_effect = Exception("unavailable")
+        db.events_collection.document.return_value.set.side_effect = Exception("unavailable")
+
+        db.upload_events_batch([make_event("Apéro")])
+
+        assert len(index) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
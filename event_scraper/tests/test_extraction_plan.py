@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for single-pass field extraction"""
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.extraction_plan import ExtractionPlan, has_src, has_text, required_tag
+from scrapers.html_backends import parse_html, select, select_one
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import ESN_EPFL_CONFIG, AGEPOLY_CONFIG
+from tests.test_html_backends import ESN_PAGES, AGEPOLY_PAGES
+
+PAGE = b"""
+<div class="event">
+  <h2 class="title"></h2>
+  <div class="header"><h2>Real title</h2><span class="date">Mon</span></div>
+  <div class="content"><p>First</p><p>Second</p><img src="/a.jpg"></div>
+  <time>Tue</time>
+</div>
+"""
+
+
+class TestExtractionPlan:
+    """Test ExtractionPlan"""
+
+    def test_same_elements_as_select_one(self):
+        selectors = ["h2.title", ".header h2", "p", ".content img", "time", ".missing"]
+        doc = parse_html(PAGE)
+
+        matches = ExtractionPlan({"any": (selectors, lambda element: False)}).run(doc)
+
+        for selector in selectors:
+            assert matches.get(selector) is select_one(doc, selector)
+
+    def test_lower_priority_selectors_dropped(self):
+        """Once a selector gave a usable value, the ones ranked below it are not matched any more"""
+        doc = parse_html(PAGE)
+        plan = ExtractionPlan({
+            "title": (["h2.title", ".header h2", "h2", ".never"], has_text),
+            "image": ([".content img", "img"], has_src),
+        })
+
+        matches = plan.run(doc)
+
+        assert matches["h2.title"].text == ""  # Matched but empty, the next selector decides
+        assert matches[".header h2"].text == "Real title"
+        assert "h2" in matches  # Matched together with h2.title, on the first h2
+        assert ".never" not in matches
+        assert "img" in matches  # Same element as .content img, matched in the same step
+
+
+    @pytest.mark.parametrize("selector,tag_name", [
+        ("h1", "h1"),
+        ("div.content P", "p"),
+        (".field-name-field-image img", "img"),
+        ("a:not(.b c)", "a"),
+        (".date-display-single", None),
+        ("[class*='date']", None),
+        ("h1, h2", None),
+    ])
+    def test_required_tag(self, selector, tag_name):
+        assert required_tag(selector) == tag_name
+
+
+class TestScraperPlan:
+    """The single pass produces the same events as per-field searches"""
+
+    @pytest.mark.parametrize("website_config,pages", [
+        (ESN_EPFL_CONFIG, ESN_PAGES),
+        (AGEPOLY_CONFIG, AGEPOLY_PAGES),
+    ], ids=["esn", "agepoly"])
+    def test_same_events_as_per_field_search(self, website_config, pages):
+        scraper = WebScraper(website_config)
+
+        for url, html in pages.items():
+            doc = parse_html(html.encode("utf-8"))
+            detailed = url.rstrip("/") != website_config.url.rstrip("/") and "page=" not in url
+            elements = [doc] if detailed else select(doc, website_config.selectors.event_container[0])
+            for element in elements:
+                planned = scraper._parse_event_element(element, is_detailed_page=detailed)
+                with patch.object(WebScraper, "_match_fields", return_value=None):
+                    searched = scraper._parse_event_element(element, is_detailed_page=detailed)
+                assert planned == searched
+                assert planned is not None
+
+    def test_plan_built_once_per_page_kind(self):
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+        doc = parse_html(ESN_PAGES["https://epfl.esn.ch/events/ski-weekend"].encode("utf-8"))
+
+        scraper._parse_event_element(doc, is_detailed_page=True)
+        plan = scraper._plans[True]
+        scraper._parse_event_element(doc, is_detailed_page=True)
+
+        assert scraper._plans[True] is plan
+        assert False not in scraper._plans
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Tests for the RSS / Atom / iCal feed scraper"""
+import dataclasses
+import io
+import pytest
+import requests
+from unittest.mock import Mock
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.feed_scraper import FeedScraper, iter_feed_entries
+from scrapers.politeness import PolitenessScheduler
+from scrapers.site_runner import create_scraper
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import AGEPOLY_CONFIG, ESN_EPFL_CONFIG
+
+RSS_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:ev="http://purl.org/rss/1.0/modules/event/" xmlns:media="http://search.yahoo.com/mrss/">
+<channel><title>AGEPoly</title><link>https://agepoly.ch</link>
+  <item>
+    <title>Balélec Festival</title>
+    <link>https://agepoly.ch/en/balelec/</link>
+    <pubDate>Mon, 02 Mar 2026 10:00:00 +0000</pubDate>
+    <ev:startdate>2026-05-08T17:00:00+02:00</ev:startdate>
+    <ev:location>EPFL Esplanade</ev:location>
+    <description>&lt;p&gt;Concerts all night. Entry: 35&lt;/p&gt;</description>
+    <media:content url="https://agepoly.ch/wp/balelec.jpg" type="image/jpeg"/>
+  </item>
+  <item>
+    <title>CV Workshop</title>
+    <pubDate>Thu, 12 Mar 2026 12:15:00 +0100</pubDate>
+    <description>Learn to write a great CV &amp;amp; cover letter</description>
+  </item>
+</channel></rss>"""
+
+ATOM_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>ESN EPFL</title>
+  <entry>
+    <title>Ski Weekend</title>
+    <link rel="alternate" href="https://epfl.esn.ch/events/ski-weekend"/>
+    <published>2026-02-14T08:00:00Z</published>
+    <summary type="html">Two days of skiing, CHF 120.-</summary>
+  </entry>
+</feed>"""
+
+ICAL_FEED = (
+    "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//ESN//Events//EN\r\n"
+    "BEGIN:VEVENT\r\nUID:1@esn\r\nSUMMARY:Apéro International\r\n"
+    "DTSTART;TZID=Europe/Zurich:20260219T183000\r\n"
+    "DESCRIPTION:Drinks\\, snacks\\nand music at Satellite. A long description that\r\n"
+    "  is folded.\r\n"
+    "LOCATION:Satellite\\, EPFL\r\nGEO:46.5201;6.5650\r\n"
+    "URL:https://epfl.esn.ch/events/apero\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nSUMMARY:Chocolate Factory Trip\r\nDTSTART;VALUE=DATE:20260301\r\nEND:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def chunked(text, size=7):
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def feed_scraper(website_config, feed, known_ids=None, streamed=False):
+    scraper = FeedScraper(dataclasses.replace(website_config, feed_url=website_config.url + "/feed"),
+                          known_ids=known_ids)
+    scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+
+    response = requests.Response()
+    response.status_code = 200
+    if streamed:
+        # Body still on the "socket"
+        response.raw = io.BytesIO(feed.encode("utf-8"))
+        response.headers["Content-Type"] = "application/rss+xml"
+    else:
+        response._content = feed.encode("utf-8")
+        response._content_consumed = True
+    scraper.session = Mock()
+    scraper.session.get.return_value = response
+    return scraper
+
+
+class TestFeedParsing:
+    """Test iter_feed_entries"""
+
+    def test_rss(self):
+        entries = list(iter_feed_entries(chunked(RSS_FEED)))
+
+        assert [entry.title for entry in entries] == ["Balélec Festival", "CV Workshop"]
+        assert entries[0].date == "2026-05-08T17:00:00+02:00"  # Event date wins over the publication date
+        assert entries[0].location == "EPFL Esplanade"
+        assert entries[0].description == "Concerts all night. Entry: 35"
+        assert entries[0].image == "https://agepoly.ch/wp/balelec.jpg"
+        assert entries[0].link == "https://agepoly.ch/en/balelec/"
+        assert entries[1].date is None  # Only a publication date
+        assert entries[1].description == "Learn to write a great CV & cover letter"
+
+    def test_atom(self):
+        [entry] = iter_feed_entries(chunked(ATOM_FEED))
+
+        assert entry.title == "Ski Weekend"
+        assert entry.link == "https://epfl.esn.ch/events/ski-weekend"
+        assert entry.date is None  # <published> dates the post, not the event
+        assert entry.description == "Two days of skiing, CHF 120.-"
+
+    def test_ical(self):
+        entries = list(iter_feed_entries(chunked(ICAL_FEED, size=5)))
+
+        assert [entry.title for entry in entries] == ["Apéro International", "Chocolate Factory Trip"]
+        assert entries[0].date == "2026-02-19T18:30:00"
+        assert entries[0].description == ("Drinks, snacks\nand music at Satellite. "
+                                          "A long description that is folded.")
+        assert entries[0].location == "Satellite, EPFL"
+        assert (entries[0].latitude, entries[0].longitude) == (46.5201, 6.565)
+        assert entries[1].date == "2026-03-01"
+
+    def test_entries_yielded_before_feed_ends(self):
+        """The first item is available before the rest of the feed is read"""
+        chunks = iter(chunked(RSS_FEED, size=64))
+        entries = iter_feed_entries(chunks)
+
+        assert next(entries).title == "Balélec Festival"
+        assert next(chunks, None) is not None
+
+
+class TestFeedScraper:
+    """Test FeedScraper"""
+
+    def test_events_from_feed(self):
+        scraper = feed_scraper(AGEPOLY_CONFIG, RSS_FEED)
+
+        events = scraper.scrape()
+
+        assert scraper.session.get.call_count == 1
+        assert [event.title for event in events] == ["Balélec Festival", "CV Workshop"]
+        assert events[0].association == AGEPOLY_CONFIG.association
+        assert events[0].price.cents == 3500
+        assert events[0].location.name == "EPFL Esplanade"
+        assert events[0].time == "2026-05-08T17:00:00+02:00"
+        assert events[1].time == "Date TBA"
+        assert events[1].location.name == AGEPOLY_CONFIG.default_location
+        assert events[1].location.latitude == AGEPOLY_CONFIG.coordinates["latitude"]
+        assert "Workshop" in events[1].tags
+
+    def test_geo_coordinates(self):
+        events = feed_scraper(ESN_EPFL_CONFIG, ICAL_FEED).scrape()
+
+        assert events[0].location.latitude == 46.5201
+        assert events[0].location.name == "Satellite, EPFL"
+
+    def test_max_events(self):
+        scraper = feed_scraper(dataclasses.replace(AGEPOLY_CONFIG, max_events=1), RSS_FEED)
+
+        assert len(scraper.scrape()) == 1
+
+    def test_stops_after_known_events(self):
+        known = {feed_scraper(AGEPOLY_CONFIG, RSS_FEED).scrape()[0].id}
+        scraper = feed_scraper(dataclasses.replace(AGEPOLY_CONFIG, stop_after_known=1), RSS_FEED, known)
+
+        assert [event.title for event in scraper.scrape()] == ["Balélec Festival"]
+
+    def test_feed_streamed_from_the_connection(self, monkeypatch):
+        """Events are produced while the body is still being received"""
+        monkeypatch.setattr("scrapers.http_session.STREAM_CHUNK_SIZE", 64)
+        scraper = feed_scraper(AGEPOLY_CONFIG, RSS_FEED, streamed=True)
+        raw = scraper.session.get.return_value.raw
+
+        events = scraper.iter_events()
+
+        assert next(events).title == "Balélec Festival"
+        assert 0 < raw.tell() < len(RSS_FEED.encode("utf-8"))
+        assert [event.title for event in events] == ["CV Workshop"]
+
+    def test_body_limit_enforced_while_streaming(self, monkeypatch):
+        monkeypatch.setattr("scrapers.http_session.STREAM_CHUNK_SIZE", 64)
+        scraper = feed_scraper(dataclasses.replace(AGEPOLY_CONFIG, max_body_bytes=200), RSS_FEED, streamed=True)
+
+        assert scraper.scrape() == []
+        assert "exceeds 200 bytes" in scraper.last_error
+        assert scraper.session.get.return_value.raw.closed  # Rest of the body never read
+
+    def test_error_reported(self):
+        scraper = feed_scraper(AGEPOLY_CONFIG, "<rss><channel><item><title>Broken")
+
+        assert scraper.scrape() == []
+        assert scraper.last_error
+
+
+class TestCreateScraper:
+    """Feed and HTML websites can be mixed"""
+
+    def test_scraper_by_config(self):
+        feed_config = dataclasses.replace(AGEPOLY_CONFIG, feed_url="https://agepoly.ch/feed/")
+
+        assert isinstance(create_scraper(feed_config), FeedScraper)
+        assert isinstance(create_scraper(ESN_EPFL_CONFIG, known_ids={"x"}), WebScraper)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -1,7 +1,23 @@
 #!/usr/bin/env python3
 """Test Firebase data conversion logic WITHOUT actual Firebase connection"""
 import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
 from models.event_models import Event, Association, Location, Price, EventCategory
+from models.event_batch import EventBatch
+from firestore.database import FirebaseDatabase
+
+
+def offline_database():
+    """FirebaseDatabase whose Firestore client is a mock"""
+    db = FirebaseDatabase.__new__(FirebaseDatabase)
+    db.db = MagicMock()
+    db.events_collection = MagicMock()
+    db.associations_collection = MagicMock()
+    db._known_associations = set()
+    db.event_index = None
+    db.db.get_all.return_value = []
+    return db
 
 class TestFirebaseDataConversion:
     """Test data conversion logic for Firebase"""
@@ -94,5 +110,144 @@ class TestFirebaseDataConversion:
 
         assert result["name"] == "EPFL Campus"
 
+
+class TestBatchUpload:
+    """Test upload_events_batch with a mocked Firestore client"""
+    
+    @pytest.fixture
+    def events(self):
+        association = Association("assoc", "Assoc", "Desc", EventCategory.SOCIAL)
+        return [
+            Event(f"id_{i}", f"Event {i}", "Desc", Location(46.5, 6.5, "EPFL"), "Date TBA",
+                  association, ["Social"], Price(cents=0))
+            for i in range(5)
+        ]
+    
+    def test_upload_from_batch(self, events):
+        db = offline_database()
+        
+        results = db.upload_events_batch(EventBatch.from_events(events).exclude_ids({"id_1"}))
+        
+        assert results == {"total": 4, "success": 4, "failed": 0}
+        uploaded = [call.args[0] for call in db.events_collection.document.call_args_list]
+        assert uploaded == ["id_0", "id_2", "id_3", "id_4"]
+        write_batch = db.db.batch.return_value
+        assert write_batch.commit.call_count == 1
+        payload = write_batch.set.call_args.args[1]
+        assert payload["_source"] == "python_scraper"
+        assert payload["tags"] == ["Social"]
+        # No per-event RPC
+        db.events_collection.document.return_value.set.assert_not_called()
+    
+    def test_chunked_commits(self, events, monkeypatch):
+        monkeypatch.setattr("firestore.database.config.FIRESTORE_BATCH_SIZE", 2)
+        db = offline_database()
+        
+        results = db.upload_events_batch(events)
+        
+        assert results == {"total": 5, "success": 5, "failed": 0}
+        # The missing association takes one write of the first chunk: 1 + 1 | 2 | 2
+        assert db.db.batch.return_value.commit.call_count == 3
+        assert db.db.batch.return_value.set.call_count == 6
+    
+    def test_failed_chunk_reported_per_document(self, events, monkeypatch):
+        monkeypatch.setattr("firestore.database.config.FIRESTORE_BATCH_SIZE", 2)
+        db = offline_database()
+        db._known_associations.add("assoc")
+        db.db.batch.return_value.commit.side_effect = [None, Exception("deadline exceeded"), None]
+        documents = {}
+        
+        def document(event_id):
+            documents[event_id] = MagicMock()
+            if event_id == "id_3":
+                documents[event_id].set.side_effect = Exception("invalid document")
+            return documents[event_id]
+        
+        db.events_collection.document.side_effect = document
+        
+        results = db.upload_events_batch(events)
+        
+        assert results == {"total": 5, "success": 4, "failed": 1}
+        # Only the failed chunk (id_2, id_3) is written again document by document
+        assert [event_id for event_id, doc in documents.items() if doc.set.called] == ["id_2", "id_3"]
+
+    def test_associations_prefetched_once(self, events):
+        other = Association("other", "Other", "Desc", EventCategory.SPORTS)
+        events = events + [Event("id_other", "Other event", "Desc", Location(46.5, 6.5, "EPFL"), "Date TBA",
+                                 other, [], Price(cents=0))]
+        db = offline_database()
+        existing = MagicMock(id="assoc", exists=True)
+        db.db.get_all.return_value = [existing, MagicMock(id="other", exists=False)]
+        
+        db.upload_events_batch(events)
+        db.upload_events_batch(events)
+        
+        # One read for both associations, and nothing read again by the second upload
+        db.db.get_all.assert_called_once()
+        assert len(db.db.get_all.call_args.args[0]) == 2
+        db.associations_collection.document.return_value.get.assert_not_called()
+        # Only the missing association is created, in the first events batch
+        written = [call.args[0] for call in db.db.batch.return_value.set.call_args_list]
+        association_writes = [ref for ref in written if ref is db.associations_collection.document.return_value]
+        assert len(association_writes) == 1
+        assert db._known_associations == {"assoc", "other"}
+
+
+class TestExistingEvents:
+    """Test the existing-event lookups with a mocked Firestore client"""
+    
+    def test_existing_ids_is_a_set(self):
+        db = offline_database()
+        query = db.events_collection.select.return_value
+        query.stream.return_value = [MagicMock(id="a"), MagicMock(id="b"), MagicMock(id="a")]
+        
+        assert db.get_existing_event_ids() == {"a", "b"}
+        query.where.assert_not_called()
+    
+    def test_scoped_by_association_and_upload_time(self, monkeypatch):
+        monkeypatch.setattr("firestore.database.config.FIRESTORE_IN_FILTER_LIMIT", 2)
+        db = offline_database()
+        dated = db.events_collection.select.return_value.where.return_value
+        dated.where.return_value.stream.side_effect = [[MagicMock(id="a")], [MagicMock(id="b")]]
+        since = datetime(2026, 1, 1)
+        
+        existing = db.get_existing_event_ids(association_ids=["x", "y", "z", "x"], uploaded_since=since)
+        
+        assert existing == {"a", "b"}
+        upload_filter = db.events_collection.select.return_value.where.call_args.kwargs["filter"]
+        assert (upload_filter.field_path, upload_filter.op_string, upload_filter.value) == ("_uploadedAt", ">=", since)
+        # Three associations, two per "in" filter
+        association_filters = [call.kwargs["filter"] for call in dated.where.call_args_list]
+        assert [len(f.value) for f in association_filters] == [2, 1]
+        assert association_filters[0].field_path == "association"
+        assert [call.args[0] for call in db.associations_collection.document.call_args_list] == ["x", "y", "z"]
+
+    def test_scoped_failure_reads_all_events(self):
+        db = offline_database()
+        select = db.events_collection.select.return_value
+        select.where.return_value.where.return_value.stream.side_effect = Exception("index required")
+        select.stream.return_value = [MagicMock(id="a"), MagicMock(id="b")]
+
+        existing = db.get_existing_event_ids(association_ids=["x"], uploaded_since=datetime(2026, 1, 1))
+
+        assert existing == {"a", "b"}
+
+    def test_unreadable_collection_raises(self):
+        db = offline_database()
+        db.events_collection.select.return_value.stream.side_effect = Exception("unavailable")
+
+        with pytest.raises(Exception, match="unavailable"):
+            db.get_existing_event_ids()
+
+    def test_events_exist_batched(self, monkeypatch):
+        monkeypatch.setattr("firestore.database.config.FIRESTORE_GET_ALL_CHUNK", 2)
+        db = offline_database()
+        db.events_collection.document.side_effect = lambda event_id: event_id
+        db.db.get_all.side_effect = lambda refs, field_paths: [MagicMock(id=ref, exists=ref != "id_1") for ref in refs]
+        
+        assert db.events_exist(["id_0", "id_1", "id_2"]) == {"id_0", "id_2"}
+        assert [call.args[0] for call in db.db.get_all.call_args_list] == [["id_0", "id_1"], ["id_2"]]
+        assert db.event_exists("id_0") and not db.event_exists("id_1")
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
\ No newline at end of file
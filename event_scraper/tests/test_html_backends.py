@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Tests for the pluggable HTML parser backends"""
+import dataclasses
+import gc
+import pickle
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from scrapers import html_backends
+from bs4 import Tag
+from scrapers.html_backends import (
+    parse_html, available_backends, PARSER_BACKENDS, CompiledSelector, compile_selector, select_one,
+    build_strainer,
+)
+from scrapers.cassette import Cassette, RecordingAdapter, ReplayAdapter
+from scrapers.http_session import SharedSession
+from scrapers.politeness import PolitenessScheduler
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import ALL_WEBSITES, ESN_EPFL_CONFIG, AGEPOLY_CONFIG, SelectorConfig
+
+# Cassette of the live websites (python benchmark.py --record) to check parity on real pages
+PARITY_CASSETTE = os.environ.get("PARITY_CASSETTE", config.HTTP_CASSETTE_PATH)
+
+# Pages shaped like the ones served by the configured websites
+ESN_PAGES = {
+    "https://epfl.esn.ch/events": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Events | ESN EPFL</title></head><body>
+<div class="view-content">
+  <div class="views-row">
+    <div class="field-name-title"><h2><a href="/events/ski-weekend">Ski Weekend in Zermatt</a></h2></div>
+    <span class="date-display-single">Sat 14 Feb 2026 - 08:00</span>
+    <div class="field-name-field-location">Zermatt &amp; surroundings</div>
+    <div class="field-name-field-price">CHF 120.-</div>
+    <div class="group-image"><img src="/sites/default/files/events/ski.jpg" alt="ski"></div>
+  </div>
+  <div class="views-row">
+    <div class="field-name-title"><h2><a href="/events/apero">Apéro International</a></h2></div>
+    <span class="date-display-single">Thu 19 Feb 2026 - 18:30</span>
+    <div class="field-name-body"><p>Drinks &amp; snacks at Satellite.</p><script>track("apero")</script></div>
+  </div>
+</div>
+<ul class="pager"><li class="pager-next"><a href="/events?page=1">next ›</a></li></ul>
+</body></html>""",
+    "https://epfl.esn.ch/events?page=1": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<div class="view-content">
+  <div class="views-row">
+    <div class="field-name-title"><h2><a href="/events/chocolate">Chocolate Factory Trip</a></h2></div>
+    <span class="date-display-single">Sun 1 Mar 2026 - 09:00</span>
+  </div>
+</div>
+</body></html>""",
+    "https://epfl.esn.ch/events/ski-weekend": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<h1>Ski Weekend in Zermatt</h1>
+<span class="date-display-single">Sat 14 Feb 2026 - 08:00</span>
+<div class="field-name-body"><p>Two days of skiing,   transport included.</p>
+<style>.x { color: red }</style><p>Bring warm clothes!</p></div>
+<div class="field-name-field-location">Zermatt</div>
+<div class="field-name-field-price">Price: CHF 120.-</div>
+<div class="field-name-field-image"><img src="https://epfl.esn.ch/files/ski-large.jpg"></div>
+</body></html>""",
+    "https://epfl.esn.ch/events/chocolate": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<h1>Chocolate Factory Trip</h1>
+<div class="content">Visit of the Cailler factory in Broc — free tasting included.</div>
+</body></html>""",
+}
+
+AGEPOLY_PAGES = {
+    "https://agepoly.ch/en/evenements/": """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"></head><body>
+<div class="o-posts-grid">
+  <div class="o-posts-grid-post"><div class="o-posts-grid-post-body">
+    <h4 class="o-posts-grid-post-title"><a href="https://agepoly.ch/en/balelec/">Balélec Festival</a></h4>
+    <p class="o-posts-grid-post-meta"><time datetime="2026-05-08">8 May 2026</time></p>
+    <div class="o-posts-grid-post-description">The biggest student festival in Switzerland.</div>
+  </div></div>
+  <div class="o-posts-grid-post"><div class="o-posts-grid-post-body">
+    <h4 class="o-posts-grid-post-title"><a href="https://agepoly.ch/en/workshop/">CV Workshop</a></h4>
+    <p class="o-posts-grid-post-meta"><time>12 March 2026</time></p>
+    <div class="o-posts-grid-post-description">Learn to write a great CV &lt;3</div>
+  </div></div>
+</div>
+</body></html>""",
+    "https://agepoly.ch/en/balelec/": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<article><h1 class="entry-title">Balélec Festival</h1>
+<div class="entry-meta"><time class="entry-date">8 May 2026</time></div>
+<div class="entry-content"><p>Concerts all night long.</p><img src="https://agepoly.ch/wp/balelec.jpg"></div>
+<span class="price">Entrée: 35</span></article>
+</body></html>""",
+}
+
+
+def scrape_with(website_config, pages, backend, partial_parse=True):
+    scraper = WebScraper(dataclasses.replace(website_config, parser_backend=backend, partial_parse=partial_parse))
+    scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+
+    def fake_get(url, *args, **kwargs):
+        response = Mock()
+        if url in pages:
+            response.content = pages[url].encode("utf-8")
+        else:
+            response.raise_for_status.side_effect = Exception("404")
+        return response
+
+    scraper.session = Mock()
+    scraper.session.get.side_effect = fake_get
+    return scraper.scrape()
+
+
+def scrape_cassette(website_config, cassette_path, backend):
+    """Scrape a website from a recorded cassette"""
+    scraper = WebScraper(dataclasses.replace(website_config, parser_backend=backend))
+    scraper.politeness = PolitenessScheduler(requests_per_second=1000, burst=1000, respect_crawl_delay=False)
+    scraper.session = SharedSession()
+    scraper.session.mount("https://", ReplayAdapter(Cassette.load(cassette_path)))
+    scraper.session.mount("http://", scraper.session.get_adapter("https://"))
+    return scraper.scrape()
+
+
+def record_pages(path, pages):
+    """Record {url: html} into a cassette through RecordingAdapter"""
+    def fake_send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.status_code = 200 if request.url in pages else 404
+        response._content = pages.get(request.url, "").encode("utf-8")
+        response._content_consumed = True
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        return response
+
+    session = SharedSession()
+    session.mount("https://", RecordingAdapter(Cassette(str(path))))
+    with patch.object(HTTPAdapter, "send", fake_send):
+        for url in pages:
+            session.get(url)
+    session.close()
+
+
+class TestParseHtml:
+    """Test the backend API"""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_selector_api(self, backend):
+        doc = parse_html('<div class="a">Hi &amp; <b>you</b><script>x()</script></div>'
+                         '<a href="/x">link</a>'.encode("utf-8"), backend)
+
+        assert doc.select_one(".a").text == "Hi & you"
+        assert doc.select_one("a")["href"] == "/x"
+        assert doc.select_one("a").get("title") is None
+        assert len(doc.select("div, a")) == 2
+        assert doc.select_one(".missing") is None
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            parse_html(b"<p>x</p>", "regex")
+
+    def test_missing_backend_falls_back(self, monkeypatch):
+        monkeypatch.setattr(html_backends, "SELECTOLAX_AVAILABLE", False)
+
+        doc = parse_html(b"<p>x</p>", "selectolax")
+
+        assert doc.__class__.__name__ == "BeautifulSoup"
+        assert doc.select_one("p").text == "x"
+
+
+class TestCompiledSelectors:
+    """Test the selectors compiled at config load"""
+
+    def test_selector_config_is_compiled(self):
+        selectors = SelectorConfig(title=["h1.title", "h2"], description=["", "."])
+
+        assert all(isinstance(selector, CompiledSelector) for selector in selectors.title)
+        assert selectors.title == ["h1.title", "h2"]
+        # Placeholders skipped by the scrapers are kept as they are
+        assert selectors.description == ["", "."]
+
+    def test_invalid_selector_rejected_at_load(self):
+        with pytest.raises(ValueError, match="detailed_date"):
+            SelectorConfig(detailed_date=["time[datetime"])
+
+    def test_compiled_once(self):
+        assert compile_selector("div.event > a") is compile_selector("div.event > a")
+        assert compile_selector(compile_selector("p")) is compile_selector("p")
+
+    def test_no_recompilation_while_extracting(self):
+        selector = compile_selector(".a b")
+        doc = parse_html(b'<div class="a"><b>x</b></div>', "html.parser")
+
+        with patch("scrapers.html_backends.soupsieve.compile") as compile_mock:
+            assert select_one(doc, selector).text == "x"
+            assert select_one(doc, ".a b").text == "x"
+        compile_mock.assert_not_called()
+
+    def test_pickle_round_trip(self):
+        selector = pickle.loads(pickle.dumps(compile_selector("li.pager-next a")))
+
+        assert isinstance(selector, CompiledSelector)
+        assert selector == "li.pager-next a"
+
+
+class TestPartialParsing:
+    """Test SoupStrainer-restricted parsing"""
+
+    def test_strainer_keeps_matching_subtrees(self):
+        strainer = build_strainer([".view-content .views-row", "li.pager-next a", "[class*='date']"])
+        html = (b'<body><header><h1>Site</h1></header><div class="view-content"><div class="views-row">A</div></div>'
+                b'<span class="date-display">today</span><ul><li class="pager-next"><a href="/p2">next</a></li></ul></body>')
+
+        soup = parse_html(html, "html.parser", parse_only=strainer)
+
+        assert soup.select_one("h1") is None
+        assert soup.select_one(".view-content .views-row").text == "A"
+        assert soup.select_one("li.pager-next a")["href"] == "/p2"
+        assert soup.select_one("span").text == "today"
+
+    @pytest.mark.parametrize("selector", ["li:first-child a", "h2 + p", "h2 ~ p", "a:not(.x)"])
+    def test_context_dependent_selectors_disable_strainer(self, selector):
+        assert build_strainer([".views-row", selector]) is None
+
+    @pytest.mark.parametrize("website_config,pages", [
+        (ESN_EPFL_CONFIG, ESN_PAGES),
+        (AGEPOLY_CONFIG, AGEPOLY_PAGES),
+    ], ids=["esn", "agepoly"])
+    def test_same_events_as_full_parse(self, website_config, pages):
+        full = scrape_with(website_config, pages, "html.parser", partial_parse=False)
+
+        assert scrape_with(website_config, pages, "html.parser") == full
+
+    def test_falls_back_to_full_parse(self):
+        """A page without the configured containers is parsed again in full for the fallback containers"""
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+        html = b'<body><div class="event-item"><h2>Fallback</h2></div></body>'
+
+        soup = scraper._parse_list_page(html)
+
+        assert [element.text for element in scraper._find_event_elements(soup)] == ["Fallback"]
+
+    def test_detail_trees_are_freed(self):
+        """Parsed pages are decomposed: no Tag survives without the garbage collector"""
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+        page = ESN_PAGES["https://epfl.esn.ch/events/ski-weekend"].encode("utf-8")
+
+        gc.collect()
+        gc.disable()
+        try:
+            for i in range(50):
+                assert scraper._parse_detailed_page(f"https://epfl.esn.ch/events/{i}", page)
+            live_tags = sum(1 for obj in gc.get_objects() if isinstance(obj, Tag))
+        finally:
+            gc.enable()
+
+        assert live_tags < 10
+
+
+class TestBackendParity:
+    """Every installed backend must produce the same events"""
+
+    @pytest.mark.parametrize("website_config,pages", [
+        (ESN_EPFL_CONFIG, ESN_PAGES),
+        (AGEPOLY_CONFIG, AGEPOLY_PAGES),
+    ], ids=["esn", "agepoly"])
+    def test_identical_events(self, website_config, pages):
+        if len(available_backends()) < 2:
+            pytest.skip("Only html.parser is installed")
+
+        reference = scrape_with(website_config, pages, "html.parser")
+        assert len(reference) >= 2
+
+        for backend in available_backends()[1:]:
+            assert scrape_with(website_config, pages, backend) == reference, backend
+
+    def test_identical_events_through_cassette(self, tmp_path):
+        """The fixture pages, recorded and replayed like the live websites"""
+        if len(available_backends()) < 2:
+            pytest.skip("Only html.parser is installed")
+        path = tmp_path / "esn.cassette"
+        record_pages(path, ESN_PAGES)
+
+        reference = scrape_cassette(ESN_EPFL_CONFIG, str(path), "html.parser")
+        assert reference == scrape_with(ESN_EPFL_CONFIG, ESN_PAGES, "html.parser")
+
+        for backend in available_backends()[1:]:
+            assert scrape_cassette(ESN_EPFL_CONFIG, str(path), backend) == reference, backend
+
+    @pytest.mark.parametrize("website_config", [c for c in ALL_WEBSITES if not c.feed_url],
+                             ids=lambda website_config: website_config.name)
+    def test_identical_events_on_recorded_websites(self, website_config):
+        if len(available_backends()) < 2:
+            pytest.skip("Only html.parser is installed")
+        if not os.path.exists(PARITY_CASSETTE):
+            pytest.skip(f"No recording of the websites at {PARITY_CASSETTE} (python benchmark.py --record)")
+
+        reference = scrape_cassette(website_config, PARITY_CASSETTE, "html.parser")
+
+        for backend in available_backends()[1:]:
+            assert scrape_cassette(website_config, PARITY_CASSETTE, backend) == reference, backend
+
+    def test_all_backends_known(self):
+        assert set(available_backends()) <= set(PARSER_BACKENDS)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Tests for the on-disk HTTP cache and conditional requests"""
+import pytest
+from unittest.mock import Mock, patch
+import requests
+from requests.adapters import HTTPAdapter
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.http_cache import HttpCache, CachingAdapter
+from scrapers.politeness import PolitenessScheduler
+
+
+def make_response(status, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+class TestHttpCache:
+    """Test the SQLite store"""
+
+    def test_store_and_lookup(self, tmp_path):
+        cache = HttpCache(str(tmp_path), max_bytes=1000)
+        cache.store("https://a/1", {"ETag": '"v1"', "Content-Type": "text/html"}, b"<html>1</html>")
+
+        entry = cache.lookup("https://a/1")
+
+        assert entry.body == b"<html>1</html>"
+        assert entry.etag == '"v1"'
+        assert entry.validator == '"v1"'
+        assert cache.lookup("https://a/2") is None
+
+    def test_persists_between_instances(self, tmp_path):
+        HttpCache(str(tmp_path), max_bytes=1000).store("https://a/1", {"Last-Modified": "Mon"}, b"body")
+
+        entry = HttpCache(str(tmp_path), max_bytes=1000).lookup("https://a/1")
+
+        assert entry.last_modified == "Mon"
+        assert entry.body == b"body"
+
+    def test_lru_eviction(self, tmp_path):
+        cache = HttpCache(str(tmp_path), max_bytes=10)
+        cache.store("https://a/old", {"ETag": "1"}, b"aaaa")
+        cache.store("https://a/used", {"ETag": "2"}, b"bbbb")
+        cache.touch("https://a/old")  # Now "used" is the least recently used entry
+        cache.store("https://a/new", {"ETag": "3"}, b"cccc")
+
+        assert cache.lookup("https://a/used") is None
+        assert cache.lookup("https://a/old") is not None
+        assert cache.lookup("https://a/new") is not None
+        assert cache.stats["evictions"] == 1
+
+    def test_oversized_body_not_stored(self, tmp_path):
+        cache = HttpCache(str(tmp_path), max_bytes=3)
+        cache.store("https://a/1", {"ETag": "1"}, b"too big")
+        assert cache.lookup("https://a/1") is None
+
+
+class TestCachingAdapter:
+    """Test conditional requests through the adapter"""
+
+    def send(self, adapter, url="https://test.example.com/events/1"):
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session.get(url)
+
+    def test_revalidation_with_304(self, tmp_path):
+        """A second GET sends the validators and gets the cached body back on 304"""
+        cache = HttpCache(str(tmp_path), max_bytes=1000)
+        adapter = CachingAdapter(cache)
+        sent_headers = []
+
+        def fake_send(self, request, **kwargs):
+            sent_headers.append(dict(request.headers))
+            if "If-None-Match" in request.headers:
+                return make_response(304, headers={"ETag": '"v1"'})
+            return make_response(200, b"<html>page</html>",
+                                 {"ETag": '"v1"', "Last-Modified": "Mon", "Content-Type": "text/html"})
+
+        with patch.object(HTTPAdapter, "send", fake_send):
+            first = self.send(adapter)
+            second = self.send(adapter)
+
+        assert first.from_cache is False
+        assert second.from_cache is True
+        assert second.status_code == 200
+        assert second.content == b"<html>page</html>"
+        assert second.cache_validator == '"v1"'
+        assert sent_headers[1]["If-None-Match"] == '"v1"'
+        assert sent_headers[1]["If-Modified-Since"] == "Mon"
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_responses_without_validators_not_cached(self, tmp_path):
+        cache = HttpCache(str(tmp_path), max_bytes=1000)
+
+        with patch.object(HTTPAdapter, "send", lambda self, request, **kwargs: make_response(200, b"x")):
+            self.send(CachingAdapter(cache))
+
+        assert cache.lookup("https://test.example.com/events/1") is None
+        assert cache.stats["stores"] == 0
+
+
+class TestParsedPageReuse:
+    """Test that unchanged detailed pages are not parsed again"""
+
+    def make_scraper(self):
+        from scrapers.web_scraper import WebScraper
+        from scrapers.website_config import WebsiteConfig, SelectorConfig
+        from models.event_models import Association, EventCategory
+
+        scraper = WebScraper(WebsiteConfig(
+            name="Cache Test Site",
+            url="https://cache.example.com/events",
+            base_domain="https://cache.example.com",
+            selectors=SelectorConfig(detailed_title=["h1"], detailed_description=["p"]),
+            association=Association("cache", "Cache", "desc", EventCategory.SOCIAL)
+        ))
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+        scraper.session = Mock()
+        return scraper
+
+    @staticmethod
+    def page(from_cache):
+        response = make_response(200, b"<h1>Cached Event</h1><p>Text</p>")
+        response.cache_validator, response.from_cache = '"v1"', from_cache
+        return response
+
+    def test_not_modified_page_skips_parsing(self, tmp_path):
+        from scrapers.web_scraper import WebScraper
+
+        scraper = self.make_scraper()
+        scraper.session.get.side_effect = [self.page(False), self.page(True)]
+
+        with patch("scrapers.web_scraper.get_http_cache", return_value=HttpCache(str(tmp_path), 1000)):
+            first = scraper._scrape_detailed_page("https://cache.example.com/events/1")
+            with patch.object(WebScraper, "_parse_detailed_page") as parse:
+                second = scraper._scrape_detailed_page("https://cache.example.com/events/1")
+
+        assert first.title == "Cached Event"
+        assert second == first
+        parse.assert_not_called()
+
+    def test_parsed_event_survives_restart(self, tmp_path):
+        """The parsed event is stored next to the cache entry, a new process reuses it"""
+        from scrapers.web_scraper import WebScraper
+
+        first_run = self.make_scraper()
+        first_run.session.get.return_value = self.page(False)
+        with patch("scrapers.web_scraper.get_http_cache", return_value=HttpCache(str(tmp_path), 1000)):
+            first = first_run._scrape_detailed_page("https://cache.example.com/events/1")
+
+        second_run = self.make_scraper()
+        second_run.session.get.return_value = self.page(True)
+        with patch("scrapers.web_scraper.get_http_cache", return_value=HttpCache(str(tmp_path), 1000)), \
+                patch.object(WebScraper, "_parse_detailed_page") as parse:
+            second = second_run._scrape_detailed_page("https://cache.example.com/events/1")
+
+        assert second == first
+        parse.assert_not_called()
+
+    def test_changed_validator_or_config_parses_again(self, tmp_path):
+        cache = HttpCache(str(tmp_path), 1000)
+        cache.store_parsed("https://a/1", "site:abc", '"v1"', "{}")
+
+        assert cache.lookup_parsed("https://a/1", "site:abc", '"v1"') == "{}"
+        assert cache.lookup_parsed("https://a/1", "site:abc", '"v2"') is None
+        assert cache.lookup_parsed("https://a/1", "site:def", '"v1"') is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Tests for the shared HTTP session against a local HTTP server"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataclasses
+import config
+from scrapers import http_session
+from scrapers.deadline import Deadline
+from scrapers.http_cache import CachingAdapter, HttpCache
+from scrapers.http_session import create_session, get_shared_session, read_limited, ResponseRejected
+from scrapers.politeness import PolitenessScheduler
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import ESN_EPFL_CONFIG
+
+BIG_BODY = b"<html>" + b"x" * 2000 + b"</html>"
+EVENT_PAGE = b"<html><body><h1>Cached Event</h1><p>Text</p></body></html>"
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first request of /flaky, 200 otherwise, with keep-alive"""
+    protocol_version = "HTTP/1.1"
+    calls = {}
+
+    def do_GET(self):
+        FlakyHandler.calls[self.path] = FlakyHandler.calls.get(self.path, 0) + 1
+        content_type, headers = "text/html", {}
+        if self.path == "/flaky" and FlakyHandler.calls[self.path] == 1:
+            status, body = 503, b"busy"
+        elif self.path == "/busy":
+            status, body, headers = 503, b"busy", {"Retry-After": "120"}
+        elif self.path == "/pdf":
+            status, body, content_type = 200, b"%PDF" + b"0" * 996, "application/pdf"
+        elif self.path in ("/big", "/unsized"):
+            status, body = 200, BIG_BODY
+        elif self.path in ("/etag", "/event") and self.headers.get("If-None-Match") == '"v1"':
+            status, body, headers = 304, b"", {"ETag": '"v1"'}
+        elif self.path in ("/etag", "/event"):
+            status, body, headers = 200, EVENT_PAGE if self.path == "/event" else b"<html>ok</html>", {"ETag": '"v1"'}
+        else:
+            status, body = 200, b"<html>ok</html>"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status == 304:
+            self.end_headers()
+            return
+        if self.path == "/unsized":
+            # No length announced: the body ends when the connection is closed
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        else:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FlakyHandler.calls = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(config, "HTTP_BACKOFF_JITTER", 0)
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", False)
+    return create_session()
+
+
+class TestSharedSession:
+    """Test the shared session"""
+
+    def test_headers_negotiate_compression(self, session):
+        assert "gzip" in session.headers["Accept-Encoding"]
+        assert session.headers["User-Agent"] == config.REQUEST_HEADERS["User-Agent"]
+
+    def test_pool_and_retry_configuration(self, session):
+        adapter = session.get_adapter("https://epfl.esn.ch")
+        assert adapter._pool_maxsize == config.HTTP_POOL_SIZE_PER_HOST
+        assert adapter.max_retries.total == config.HTTP_RETRIES
+        assert 503 in adapter.max_retries.status_forcelist
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_transient_error_is_retried(self, server, session):
+        response = session.get(f"{server}/flaky")
+
+        assert response.status_code == 200
+        assert FlakyHandler.calls["/flaky"] == 2
+
+    def test_no_retry_past_deadline(self, server, session):
+        """A Retry-After longer than the time budget is not waited for"""
+        with Deadline(60).applied():
+            response = session.get(f"{server}/busy")
+
+        assert response.status_code == 503
+        assert FlakyHandler.calls["/busy"] == 1
+
+    def test_stats_count_bytes_and_reuse(self, server, session):
+        session.reset_stats()
+        for _ in range(3):
+            session.get(f"{server}/page")
+
+        stats = session.stats()
+
+        assert stats["requests"] == 3
+        assert stats["bytes"] == 3 * len(b"<html>ok</html>")
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 2
+        assert "3 requests" in session.stats_summary()
+
+    def test_streamed_read_within_limit(self, server, session):
+        session.reset_stats()
+        response = session.get(f"{server}/page", stream=True)
+
+        assert read_limited(session, response, max_bytes=100) == b"<html>ok</html>"
+        assert response.content == b"<html>ok</html>"
+        assert session.stats()["requests"] == 1
+        assert session.stats()["bytes"] == len(b"<html>ok</html>")
+
+    @pytest.mark.parametrize("path,saved", [
+        ("/pdf", 1000),  # Wrong content type
+        ("/big", len(BIG_BODY)),  # Content-Length above the limit
+        ("/unsized", 0),  # Limit found while reading, remaining size unknown
+    ])
+    def test_streamed_read_aborts(self, server, session, path, saved):
+        session.reset_stats()
+        response = session.get(f"{server}{path}", stream=True)
+
+        with pytest.raises(ResponseRejected):
+            read_limited(session, response, max_bytes=1500)
+
+        stats = session.stats()
+        assert stats["aborted_fetches"] == 1
+        assert stats["bytes_saved"] == saved
+        assert stats["requests"] == 0
+        assert "1 aborted" in session.stats_summary()
+
+    def test_streamed_body_is_cached_once_read(self, server, session, tmp_path):
+        cache = HttpCache(str(tmp_path), max_bytes=10000)
+        session.mount("http://", CachingAdapter(cache))
+
+        response = session.get(f"{server}/etag", stream=True)
+        assert cache.lookup(f"{server}/etag") is None
+        read_limited(session, response, max_bytes=100)
+
+        assert cache.lookup(f"{server}/etag").body == b"<html>ok</html>"
+
+    def test_not_modified_page_through_scraper(self, server, session, tmp_path):
+        """An ETag -> 304 round trip through WebScraper._get returns the cached page"""
+        session.mount("http://", CachingAdapter(HttpCache(str(tmp_path), max_bytes=10000)))
+        scraper = WebScraper(dataclasses.replace(ESN_EPFL_CONFIG, base_domain=server))
+        scraper.session = session
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+
+        first = scraper._get(f"{server}/etag")
+        second = scraper._get(f"{server}/etag")
+
+        assert first.from_cache is False
+        assert second.from_cache is True
+        assert second.content == b"<html>ok</html>"
+        assert FlakyHandler.calls["/etag"] == 2
+
+    def test_not_modified_detail_page_not_parsed_again(self, server, session, tmp_path, monkeypatch):
+        """A detail page revalidated with a 304 reuses the event stored by an earlier run"""
+        cache = HttpCache(str(tmp_path), max_bytes=10000)
+        session.mount("http://", CachingAdapter(cache))
+        monkeypatch.setattr("scrapers.web_scraper.get_http_cache", lambda: cache)
+        config = dataclasses.replace(ESN_EPFL_CONFIG, base_domain=server)
+        scrapers = [WebScraper(config), WebScraper(config)]  # Two runs sharing the cache
+        for scraper in scrapers:
+            scraper.session = session
+            scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+
+        first = scrapers[0]._scrape_detailed_page(f"{server}/event")
+        monkeypatch.setattr(WebScraper, "_parse_detailed_page", lambda *args: pytest.fail("parsed again"))
+        second = scrapers[1]._scrape_detailed_page(f"{server}/event")
+
+        assert first.title == "Cached Event"
+        assert second == first
+        assert FlakyHandler.calls["/event"] == 2
+
+    def test_shared_session_is_process_wide(self, monkeypatch):
+        monkeypatch.setattr(http_session, "_shared_session", None)
+        assert get_shared_session() is get_shared_session()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
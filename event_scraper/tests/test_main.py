@@ -42,7 +42,7 @@ def test_02_check_import_structure():
         lines = f.readlines()
     
     required_imports = [
-        'from scrapers.web_scraper import WebScraper',
+        'from scrapers.site_runner import create_scraper, run_sites',
         'from scrapers.website_config import ALL_WEBSITES',
         'from firestore.database import FirebaseDatabase'
     ]
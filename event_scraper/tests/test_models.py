@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 """Generic tests for event models"""
+import dataclasses
+import pickle
 import pytest
 from models.event_models import (
     EventCategory, Price, Location, Association, Event
@@ -218,5 +220,40 @@ class TestEvent:
         event_id2 = Event.generate_id(title, source)
         assert event_id == event_id2
 
+    def test_slotted_without_instance_dict(self, sample_association, sample_location, sample_price):
+        """Events, locations and prices have no per-instance __dict__"""
+        event = Event("e", "Title", "Desc", sample_location, "2024-01-15", sample_association, ["Social"], sample_price)
+        
+        for obj in (event, sample_location, sample_price, sample_association):
+            assert not hasattr(obj, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            sample_price.cents = 100
+    
+    def test_shared_association_and_tags(self, sample_association, sample_location, sample_price):
+        """Equal associations and tag lists are stored once, also for unpickled events"""
+        copy = dataclasses.replace(sample_association)
+        first = Event("a", "A", "Desc", sample_location, "Date TBA", sample_association, ["Social", "Food"], sample_price)
+        second = Event("b", "B", "Desc", sample_location, "Date TBA", copy, ["Social", "Food"], sample_price)
+        unpickled = pickle.loads(pickle.dumps(first))
+        
+        assert second.association is first.association
+        assert second.tags is first.tags
+        assert unpickled == first
+        assert unpickled.association is first.association
+        assert unpickled.tags is first.tags
+    
+    def test_changed_association_replaces_shared_one(self, sample_association, sample_location, sample_price):
+        renamed = dataclasses.replace(sample_association, name="Renamed")
+        
+        event = Event("c", "C", "Desc", sample_location, "Date TBA", renamed, [], sample_price)
+        
+        assert event.association.name == "Renamed"
+    
+    def test_from_firestore_dict_round_trip(self, sample_association, sample_location, sample_price):
+        event = Event("d", "D", "Desc", sample_location, "Date TBA", sample_association, ["Test"], sample_price,
+                      picture_url="https://example.com/d.jpg")
+        
+        assert Event.from_firestore_dict(event.to_firestore_dict(), sample_association) == event
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
\ No newline at end of file
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Tests for the process pool parsing detailed pages"""
+import time
+import pytest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import parse_pool
+from scrapers.parse_pool import ParseFailed, ParsePool, ParseTimeout, cpu_limit, get_parse_pool
+from scrapers.selector_stats import SelectorStats
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import ESN_EPFL_CONFIG
+from tests.test_html_backends import ESN_PAGES
+
+DETAIL_URL = "https://epfl.esn.ch/events/ski-weekend"
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ParsePool(2, cpu_seconds=5, wall_seconds=60)
+    yield pool
+    pool.shutdown()
+
+
+def burn_cpu():
+    while True:
+        pass
+
+
+class FakeExecutor:
+    """Executor whose futures are already done, with a result or broken"""
+
+    def __init__(self, result=None):
+        self.result = result
+
+    def submit(self, function, *args):
+        future = Future()
+        if self.result is None:
+            future.set_exception(BrokenProcessPool("worker killed"))
+        else:
+            future.set_result(self.result)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def fake_executors(pool, monkeypatch, executors):
+    remaining = iter(executors)
+    monkeypatch.setattr(pool, "_get_executor", lambda: next(remaining))
+
+
+class TestParsePool:
+    """Test ParsePool"""
+
+    def test_same_event_as_in_process(self, pool):
+        content = ESN_PAGES[DETAIL_URL].encode("utf-8")
+        expected = WebScraper(ESN_EPFL_CONFIG)._parse_detailed_content(content)
+
+        event, selector_hits = pool.parse_detailed_page(ESN_EPFL_CONFIG, DETAIL_URL, content)
+
+        assert event == expected
+        assert selector_hits[(ESN_EPFL_CONFIG.name, "detailed_title")].hits == {"h1": 1}
+
+    def test_stuck_worker_killed_and_replaced(self):
+        pool = ParsePool(1, cpu_seconds=None, wall_seconds=1)
+        try:
+            with pytest.raises(ParseTimeout):
+                pool.call(time.sleep, 30)
+            # Fresh workers take the next pages
+            assert pool.call(abs, -3) == 3
+        finally:
+            pool.shutdown()
+
+    def test_pages_on_workers_killed_for_other_pages_resubmitted(self, monkeypatch):
+        pool = ParsePool(1)
+        # Two other pages timed out while this one was in flight
+        killed = [FakeExecutor(), FakeExecutor()]
+        for executor in killed:
+            pool._killed.add(executor)
+        fake_executors(pool, monkeypatch, killed + [FakeExecutor(result="event")])
+
+        assert pool.call(abs, -3) == "event"
+
+    def test_crashing_page_fails_after_retry(self, monkeypatch):
+        pool = ParsePool(1)
+        fake_executors(pool, monkeypatch, [FakeExecutor(), FakeExecutor(), FakeExecutor(result="event")])
+
+        with pytest.raises(ParseFailed):
+            pool.call(abs, -3)
+
+    def test_cpu_limit(self):
+        started = time.process_time()
+
+        with pytest.raises(ParseTimeout):
+            with cpu_limit(0.2):
+                burn_cpu()
+
+        assert time.process_time() - started < 5
+
+
+class TestScraperUsesPool:
+    """Test the scraper side"""
+
+    def test_in_process_by_default(self, monkeypatch):
+        monkeypatch.setattr(parse_pool.config, "PARSE_PROCESSES", 0)
+        assert get_parse_pool() is None
+
+    def test_pool_hits_added_to_stats(self, pool, tmp_path, monkeypatch):
+        monkeypatch.setattr("scrapers.web_scraper.get_parse_pool", lambda: pool)
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+        scraper.selector_stats = SelectorStats(str(tmp_path / "stats.json"))
+
+        event = scraper._parse_detailed_page(DETAIL_URL, ESN_PAGES[DETAIL_URL].encode("utf-8"))
+
+        assert event.title == "Ski Weekend in Zermatt"
+        assert scraper.selector_stats._run[(ESN_EPFL_CONFIG.name, "detailed_title")].extractions == 1
+
+    def test_pathological_page_skipped(self, monkeypatch):
+        class TimingOutPool:
+            def parse_detailed_page(self, website_config, url, content):
+                raise ParseTimeout(f"Parsing {url} took more than 10s of CPU")
+
+        monkeypatch.setattr("scrapers.web_scraper.get_parse_pool", lambda: TimingOutPool())
+
+        assert WebScraper(ESN_EPFL_CONFIG)._parse_detailed_page(DETAIL_URL, b"<html></html>") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
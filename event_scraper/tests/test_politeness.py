@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Tests for per-host politeness: token bucket, connection cap and Crawl-delay"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.politeness import TokenBucket, PolitenessScheduler
+
+
+class FakeClock:
+    """Clock that only advances when the bucket sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def robots_fetch(text, status=200):
+    response = Mock(status_code=status, text=text)
+    return Mock(return_value=response)
+
+
+class TestTokenBucket:
+    """Test TokenBucket"""
+
+    def test_burst_then_rate(self):
+        """A full bucket allows a burst, then one request every 1/rate seconds"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            bucket.acquire()
+        assert clock.sleeps == []
+
+        bucket.acquire()
+        assert clock.now == pytest.approx(0.5)
+
+    def test_gives_up_past_timeout(self):
+        """A token that would take longer than the timeout is not waited for"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+
+        assert not bucket.acquire(timeout=0.2)
+        assert clock.sleeps == []
+        assert bucket.acquire(timeout=1)
+
+
+class TestPolitenessScheduler:
+    """Test PolitenessScheduler"""
+
+    def test_connection_cap_per_host(self):
+        """No more than max_connections_per_host requests run at once for a host"""
+        scheduler = PolitenessScheduler(requests_per_second=1000, burst=100,
+                                        max_connections_per_host=2, respect_crawl_delay=False)
+        state = {"current": 0, "max": 0}
+        lock = threading.Lock()
+
+        def request():
+            with scheduler.slot("https://epfl.esn.ch"):
+                with lock:
+                    state["current"] += 1
+                    state["max"] = max(state["max"], state["current"])
+                time.sleep(0.02)
+                with lock:
+                    state["current"] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert state["max"] == 2
+
+    def test_slot_wait_bounded_by_deadline(self):
+        """Waiting for a busy host gives up with DeadlineExceeded once the budget runs out"""
+        scheduler = PolitenessScheduler(requests_per_second=1000, burst=100,
+                                        max_connections_per_host=1, respect_crawl_delay=False)
+
+        with scheduler.slot("https://epfl.esn.ch"):
+            started = time.monotonic()
+            with pytest.raises(DeadlineExceeded):
+                with scheduler.slot("https://epfl.esn.ch", deadline=Deadline(0.05)):
+                    pass
+            assert time.monotonic() - started < 1
+
+    def test_hosts_are_limited_independently(self):
+        """Each host has its own limiter"""
+        scheduler = PolitenessScheduler(respect_crawl_delay=False)
+
+        esn = scheduler._limiter("https://epfl.esn.ch", None)
+        agepoly = scheduler._limiter("https://agepoly.ch", None)
+
+        assert esn is not agepoly
+        assert scheduler._limiter("https://EPFL.esn.ch/", None) is esn
+
+    def test_crawl_delay_from_robots(self):
+        """robots.txt Crawl-delay lowers the rate and disables bursts"""
+        scheduler = PolitenessScheduler(requests_per_second=10, burst=5)
+        fetch = robots_fetch("User-agent: *\nCrawl-delay: 4\n")
+
+        limiter = scheduler._limiter("https://agepoly.ch", fetch)
+
+        fetch.assert_called_once()
+        assert fetch.call_args[0][0] == "https://agepoly.ch/robots.txt"
+        assert limiter.bucket.rate == pytest.approx(0.25)
+        assert limiter.bucket.capacity == 1
+
+    def test_robots_cached_until_reset(self):
+        """robots.txt is fetched once per host per run"""
+        scheduler = PolitenessScheduler()
+        fetch = robots_fetch("User-agent: *\nDisallow:\n")
+
+        with scheduler.slot("https://epfl.esn.ch", fetch):
+            pass
+        with scheduler.slot("https://epfl.esn.ch", fetch):
+            pass
+        assert fetch.call_count == 1
+
+        scheduler.reset()
+        with scheduler.slot("https://epfl.esn.ch", fetch):
+            pass
+        assert fetch.call_count == 2
+
+    def test_robots_not_cached_when_out_of_time(self):
+        """A robots.txt fetch cut short by the deadline does not cache a limiter without Crawl-delay"""
+        scheduler = PolitenessScheduler()
+        fetch = Mock(side_effect=DeadlineExceeded("Time budget exhausted"))
+
+        with pytest.raises(DeadlineExceeded):
+            with scheduler.slot("https://agepoly.ch", fetch):
+                pass
+
+        assert scheduler._limiters == {}
+
+    def test_missing_robots_uses_defaults(self):
+        """An unreachable robots.txt keeps the configured rate"""
+        scheduler = PolitenessScheduler(requests_per_second=3, burst=2)
+
+        limiter = scheduler._limiter("https://epfl.esn.ch", robots_fetch("", status=404))
+
+        assert limiter.bucket.rate == 3
+        assert limiter.bucket.capacity == 2
+
+
+class TestAsyncSlot:
+    """Test PolitenessScheduler.async_slot"""
+
+    def test_connection_cap_without_threads(self):
+        """Waiting coroutines queue on the event loop, not in worker threads"""
+        scheduler = PolitenessScheduler(requests_per_second=1000, burst=100,
+                                        max_connections_per_host=2, respect_crawl_delay=False)
+        state = {"current": 0, "max": 0, "threads": set()}
+
+        async def request():
+            async with scheduler.async_slot("https://epfl.esn.ch"):
+                state["threads"].add(threading.get_ident())
+                state["current"] += 1
+                state["max"] = max(state["max"], state["current"])
+                await asyncio.sleep(0.02)
+                state["current"] -= 1
+
+        async def run():
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        threads_before = threading.active_count()
+        asyncio.run(run())
+
+        assert state["max"] == 2
+        assert state["threads"] == {threading.get_ident()}
+        assert threading.active_count() == threads_before
+
+    def test_shares_the_host_limits_with_threads(self):
+        """A connection held through slot() counts against async_slot() too"""
+        scheduler = PolitenessScheduler(requests_per_second=1000, burst=100,
+                                        max_connections_per_host=1, respect_crawl_delay=False)
+
+        async def run():
+            with scheduler.slot("https://epfl.esn.ch"):
+                with pytest.raises(DeadlineExceeded):
+                    async with scheduler.async_slot("https://epfl.esn.ch", deadline=Deadline(0.2)):
+                        pass
+            async with scheduler.async_slot("https://epfl.esn.ch", deadline=Deadline(0.2)):
+                pass
+
+        asyncio.run(run())
+
+    def test_rate_limited_with_asyncio_sleep(self):
+        scheduler = PolitenessScheduler(requests_per_second=20, burst=1, respect_crawl_delay=False)
+
+        async def run():
+            started = time.monotonic()
+            for _ in range(3):
+                async with scheduler.async_slot("https://epfl.esn.ch"):
+                    pass
+            return time.monotonic() - started
+
+        assert asyncio.run(run()) >= 0.09
+
+    def test_crawl_delay_from_async_fetch(self):
+        scheduler = PolitenessScheduler(requests_per_second=10, burst=5)
+        response = Mock(status_code=200, text="User-agent: *\nCrawl-delay: 4\n")
+        fetch = AsyncMock(return_value=response)
+
+        async def run():
+            async with scheduler.async_slot("https://agepoly.ch", fetch):
+                pass
+
+        asyncio.run(run())
+
+        assert fetch.call_args[0][0] == "https://agepoly.ch/robots.txt"
+        assert scheduler._limiter("https://agepoly.ch", None).bucket.rate == pytest.approx(0.25)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Tests for selector hit-rate tracking"""
+import json
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import web_scraper
+from scrapers.html_backends import parse_html
+from scrapers.selector_stats import SelectorStats
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import ESN_EPFL_CONFIG
+
+DATES = [".date-display-single", ".field-name-field-date", "[class*='date-display']"]
+
+
+def stats_with_history(path, site, field, winners):
+    """SelectorStats whose saved history has one extraction per winner"""
+    stats = SelectorStats(str(path), decay=1.0, min_samples=5)
+    for winner in winners:
+        stats.record(site, field, winner)
+    stats.save()
+    return SelectorStats(str(path), decay=1.0, min_samples=5)
+
+
+class TestSelectorStats:
+    """Test SelectorStats"""
+
+    def test_history_decays_when_saved(self, tmp_path):
+        path = tmp_path / "stats.json"
+        stats = SelectorStats(str(path), decay=0.5)
+        for _ in range(4):
+            stats.record("ESN", "title", "h2")
+        stats.save()
+        stats.record("ESN", "title", "h1")
+        stats.save()
+
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)["sites"]["ESN"]["title"]
+        assert saved["extractions"] == 3
+        assert saved["hits"] == {"h2": 2, "h1": 1}
+
+    def test_collapse_detected(self, tmp_path):
+        stats = stats_with_history(tmp_path / "stats.json", "ESN", "date", [DATES[0]] * 10)
+        for _ in range(6):
+            stats.record("ESN", "date", None)  # Markup changed, nothing matches any more
+
+        collapses = stats.collapsed()
+
+        assert [(c.field, c.selector) for c in collapses] == [("date", DATES[0])]
+        assert collapses[0].historical_rate == 1.0
+        assert collapses[0].current_rate == 0.0
+        assert "dropped from 100% to 0%" in str(collapses[0])
+
+    def test_no_collapse_with_few_samples(self, tmp_path):
+        stats = stats_with_history(tmp_path / "stats.json", "ESN", "date", [DATES[0]] * 10)
+        stats.record("ESN", "date", None)
+
+        assert stats.collapsed() == []
+
+    def test_unreadable_file_ignored(self, tmp_path):
+        path = tmp_path / "stats.json"
+        path.write_text("{not json", encoding="utf-8")
+
+        assert SelectorStats(str(path))._history == {}
+
+
+class TestScraperUsesStats:
+    """Test the extraction path"""
+
+    def test_configured_priority_and_hits_recorded(self, tmp_path):
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+        scraper.selector_stats = stats_with_history(tmp_path / "stats.json", ESN_EPFL_CONFIG.name, "date",
+                                                    [".field-name-field-date"] * 5)
+        element = parse_html(b'<div class="views-row"><div class="field-name-field-date">Mon 2 Mar</div></div>')
+        tried = []
+
+        def spy(element, selector):
+            tried.append(selector)
+            return original(element, selector)
+
+        original = web_scraper.select_one
+        with patch.object(web_scraper, "select_one", spy):
+            assert scraper._extract_date_from_element(element, is_detailed_page=False) == "Mon 2 Mar"
+
+        assert tried == [".date-display-single", ".field-name-field-date"]
+        run = scraper.selector_stats._run[(ESN_EPFL_CONFIG.name, "date")]
+        assert run.hits == {".field-name-field-date": 1}
+
+    def test_same_event_with_and_without_stats(self, tmp_path):
+        """History favouring a lower-priority selector does not change the title, so not the event ID"""
+        html = (b'<div class="views-row"><h2>Upcoming</h2>'
+                b'<div class="field-name-title"><h2>Ski Weekend</h2></div>'
+                b'<div class="field-name-body">Two days in the Alps</div></div>')
+        plain = WebScraper(ESN_EPFL_CONFIG)
+        plain.selector_stats = None
+        with_stats = WebScraper(ESN_EPFL_CONFIG)
+        with_stats.selector_stats = stats_with_history(tmp_path / "stats.json", ESN_EPFL_CONFIG.name, "title",
+                                                       ["h2"] * 15 + [".field-name-title h2"] * 5)
+
+        expected = plain._parse_event_element(parse_html(html), is_detailed_page=False)
+        event = with_stats._parse_event_element(parse_html(html), is_detailed_page=False)
+
+        assert expected.title == "Ski Weekend"
+        assert event == expected
+
+    def test_misses_recorded(self, tmp_path):
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+        scraper.selector_stats = SelectorStats(str(tmp_path / "stats.json"))
+
+        element = parse_html(b'<div class="views-row"></div>')
+        assert scraper._extract_date_from_element(element, is_detailed_page=True) == "Date TBA"
+
+        run = scraper.selector_stats._run[(ESN_EPFL_CONFIG.name, "detailed_date")]
+        assert run.extractions == 1
+        assert run.hits == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
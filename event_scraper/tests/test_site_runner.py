@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Tests for the parallel site runner"""
+import threading
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.site_runner import run_sites, scrape_site
+from scrapers.website_config import WebsiteConfig, SelectorConfig
+from models.event_models import Association, EventCategory
+
+
+def make_config(name: str) -> WebsiteConfig:
+    return WebsiteConfig(
+        name=name,
+        url=f"https://{name}.example.com/events",
+        base_domain=f"https://{name}.example.com",
+        selectors=SelectorConfig(),
+        association=Association(name, name, "desc", EventCategory.SOCIAL)
+    )
+
+
+class FakeScraper:
+    """Scraper double returning the site name as its only event"""
+
+    def __init__(self, website_config):
+        if website_config.name == "broken":
+            raise RuntimeError("cannot build scraper")
+        self.name = website_config.name
+        self.last_error = None
+
+    def scrape(self):
+        if self.name == "failing":
+            self.last_error = "list page unreachable"
+            return []
+        return [self.name]
+
+
+class TestSiteRunner:
+    """Test run_sites and scrape_site"""
+
+    def test_failures_are_isolated(self):
+        """Each site gets its own result and failures never abort the others"""
+        configs = [make_config(name) for name in ["a", "broken", "failing", "b"]]
+
+        results = {result.name: result for result in run_sites(configs, FakeScraper, max_workers=4)}
+
+        assert set(results) == {"a", "broken", "failing", "b"}
+        assert results["a"].events == ["a"] and not results["a"].failed
+        assert results["b"].events == ["b"] and not results["b"].failed
+        assert results["broken"].failed and results["broken"].error == "cannot build scraper"
+        assert results["failing"].failed and results["failing"].events == []
+
+    def test_sites_run_in_parallel(self):
+        """Sites are scraped concurrently up to max_workers"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        class WaitingScraper(FakeScraper):
+            def scrape(self):
+                barrier.wait()  # Only passes if three sites run at the same time
+                return super().scrape()
+
+        configs = [make_config(name) for name in ["x", "y", "z"]]
+        results = list(run_sites(configs, WaitingScraper, max_workers=3))
+
+        assert sorted(r.name for r in results) == ["x", "y", "z"]
+        assert not any(r.failed for r in results)
+
+    def test_no_sites(self):
+        """An empty site list yields nothing"""
+        assert list(run_sites([], FakeScraper)) == []
+
+    def test_scrape_site_records_duration(self):
+        """scrape_site reports the elapsed time"""
+        result = scrape_site(make_config("a"), FakeScraper)
+        assert result.duration >= 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
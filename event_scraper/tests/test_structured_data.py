@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Tests for the JSON-LD / OpenGraph fast path"""
+import dataclasses
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.html_backends import available_backends, parse_html
+from scrapers.structured_data import extract_structured_event
+from scrapers.web_scraper import WebScraper
+from scrapers.website_config import AGEPOLY_CONFIG, ESN_EPFL_CONFIG
+from models.event_models import Event
+from tests.test_html_backends import AGEPOLY_PAGES
+
+JSON_LD_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<meta property="og:title" content="Balélec Festival - AGEPoly">
+<meta property="og:site_name" content="AGEPoly">
+<meta property="og:image" content="https://agepoly.ch/wp/og.jpg">
+<script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebPage", "name": "Balélec Festival - AGEPoly"},
+  {"@type": ["Event", "MusicEvent"], "name": "Balélec Festival", "startDate": "2026-05-08T17:00:00+02:00",
+   "description": "Concerts &amp; DJs <b>all night</b>\\n long.",
+   "location": {"@type": "Place", "name": "EPFL Esplanade",
+                "geo": {"latitude": "46.5197", "longitude": 6.5660}},
+   "offers": [{"@type": "Offer", "price": "35.50", "priceCurrency": "CHF"}],
+   "image": {"@type": "ImageObject", "url": "/wp/balelec.jpg"}}
+]}</script>
+</head><body>
+<article><h1 class="entry-title">CSS title</h1>
+<div class="entry-meta"><time class="entry-date">8 May 2026</time></div>
+<div class="entry-content"><p>CSS description.</p></div></article>
+</body></html>"""
+
+OPENGRAPH_PAGE = """<html><head>
+<meta property="og:title" content="Ski Weekend | ESN EPFL Lausanne">
+<meta property="og:site_name" content="ESN EPFL Lausanne">
+<meta property="og:description" content="Two days of skiing.">
+<script type="application/ld+json">{"@type": "Event", "name": "broken,}</script>
+</head><body>
+<h1>Ski Weekend in Zermatt</h1>
+<span class="date-display-single">Sat 14 Feb 2026 - 08:00</span>
+<div class="field-name-field-price">CHF 120.-</div>
+</body></html>"""
+
+
+class TestExtractStructuredEvent:
+    """Test extract_structured_event"""
+
+    def test_json_ld_event(self):
+        event = extract_structured_event(parse_html(JSON_LD_PAGE.encode("utf-8")))
+
+        assert event.title == "Balélec Festival"
+        assert event.date == "2026-05-08T17:00:00+02:00"
+        assert event.description == "Concerts & DJs all night long."
+        assert event.location == "EPFL Esplanade"
+        assert (event.latitude, event.longitude) == (46.5197, 6.566)
+        assert event.price_chf == 35.5
+        assert event.image == "/wp/balelec.jpg"  # JSON-LD wins over og:image
+        assert event.complete()
+
+    def test_opengraph_fills_missing_fields(self):
+        event = extract_structured_event(parse_html(OPENGRAPH_PAGE.encode("utf-8")))
+
+        # The invalid JSON-LD is ignored
+        assert event.title == "Ski Weekend"
+        assert event.description is None  # og:description is only an excerpt
+        assert event.excerpt == "Two days of skiing."
+        assert event.date is None and event.price_chf is None
+        assert not event.complete()
+
+    def test_other_currencies_left_to_selectors(self):
+        html = ('<script type="application/ld+json">{"@type": "Event", "name": "Trip", '
+                '"offers": {"price": 20, "priceCurrency": "EUR"}}</script>')
+
+        assert extract_structured_event(parse_html(html.encode("utf-8"))).price_chf is None
+
+
+class TestScraperStructuredData:
+    """Test the scraper's fast path"""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_complete_data_skips_selectors(self, backend):
+        scraper = WebScraper(dataclasses.replace(AGEPOLY_CONFIG, parser_backend=backend))
+
+        with patch.object(WebScraper, "_match_fields") as match_fields:
+            event = scraper._parse_detailed_content(JSON_LD_PAGE.encode("utf-8"))
+
+        match_fields.assert_not_called()
+        # The title, and so the event ID, still comes from the selectors
+        assert event.title == "CSS title"
+        assert event.id == Event.generate_id("CSS title", AGEPOLY_CONFIG.name)
+        assert event.time == "2026-05-08T17:00:00+02:00"
+        assert event.location.name == "EPFL Esplanade"
+        assert event.location.latitude == 46.5197
+        assert event.price.cents == 3550
+        assert event.picture_url == "https://agepoly.ch/wp/balelec.jpg"
+
+    def test_selectors_fill_missing_fields(self):
+        scraper = WebScraper(ESN_EPFL_CONFIG)
+
+        event = scraper._parse_detailed_content(OPENGRAPH_PAGE.encode("utf-8"))
+
+        assert event.title == "Ski Weekend in Zermatt"
+        assert event.description == "Two days of skiing."  # No description selector matches
+        assert event.time == "Sat 14 Feb 2026 - 08:00"
+        assert event.price.cents == 12000
+
+    def test_toggle_off_uses_selectors(self):
+        scraper = WebScraper(dataclasses.replace(AGEPOLY_CONFIG, structured_data=False))
+
+        event = scraper._parse_detailed_content(JSON_LD_PAGE.encode("utf-8"))
+
+        assert event.title == "CSS title"
+        assert event.time == "8 May 2026"
+
+    def test_structured_title_only_without_selector_match(self):
+        page = OPENGRAPH_PAGE.replace("<h1>Ski Weekend in Zermatt</h1>", "")
+
+        event = WebScraper(ESN_EPFL_CONFIG)._parse_detailed_content(page.encode("utf-8"))
+
+        assert event.title == "Ski Weekend"
+
+    @pytest.mark.parametrize("page", [JSON_LD_PAGE, OPENGRAPH_PAGE], ids=["json-ld", "opengraph"])
+    def test_event_ids_unchanged_by_structured_data(self, page):
+        """Events already in the database keep their ID when structured data is read"""
+        for website_config in (AGEPOLY_CONFIG, ESN_EPFL_CONFIG):
+            without = WebScraper(dataclasses.replace(website_config, structured_data=False))
+            event = WebScraper(website_config)._parse_detailed_content(page.encode("utf-8"))
+
+            assert event.id == without._parse_detailed_content(page.encode("utf-8")).id
+
+    def test_opengraph_description_does_not_replace_content(self):
+        content = AGEPOLY_PAGES["https://agepoly.ch/en/balelec/"].replace(
+            "<head>", '<head><meta property="og:description" content="Short excerpt">')
+        assert "Short excerpt" in content
+
+        event = WebScraper(AGEPOLY_CONFIG)._parse_detailed_content(content.encode("utf-8"))
+        css_only = WebScraper(dataclasses.replace(AGEPOLY_CONFIG, structured_data=False))
+
+        assert event.description == css_only._parse_detailed_content(content.encode("utf-8")).description
+        assert event.description != "Short excerpt"
+
+    def test_pages_without_structured_data_unchanged(self):
+        content = AGEPOLY_PAGES["https://agepoly.ch/en/balelec/"].encode("utf-8")
+        expected = WebScraper(dataclasses.replace(AGEPOLY_CONFIG, structured_data=False))._parse_detailed_content(content)
+
+        assert WebScraper(AGEPOLY_CONFIG)._parse_detailed_content(content) == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
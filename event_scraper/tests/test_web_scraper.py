@@ -10,7 +10,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scrapers.web_scraper import WebScraper
-from models.event_models import Association, EventCategory
+from scrapers.politeness import PolitenessScheduler
+import config
+from models.event_models import Association, Event, EventCategory
 
 class TestWebScraper:
     """Test WebScraper functionality with mocked requests"""
@@ -113,7 +115,8 @@ class TestWebScraper:
         assert scraper.source_name == "Test Website"
         assert scraper.config is not None
         assert hasattr(scraper, 'session')
-        assert scraper.session.timeout == 30  # From config
+        # Connect and read timeouts from config, passed with every request
+        assert scraper._timeout() == (config.CONNECT_TIMEOUT, config.READ_TIMEOUT)
     
     @patch('scrapers.web_scraper.requests.Session')
     def test_scrape_success(self, mock_session, mock_website_config, mock_html_content):
@@ -268,5 +271,219 @@ class TestWebScraper:
         assert scraper._validate_event(invalid_event_1) == False
         assert scraper._validate_event(invalid_event_2) == False
 
+    def test_detailed_pages_keep_list_order(self, mock_website_config, mock_html_content):
+        """Concurrent detail fetches keep list order and fall back to the list view"""
+        import threading
+        import time
+        
+        detail_html = """
+        <html><body>
+            <h1 class="event-title">Detailed {n}</h1>
+            <div class="event-content"><p>Details of event {n}.</p></div>
+        </body></html>
+        """
+        in_flight = {"current": 0, "max": 0}
+        lock = threading.Lock()
+        
+        def fake_get(url, *args, **kwargs):
+            response = Mock()
+            if url == mock_website_config["url"]:
+                response.content = mock_html_content.encode('utf-8')
+                return response
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            # The first detail page is the slowest one, so it finishes last
+            time.sleep(0.2 if url.endswith("/1") else 0.05)
+            with lock:
+                in_flight["current"] -= 1
+            if url.endswith("/2"):
+                raise Exception("Detail page down")
+            response.content = detail_html.format(n=url[-1]).encode('utf-8')
+            return response
+        
+        mock_website_config["detail_concurrency"] = 2
+        scraper = WebScraper(mock_website_config)
+        scraper.politeness = PolitenessScheduler(requests_per_second=100, burst=10,
+                                                 respect_crawl_delay=False)
+        scraper.session = Mock()
+        scraper.session.get.side_effect = fake_get
+        
+        events = scraper.scrape()
+        
+        assert [event.title for event in events] == ["Detailed 1", "Test Event 2"]
+        assert in_flight["max"] == 2
+    
+    def test_detailed_pages_sequential_when_limit_is_one(self, mock_website_config):
+        """A concurrency limit of one scrapes detail pages in order without a pool"""
+        mock_website_config["detail_concurrency"] = 1
+        scraper = WebScraper(mock_website_config)
+        visited = []
+        scraper._scrape_detailed_page = lambda url: visited.append(url)
+        
+        results = scraper._scrape_detailed_pages(["https://a/1", None, "https://a/3"])
+        
+        assert results == [None, None, None]
+        assert visited == ["https://a/1", "https://a/3"]
+
+    def test_exhausted_budget_skips_detailed_pages(self, mock_website_config, mock_html_content):
+        """Once the site's time budget is spent, list view events are returned without detail GETs"""
+        clock = {"now": 0.0}
+        
+        def fake_get(url, *args, **kwargs):
+            clock["now"] += 10  # Every request takes 10 seconds
+            response = Mock()
+            response.content = mock_html_content.encode('utf-8')
+            return response
+        
+        mock_website_config["deadline_seconds"] = 5
+        scraper = WebScraper(mock_website_config)
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+        scraper.session = Mock()
+        scraper.session.get.side_effect = fake_get
+        
+        with patch('scrapers.deadline.time.monotonic', lambda: clock["now"]):
+            events = scraper.scrape()
+        
+        assert [event.title for event in events] == ["Test Event 1", "Test Event 2"]
+        assert scraper.session.get.call_count == 1  # Only the list page
+    
+    def test_timeouts_capped_by_run_deadline(self, mock_website_config):
+        """Request timeouts never run past the remaining run budget"""
+        from scrapers.deadline import Deadline
+        
+        scraper = WebScraper(mock_website_config, run_deadline=Deadline(2))
+        scraper.deadline = Deadline(100, parent=scraper.run_deadline)
+        
+        connect, read = scraper._timeout()
+        
+        assert connect <= 2 and read <= 2
+
+    def test_budget_spent_waiting_for_slot(self, mock_website_config):
+        """Running out of time while waiting for the host raises DeadlineExceeded, not a 0s timeout"""
+        from contextlib import contextmanager
+        from scrapers.deadline import Deadline, DeadlineExceeded
+        clock = {"now": 0.0}
+        
+        @contextmanager
+        def slow_slot(*args, **kwargs):
+            clock["now"] += 10
+            yield
+        
+        mock_website_config["deadline_seconds"] = 5
+        scraper = WebScraper(mock_website_config)
+        scraper.politeness = Mock()
+        scraper.politeness.slot.side_effect = slow_slot
+        scraper.session = Mock()
+        
+        with patch('scrapers.deadline.time.monotonic', lambda: clock["now"]):
+            scraper.deadline = Deadline(5)
+            with pytest.raises(DeadlineExceeded):
+                scraper._get("https://test.example.com/events")
+        
+        scraper.session.get.assert_not_called()
+
+    def test_pagination_follows_next_page(self, mock_website_config):
+        """Next page links are followed lazily, with duplicate events and pages skipped"""
+        pages = {
+            "https://test.example.com/events": """
+                <div class="event-item"><h2 class="event-title"><a href="/events/1">Event 1</a></h2>
+                    <div class="event-description">One</div></div>
+                <div class="event-item"><h2 class="event-title"><a href="/events/2">Event 2</a></h2>
+                    <div class="event-description">Two</div></div>
+                <a class="next" href="/events?page=2">Next</a>
+            """,
+            "https://test.example.com/events?page=2": """
+                <div class="event-item"><h2 class="event-title"><a href="/events/2">Event 2</a></h2>
+                    <div class="event-description">Two</div></div>
+                <div class="event-item"><h2 class="event-title"><a href="/events/3">Event 3</a></h2>
+                    <div class="event-description">Three</div></div>
+                <a class="next" href="/events/">Back to start</a>
+            """,
+        }
+        
+        def fake_get(url, *args, **kwargs):
+            if url not in pages:
+                raise Exception("No detailed page")
+            response = Mock()
+            response.content = pages[url].encode('utf-8')
+            return response
+        
+        mock_website_config["selectors"]["next_page"] = ["a.next"]
+        mock_website_config["max_pages"] = 5
+        scraper = WebScraper(mock_website_config)
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+        scraper.session = Mock()
+        scraper.session.get.side_effect = fake_get
+        
+        events = scraper.iter_events()
+        assert next(events).title == "Event 1"
+        # Second list page not requested yet
+        assert "https://test.example.com/events?page=2" not in [c.args[0] for c in scraper.session.get.call_args_list]
+        
+        assert [event.title for event in events] == ["Event 2", "Event 3"]
+    
+    def test_max_events_limit(self, mock_website_config, mock_html_content):
+        """max_events replaces the hard-coded cap"""
+        mock_website_config["max_events"] = 1
+        scraper = WebScraper(mock_website_config)
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+        scraper.session = Mock()
+        scraper.session.get.return_value = Mock(content=mock_html_content.encode('utf-8'))
+        
+        events = scraper.scrape()
+        
+        assert [event.title for event in events] == ["Test Event 1"]
+
+    def test_stops_after_consecutive_known_events(self, mock_website_config):
+        """An incremental crawl stops once stop_after_known events in a row are already known"""
+        def list_page(numbers, next_page):
+            items = "".join(
+                f'<div class="event-item"><h2 class="event-title"><a href="/events/{n}">Event {n}</a></h2>'
+                f'<div class="event-description">Event number {n}</div></div>'
+                for n in numbers
+            )
+            return f'{items}<a class="next" href="{next_page}">Next</a>'
+        
+        pages = {
+            "https://test.example.com/events": list_page([1, 2], "/events?page=2"),
+            "https://test.example.com/events?page=2": list_page([3, 4], "/events?page=3"),
+            "https://test.example.com/events?page=3": list_page([5, 6], "/events?page=4"),
+        }
+        requested = []
+        
+        def fake_get(url, *args, **kwargs):
+            requested.append(url)
+            if url not in pages:
+                raise Exception("No detailed page")
+            return Mock(content=pages[url].encode('utf-8'))
+        
+        mock_website_config["selectors"]["next_page"] = ["a.next"]
+        mock_website_config["max_pages"] = 10
+        mock_website_config["max_events"] = 100
+        mock_website_config["stop_after_known"] = 2
+        known_ids = {Event.generate_id(f"Event {n}", "Test Website") for n in (1, 3, 4, 5, 6)}
+        scraper = WebScraper(mock_website_config, known_ids=known_ids)
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+        scraper.session = Mock()
+        scraper.session.get.side_effect = fake_get
+        
+        events = scraper.scrape()
+        
+        # Event 1 is known but followed by a new one, the crawl only stops after events 3 and 4
+        assert [event.title for event in events] == ["Event 1", "Event 2", "Event 3", "Event 4"]
+        assert "https://test.example.com/events?page=3" not in requested
+    
+    def test_known_events_ignored_without_policy(self, mock_website_config, mock_html_content):
+        """stop_after_known = 0 never stops the crawl"""
+        mock_website_config["stop_after_known"] = 0
+        known_ids = {Event.generate_id("Test Event 1", "Test Website"), Event.generate_id("Test Event 2", "Test Website")}
+        scraper = WebScraper(mock_website_config, known_ids=known_ids)
+        scraper.politeness = PolitenessScheduler(respect_crawl_delay=False)
+        scraper.session = Mock()
+        scraper.session.get.return_value = Mock(content=mock_html_content.encode('utf-8'))
+        
+        assert len(scraper.scrape()) == 2
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
\ No newline at end of file
@@ -38,7 +38,7 @@ def test_main_py_file_exists():
     
     # Check for key patterns
     assert 'def main():' in content
-    assert 'from scrapers.web_scraper import WebScraper' in content
+    assert 'from scrapers.site_runner import create_scraper, run_sites' in content
     assert 'from firestore.database import FirebaseDatabase' in content
     
     print("✅ main.py file structure is correct")